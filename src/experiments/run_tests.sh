@@ -5,6 +5,9 @@ set -xe
 # location of all test datasets
 test_dir=../../data/test
 
+# tokenization and score results of unchanged files are reused from this cache
+cache=out/cache.sqlite
+
 
 run_one_test() {
     dataset_name=$1
@@ -18,10 +21,10 @@ run_one_test() {
     mkdir -p ${out_dir}/tokenized
 
     # run tokenization
-    cat ${dataset_dir}/file_list.txt | xargs -I {} ${tokenizer} ${dataset_dir}/raw/{} ${out_dir}/tokenized/{}
+    ${tokenizer} ${dataset_dir}/raw ${out_dir}/tokenized ${dataset_dir}/file_list.txt ${cache}
 
     # compute result
-    python3 ../tools/score.py --expected-dir ${dataset_dir}/expected --actual-dir ${out_dir}/tokenized --per-file-results ${out_dir}/per_file_results.tsv > ${out_dir}/result.tsv
+    python3 ../tools/score.py --expected-dir ${dataset_dir}/expected --actual-dir ${out_dir}/tokenized --per-file-results ${out_dir}/per_file_results.tsv --cache ${cache} > ${out_dir}/result.tsv
 }
 
 
@@ -29,6 +32,7 @@ run_one_test politika punktrus_whitespace
 run_one_test politika punktrus_treebank
 run_one_test politika punktrus_srbregex
 run_one_test politika punktsrb_srbregex
+run_one_test politika fastsrb_srbregex
 
 cut -f1,5,3 out/politika/punktrus_whitespace/result.tsv | sed 's/^/Sentence Tokenizer | Word Tokenizer | /g' | sed 's/\t/ | /g' > results.md
 cut -f1,5,3 out/politika/punktrus_whitespace/result.tsv | sed 's/^/| ------- | --------| /g'| sed 's/[a-zA-Z]/-/g' | sed 's/\t/ | /g' >> results.md
@@ -36,3 +40,4 @@ cut -f2,6,4 out/politika/punktrus_whitespace/result.tsv | sed 's/^/Russian Punkt
 cut -f2,6,4 out/politika/punktrus_treebank/result.tsv | sed 's/^/Russian PunktTokenizer | TreebankTokenizer | /g'| sed 's/\t/ | /g' >> results.md
 cut -f2,6,4 out/politika/punktrus_srbregex/result.tsv | sed 's/^/Russian PunktTokenizer | SrbRegexTokenizer | /g'| sed 's/\t/ | /g' >> results.md
 cut -f2,6,4 out/politika/punktsrb_srbregex/result.tsv | sed 's/^/Serbian PunktTokenizer | SrbRegexTokenizer | /g'| sed 's/\t/ | /g' >> results.md
+cut -f2,6,4 out/politika/fastsrb_srbregex/result.tsv | sed 's/^/Serbian FastSentenceTokenizer | SrbRegexTokenizer | /g'| sed 's/\t/ | /g' >> results.md
@@ -3,8 +3,10 @@
 SCRIPT_DIR=$(dirname "$0")
 tokenize="python3 ${SCRIPT_DIR}/../../tools/nltk_tokenize.py --sent-tokenizer PunktTokenizer(russian) --word-tokenizer SrbRegexpTokenizer --sent-per-line"
 
-in_file=$1
-out_file=$2
+in_dir=$1
+out_dir=$2
+file_list=$3
+cache=$4
 
-echo tokenize ${in_file} 
-cat ${in_file} | $tokenize > ${out_file}
+echo tokenize ${in_dir}
+$tokenize --input-dir ${in_dir} --output-dir ${out_dir} --file-list ${file_list} ${cache:+--cache ${cache}}
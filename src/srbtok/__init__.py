@@ -1,2 +1,9 @@
-from .srb_tokenizer import SrbTokenizer
+__all__ = ['SrbTokenizer', 'get_tokenizer']
 
+
+def __getattr__(name):
+    # srb_tokenizer imports nltk which takes most of the startup time, so it is imported on first use
+    if name in __all__:
+        from . import srb_tokenizer
+        return getattr(srb_tokenizer, name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
@@ -1,37 +1,143 @@
 import sys
 import argparse
 
-from .utils import tokenize_stream_sent_per_line, tokenize_stream
-from .srb_tokenizer import SrbTokenizer
+from .utils import iter_tokenize_stream_sent_per_line, iter_tokenize_stream, iter_tokenize_stream_parallel, iter_tokenize_file, write_lines, DEFAULT_BLOCK_LINES
+from .utils import tokenize_corpus, read_file_list, is_regular_file
+from .srb_tokenizer import get_tokenizer
+from .stats import TokenizerStats
+from .memo import TokenizerMemo
+
+# namespace of srbtok results in --cache file, results of --fast are kept separately
+CACHE_NAMESPACE = "srbtok"
+FAST_CACHE_NAMESPACE = "srbtok-fast"
 
 
 
 def parse_args():
-    parser = argparse.ArgumentParser(description='This tool tokenizes Serbian Cyrillic text to sentences and words.')
+    parser = argparse.ArgumentParser(description='This tool tokenizes Serbian Cyrillic text to sentences and words. Run "python -m srbtok serve -h" for local tokenization server.')
     parser.add_argument('-i', '--in-text', help='Input text file that you want to tokenize. If not specified stdin will be used.', required=False)
     parser.add_argument('-o', '--out-text', help="Output text with tokenized text. If not specified stdout will be used.", required=False)
+    parser.add_argument('-id', '--input-dir', help='Corpus mode: tokenize all files in this directory tree, the model is loaded only once. Cannot be used with --in-text.')
+    parser.add_argument('-od', '--output-dir', help='Corpus mode: tokenized files are written to the same relative paths in this directory.')
+    parser.add_argument('-fl', '--file-list', help='Corpus mode: file with one path relative to --input-dir per line. If not specified all files in --input-dir are tokenized.')
+    parser.add_argument('-c', '--cache', help='Corpus mode: sqlite file with cached tokenization results. Files tokenized before by the same code and model are copied from cache.')
     parser.add_argument('-spl', '--sent-per-line', action='store_true', help='Write one sentence per line in output file. If not specified original formatting will be preserved.')
-    return parser.parse_args()
+    parser.add_argument('-cs', '--chunk-size', type=int, default=4, help='Input file is memory mapped and tokenized in chunks of about this many MB. Not used for stdin.')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes. Input is tokenized in blocks (file chunks or stdin lines) in parallel and written in the original order. 0 means number of CPUs.')
+    parser.add_argument('-bl', '--block-lines', type=int, default=DEFAULT_BLOCK_LINES, help='Number of stdin lines sent to a worker at once when --jobs is not 1.')
+    parser.add_argument('-f', '--fast', action='store_true', help='Use approximate sentence splitter based only on abbreviations, several times faster than Punkt but some sentence boundaries differ. Meant for bulk pre-filtering.')
+    parser.add_argument('-s', '--stats', action='store_true', help='Collect per stage time, sentence and token counts and write them to stderr as JSON at the end.')
+    parser.add_argument('-me', '--memo-entries', type=int, help='Memoize word spans of repeated lines and sentences in LRU caches with at most this many entries in total, half for lines and half for sentences. Hits, misses and evictions are written to stderr as JSON at the end.')
+    parser.add_argument('-mm', '--memo-memory', type=float, help='Memoize word spans of repeated lines and sentences in LRU caches of about this many MB in total, can be combined with --memo-entries.')
+    parser.add_argument('-fmt', '--format', choices=['text', 'spans-bin', 'ids'], default='text', help='Output format. text: space separated tokens. spans-bin: binary index with sentence and word boundaries of every document (every input line, or every file of --input-dir), written to --out-text and read with srbtok.spans_index.SpansIndex. ids: space separated integer ids of tokens from vocabulary, see --vocab-in and --vocab-out.')
+    parser.add_argument('-vi', '--vocab-in', help='Vocabulary file for --format ids, created with --vocab-out. New tokens are added to it unless --freeze-vocab is used.')
+    parser.add_argument('-vo', '--vocab-out', help='Write vocabulary with token frequencies to this file at the end. Line number is token id.')
+    parser.add_argument('-fv', '--freeze-vocab', action='store_true', help='Do not add new tokens to --vocab-in, unknown tokens get id 0.')
+    parser.add_argument('-lb', '--line-buffered', action='store_true', help='Terminate every output line with new line and flush it immediately. Useful for interactive pipes.')
+    args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs must not be negative")
+    if args.format == 'spans-bin':
+        if args.input_dir and (args.output_dir or args.in_text or not args.out_text):
+            parser.error("--format spans-bin with --input-dir writes one index to --out-text and cannot be used with --output-dir or --in-text")
+        if args.sent_per_line or args.cache or args.line_buffered:
+            parser.error("--sent-per-line, --cache and --line-buffered cannot be used with --format spans-bin")
+    elif args.input_dir and (not args.output_dir or args.in_text or args.out_text):
+        parser.error("--input-dir requires --output-dir and cannot be used with --in-text or --out-text")
+    if args.format == 'ids':
+        if args.input_dir or args.jobs != 1:
+            parser.error("--format ids can only be used with --jobs 1 and without --input-dir")
+        if not args.vocab_out and not args.freeze_vocab:
+            parser.error("--format ids requires --vocab-out, unless --vocab-in is frozen with --freeze-vocab")
+    if (args.vocab_in or args.vocab_out or args.freeze_vocab) and args.format != 'ids':
+        parser.error("--vocab-in, --vocab-out and --freeze-vocab require --format ids")
+    if args.freeze_vocab and not args.vocab_in:
+        parser.error("--freeze-vocab requires --vocab-in")
+    if not args.input_dir and (args.output_dir or args.file_list or args.cache):
+        parser.error("--output-dir, --file-list and --cache require --input-dir")
+    if args.stats and args.jobs != 1:
+        parser.error("--stats can only be collected with --jobs 1")
+    if args.memo_entries is not None or args.memo_memory is not None:
+        if args.stats or args.jobs != 1:
+            parser.error("--memo-entries and --memo-memory can only be used with --jobs 1 and without --stats")
+    return args
 
 
 
 
 if __name__ == "__main__":
     '''Implementation of tokenization tool. This is the module __main__ method.'''
-    args = parse_args()
+    if sys.argv[1:2] == ["serve"]:
+        from .server import main
+        main(sys.argv[2:])
+        sys.exit(0)
 
-    tokenizer = SrbTokenizer()
+    args = parse_args()
 
-    istream = sys.stdin
-    if args.in_text:
-        istream = open(args.in_text, 'r', encoding='utf-8')
+    tokenizer = get_tokenizer(args.fast)
+    if args.stats:
+        tokenizer.stats = TokenizerStats()
+    if args.memo_entries is not None or args.memo_memory is not None:
+        memo_bytes = int(args.memo_memory * 1024 * 1024) if args.memo_memory is not None else None
+        tokenizer.memo = TokenizerMemo(args.memo_entries, memo_bytes)
 
-    ostream = sys.stdout
-    if args.out_text:
-        ostream = open(args.out_text, 'w', encoding='utf-8')
-    
-    if args.sent_per_line:
-        out_text = tokenize_stream_sent_per_line(istream, tokenizer)
+    workers = args.jobs or None
+    if args.format == 'spans-bin':
+        from .spans_index import write_spans_index, iter_encode_corpus, iter_encode_stream
+        if args.input_dir:
+            file_names = read_file_list(args.file_list) if args.file_list else None
+            documents = iter_encode_corpus(tokenizer, args.input_dir, file_names, workers)
+        elif args.in_text:
+            istream = open(args.in_text, 'r', encoding='utf-8')
+            documents = iter_encode_stream(istream, tokenizer, args.block_lines, workers)
+        else:
+            documents = iter_encode_stream(sys.stdin, tokenizer, args.block_lines, workers)
+        if args.out_text:
+            with open(args.out_text, 'wb') as ostream:
+                write_spans_index(documents, ostream)
+        else:
+            write_spans_index(documents, sys.stdout.buffer)
+    elif args.format == 'ids':
+        from .vocab import Vocabulary, iter_ids_stream
+        vocabulary = Vocabulary.load(args.vocab_in, args.freeze_vocab) if args.vocab_in else Vocabulary()
+        istream = open(args.in_text, 'r', encoding='utf-8') if args.in_text else sys.stdin
+        ostream = open(args.out_text, 'w', encoding='utf-8') if args.out_text else sys.stdout
+        write_lines(iter_ids_stream(istream, tokenizer, vocabulary, args.sent_per_line), ostream, args.line_buffered)
+        if args.vocab_out:
+            vocabulary.save(args.vocab_out)
+    elif args.input_dir:
+        file_names = read_file_list(args.file_list) if args.file_list else None
+        if args.cache:
+            from .cache import ResultCache, srbtok_fingerprint
+            fingerprint = srbtok_fingerprint()
+            namespace = FAST_CACHE_NAMESPACE if args.fast else CACHE_NAMESPACE
+            with ResultCache(args.cache) as cache:
+                for _ in tokenize_corpus(tokenizer, args.input_dir, args.output_dir, file_names, args.sent_per_line, workers, cache, namespace, fingerprint):
+                    pass
+                cache.evict_stale(namespace, fingerprint)
+                sys.stderr.write(cache.report() + "\n")
+        else:
+            for _ in tokenize_corpus(tokenizer, args.input_dir, args.output_dir, file_names, args.sent_per_line, workers):
+                pass
     else:
-        out_text = tokenize_stream(istream, tokenizer)
-    ostream.write(out_text)
+        ostream = sys.stdout
+        if args.out_text:
+            ostream = open(args.out_text, 'w', encoding='utf-8')
+
+        # pipes and process substitution can't be memory mapped, they are read as stream like stdin
+        if args.in_text and is_regular_file(args.in_text):
+            out_lines = iter_tokenize_file(args.in_text, tokenizer, args.sent_per_line, args.chunk_size * 1024 * 1024, workers)
+        else:
+            istream = open(args.in_text, 'r', encoding='utf-8') if args.in_text else sys.stdin
+            if args.jobs != 1:
+                out_lines = iter_tokenize_stream_parallel(istream, tokenizer, args.sent_per_line, args.block_lines, workers)
+            elif args.sent_per_line:
+                out_lines = iter_tokenize_stream_sent_per_line(istream, tokenizer)
+            else:
+                out_lines = iter_tokenize_stream(istream, tokenizer)
+        write_lines(out_lines, ostream, args.line_buffered)
+
+    if args.stats:
+        sys.stderr.write(tokenizer.stats.to_json() + "\n")
+    if tokenizer.memo is not None:
+        sys.stderr.write(tokenizer.memo.to_json() + "\n")
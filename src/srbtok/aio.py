@@ -0,0 +1,151 @@
+import asyncio
+import collections
+import concurrent.futures
+
+from .parallel import _init_worker, get_worker_tokenizer
+
+
+# ##########################################################################
+# asyncio API
+# ##########################################################################
+
+DEFAULT_MAX_IN_FLIGHT = 16
+
+
+def _call_worker_tokenizer(method, text):
+    return getattr(get_worker_tokenizer(), method)(text)
+
+
+async def _as_async_iterable(texts):
+    if hasattr(texts, '__aiter__'):
+        async for text in texts:
+            yield text
+    else:
+        for text in texts:
+            yield text
+
+
+class AsyncSrbTokenizer:
+    '''
+    asyncio facade of tokenizer. Tokenization runs in executor, so long texts don't block the event loop.
+
+        async with AsyncSrbTokenizer() as tokenizer:
+            words = await tokenizer.tokenize(text)
+            async for words in tokenizer.iter_tokenize(documents):
+                ...
+
+    At most max_in_flight texts are submitted to executor and not finished, for all calls together. Callers above
+    the limit wait, which gives backpressure to producers that are faster than tokenization. Object should be used
+    from one event loop.
+
+    :param tokenizer: Tokenizer to use, by default shared SrbTokenizer (see get_tokenizer).
+    :param workers: Number of executor threads or processes. Default is one thread or os.cpu_count() processes.
+    :param processes: Use ProcessPoolExecutor in which every worker creates tokenizer with tokenizer.worker_factory()
+        (see parallel module). Threads are cheaper, processes tokenize in parallel.
+    :param executor: Executor to use instead of creating one. It is not shut down by close(). Thread executor calls
+        tokenizer directly, process executor must be created with parallel._init_worker as initializer.
+    :param max_in_flight: Maximal number of submitted texts that are not finished.
+    '''
+    def __init__(self, tokenizer=None, workers=None, processes=False, executor=None, max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+        if tokenizer is None:
+            from .srb_tokenizer import get_tokenizer
+            tokenizer = get_tokenizer()
+        self.tokenizer = tokenizer
+        self._owns_executor = executor is None
+        if executor is None:
+            if processes:
+                executor = concurrent.futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(tokenizer.worker_factory(),))
+            else:
+                executor = concurrent.futures.ThreadPoolExecutor(workers or 1, thread_name_prefix="srbtok")
+        self._executor = executor
+        self._processes = isinstance(executor, concurrent.futures.ProcessPoolExecutor)
+        self.max_in_flight = max_in_flight
+        self._in_flight = asyncio.Semaphore(max_in_flight)
+
+
+    async def _run(self, method, text):
+        async with self._in_flight:
+            return await self._submit(method, text)
+
+
+    def _submit(self, method, text):
+        loop = asyncio.get_running_loop()
+        if self._processes:
+            return loop.run_in_executor(self._executor, _call_worker_tokenizer, method, text)
+        return loop.run_in_executor(self._executor, getattr(self.tokenizer, method), text)
+
+
+    async def tokenize(self, text):
+        '''Returns list of word strings, see SrbTokenizer.tokenize.'''
+        return await self._run('tokenize', text)
+
+
+    async def span_tokenize(self, text):
+        '''Returns list of (start, end) word spans, see SrbTokenizer.span_tokenize.'''
+        return list(await self._run('span_tokenize', text))
+
+
+    async def span_tokenize_sentences(self, text):
+        '''Returns list of (start, end) sentence spans, see SrbTokenizer.span_tokenize_sentences.'''
+        return await self._run('span_tokenize_sentences', text)
+
+
+    async def _iter_results(self, method, texts):
+        pending = collections.deque()
+        try:
+            async for text in _as_async_iterable(texts):
+                # oldest own text is waited for first, otherwise all slots could be held by results nobody takes
+                while pending and (pending[0].done() or self._in_flight.locked()):
+                    yield await self._finish(pending.popleft())
+                await self._in_flight.acquire()
+                pending.append(self._submit(method, text))
+            while pending:
+                yield await self._finish(pending.popleft())
+        finally:
+            # consumer stopped early or tokenization failed, results of submitted texts are not needed
+            for future in pending:
+                future.cancel()
+                self._in_flight.release()
+
+
+    async def _finish(self, future):
+        try:
+            return await future
+        finally:
+            self._in_flight.release()
+
+
+    def iter_tokenize(self, texts):
+        '''
+        Tokenizes stream of documents and yields list of word strings for every document, in input order.
+        Documents are submitted while there are less than max_in_flight of them in executor, so they are tokenized
+        concurrently (with processes), but input is not read ahead without limit.
+
+        :param texts: Iterable or async iterable of texts
+        '''
+        return self._iter_results('tokenize', texts)
+
+
+    def iter_span_tokenize(self, texts):
+        '''Same as iter_tokenize, but yields list of (start, end) word spans for every document.'''
+        return self._iter_results('span_tokenize', texts)
+
+
+    def close(self):
+        '''Shuts down executor created by this object and waits for submitted work to finish.'''
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+
+    async def aclose(self):
+        '''Same as close, but waits for executor shutdown in thread, so event loop is not blocked.'''
+        if self._owns_executor:
+            await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown, True)
+
+
+    async def __aenter__(self):
+        return self
+
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.aclose()
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from collections import defaultdict
+
+
+# ##########################################################################
+# Content hashes
+# ##########################################################################
+
+PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# files whose content defines the behaviour of srbtok tokenizer
+MODEL_FILES = ["serbian_punkt.model", "serbian_punkt_nltk.pickle"]
+
+
+def content_hash(*parts):
+    '''
+    Returns hex SHA-256 of parts. Parts can be str or bytes, every part is prefixed with its length so that different
+    splits of the same bytes give different hashes.
+    '''
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode('utf-8')
+        digest.update(b"%d:" % len(part))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return content_hash(f.read())
+
+
+def srbtok_fingerprint(*config):
+    '''
+    Fingerprint of tokenizer code and model: hash of all srbtok sources, model files and config strings. It changes
+    whenever a regex or the model changes, so cached tokenization output of older versions is not used.
+    '''
+    parts = list(config)
+    names = sorted(name for name in os.listdir(PACKAGE_DIR) if name.endswith('.py')) + MODEL_FILES
+    for name in names:
+        path = os.path.join(PACKAGE_DIR, name)
+        if os.path.exists(path):
+            parts.extend([name, file_hash(path)])
+    return content_hash(*parts)
+
+
+# ##########################################################################
+# Persistent cache
+# ##########################################################################
+
+class ResultCache:
+    '''
+    Persistent cache of JSON serializable results in sqlite database.
+
+    Entries are grouped in namespaces, e.g. one namespace per tokenizer configuration, and every entry remembers
+    the fingerprint of code that computed it. Entries of other fingerprints are stale and can be removed with
+    evict_stale, entries that were not used for a long time with evict_older_than. Hits and misses are counted
+    per namespace.
+
+    Cache can be used only from one process, workers should get the results that are missing from the main process.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('''CREATE TABLE IF NOT EXISTS results (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            fingerprint TEXT NOT NULL,
+            value TEXT NOT NULL,
+            last_used REAL NOT NULL,
+            PRIMARY KEY (namespace, key))''')
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+
+    def get(self, namespace, key):
+        '''Returns cached value or None if there is no value for key.'''
+        row = self._conn.execute('SELECT value FROM results WHERE namespace = ? AND key = ?', (namespace, key)).fetchone()
+        if row is None:
+            self.misses[namespace] += 1
+            return None
+        self.hits[namespace] += 1
+        self._conn.execute('UPDATE results SET last_used = ? WHERE namespace = ? AND key = ?', (time.time(), namespace, key))
+        return json.loads(row[0])
+
+
+    def put(self, namespace, key, value, fingerprint=""):
+        self._conn.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)', (namespace, key, fingerprint, json.dumps(value), time.time()))
+
+
+    def evict_stale(self, namespace, fingerprint):
+        '''Removes entries of namespace computed by code with other fingerprint. Returns number of removed entries.'''
+        cursor = self._conn.execute('DELETE FROM results WHERE namespace = ? AND fingerprint != ?', (namespace, fingerprint))
+        return cursor.rowcount
+
+
+    def evict_older_than(self, seconds):
+        '''Removes entries that were not used for given number of seconds. Returns number of removed entries.'''
+        cursor = self._conn.execute('DELETE FROM results WHERE last_used < ?', (time.time() - seconds,))
+        return cursor.rowcount
+
+
+    def hit_rate(self, namespace):
+        lookups = self.hits[namespace] + self.misses[namespace]
+        return self.hits[namespace] / lookups if lookups else 0.0
+
+
+    def report(self):
+        '''Returns one line with hits, misses and hit rate for every used namespace.'''
+        lines = []
+        for namespace in sorted(set(self.hits) | set(self.misses)):
+            lines.append("cache\t%s\thits\t%d\tmisses\t%d\thit_rate\t%f" % (namespace, self.hits[namespace], self.misses[namespace], self.hit_rate(namespace)))
+        return "\n".join(lines)
+
+
+    def commit(self):
+        self._conn.commit()
+
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -1,3 +1,8 @@
+import time
+
+from .parallel import span_tokenize_parallel, span_tokenize_threaded, tokenizer_factory_for
+from .spans import SpanArray
+from .stats import STAGE_NORMALIZE, STAGE_SENTENCES, STAGE_WORDS
 
 
 def shift_spans_by_offset(spans, offset):
@@ -7,6 +12,13 @@ def shift_spans_by_offset(spans, offset):
 
 
 
+def supports_fused_cascade(sent_tokenizer, word_tokenizer):
+    '''Checks if sentence and word tokenizer can share normalized text (see CascadeTokenizer).'''
+    return (hasattr(sent_tokenizer, 'normalize') and hasattr(sent_tokenizer, 'span_tokenize_normalized') and
+            hasattr(word_tokenizer, 'span_tokenize_window'))
+
+
+
 class CascadeTokenizer:
     '''
     Combines sentence and word tokenizer into one:
@@ -14,10 +26,27 @@ class CascadeTokenizer:
       - Then segment each sentence by running word tokenizer to get word boundaries.
 
     The only requirement for tokenizers that will be combined is that they implement span_tokenize(text) method.
+
+    If sentence tokenizer implements normalize(text) and span_tokenize_normalized(norm_text) and word tokenizer implements
+    span_tokenize_window(norm_text, start, end), text is normalized only once and word tokenizer runs directly on sentence
+    windows of normalized text, without copying sentences and shifting word spans.
+
+    Instrumentation is enabled by setting stats attribute to stats.TokenizerStats. When it is None (default) the only
+    cost is one attribute check per call.
+
+    Memoization of repeated texts and sentences is enabled by setting memo attribute to memo.TokenizerMemo. It is not
+    used while stats are collected, so that stage times describe the actual work.
+
+    Tokenizer is thread safe if sentence and word tokenizers are: tokenization only reads tokenizer attributes and
+    keeps its state in local variables. Stats and memo are shared and lock their updates. They are not copied to
+    worker processes.
     '''
-    def __init__(self, sent_tokenizer, word_tokenizer):
+    def __init__(self, sent_tokenizer, word_tokenizer, fused=True):
         self._sent_tokenizer = sent_tokenizer
         self._word_tokenizer = word_tokenizer
+        self._fused = fused and supports_fused_cascade(sent_tokenizer, word_tokenizer)
+        self.stats = None
+        self.memo = None
     
 
     def _sentence_word_segments(self, text, sent_span):
@@ -35,6 +64,13 @@ class CascadeTokenizer:
         :param text: Input text
         returns: List of (start, end) pairs that represent sentence spans. Sentence is text[start:end].
         '''
+        if self.stats is not None:
+            start_time = time.perf_counter()
+            sent_spans = list(self._sent_tokenizer.span_tokenize(text))
+            # text is counted as document, its words are added by span_tokenize_words of every sentence
+            self.stats.add_document(text, sent_spans, None, {STAGE_SENTENCES: time.perf_counter() - start_time})
+            return sent_spans
+
         return list(self._sent_tokenizer.span_tokenize(text))
 
 
@@ -45,6 +81,15 @@ class CascadeTokenizer:
         :param text: Input text
         returns: List of (start, end) pairs that represent word spans. Word is text[start:end].
         '''
+        if self.stats is not None:
+            start_time = time.perf_counter()
+            word_spans = list(self._word_tokenizer.span_tokenize(text))
+            self.stats.add_stage(STAGE_WORDS, time.perf_counter() - start_time)
+            self.stats.add_tokens(word_spans)
+            return word_spans
+        if self.memo is not None:
+            return self._memoized_sentence_spans(text, 0)
+
         return list(self._word_tokenizer.span_tokenize(text))
 
 
@@ -55,12 +100,198 @@ class CascadeTokenizer:
         :param text: Input text
         returns: List of (start, end) pairs that represent word spans. Word is text[start:end].
         '''
+        if self.stats is not None:
+            return self._span_tokenize_instrumented(text)
+        if self.memo is not None:
+            return self._span_tokenize_memoized(text)
+        if self._fused:
+            return self._span_tokenize_fused(text)
+
         sent_segments = self._sent_tokenizer.span_tokenize(text)
         word_segments = []
         for sent_span in sent_segments:
             word_segments.extend(self._sentence_word_segments(text, sent_span))
         return word_segments
+
+
+    def _span_tokenize_fused(self, text):
+        norm_text = self._sent_tokenizer.normalize(text)
+        word_segments = []
+        for sent_start, sent_end in self._sent_tokenizer.span_tokenize_normalized(norm_text):
+            word_segments.extend(self._word_tokenizer.span_tokenize_window(norm_text, sent_start, sent_end))
+        return word_segments
+
+
+    def _memoized_sentence_spans(self, sent, offset):
+        '''Returns word spans of sentence shifted by offset, word tokenizer runs only if sentence is not in memo.'''
+        word_spans = self.memo.sentences.get(sent)
+        if word_spans is None:
+            word_spans = tuple(self._word_tokenizer.span_tokenize(sent))
+            self.memo.sentences.put(sent, word_spans)
+        if offset:
+            return [(start + offset, end + offset) for start, end in word_spans]
+        return list(word_spans)
+
+
+    def _span_tokenize_memoized(self, text):
+        '''Same as span_tokenize, but spans of texts and sentences seen before are taken from self.memo.'''
+        word_spans = self.memo.texts.get(text)
+        if word_spans is not None:
+            return list(word_spans)
+
+        word_segments = []
+        if self._fused:
+            # sentences of normalized text, word tokenizer normalizes them again only on memo miss
+            norm_text = self._sent_tokenizer.normalize(text)
+            for sent_start, sent_end in self._sent_tokenizer.span_tokenize_normalized(norm_text):
+                word_segments.extend(self._memoized_sentence_spans(norm_text[sent_start:sent_end], sent_start))
+        else:
+            for sent_start, sent_end in self._sent_tokenizer.span_tokenize(text):
+                word_segments.extend(self._memoized_sentence_spans(text[sent_start:sent_end], sent_start))
+        self.memo.texts.put(text, tuple(word_segments))
+        return word_segments
+
+
+    def _span_tokenize_instrumented(self, text):
+        '''Same as span_tokenize, but every stage is timed and results are recorded in self.stats.'''
+        stage_seconds = {}
+        start_time = time.perf_counter()
+        if self._fused:
+            norm_text = self._sent_tokenizer.normalize(text)
+            normalized_time = time.perf_counter()
+            stage_seconds[STAGE_NORMALIZE] = normalized_time - start_time
+            sent_spans = list(self._sent_tokenizer.span_tokenize_normalized(norm_text))
+            sentences_time = time.perf_counter()
+            stage_seconds[STAGE_SENTENCES] = sentences_time - normalized_time
+            word_segments = []
+            for sent_start, sent_end in sent_spans:
+                word_segments.extend(self._word_tokenizer.span_tokenize_window(norm_text, sent_start, sent_end))
+        else:
+            # normalization, if any, is part of sentence and word stages
+            sent_spans = list(self._sent_tokenizer.span_tokenize(text))
+            sentences_time = time.perf_counter()
+            stage_seconds[STAGE_SENTENCES] = sentences_time - start_time
+            word_segments = []
+            for sent_span in sent_spans:
+                word_segments.extend(self._sentence_word_segments(text, sent_span))
+        stage_seconds[STAGE_WORDS] = time.perf_counter() - sentences_time
+
+        self.stats.add_document(text, sent_spans, word_segments, stage_seconds)
+        return word_segments
+
     
+    def span_tokenize_sentence_words(self, text):
+        '''
+        Runs the cascade and keeps both levels of segmentation.
+
+        :param text: Input text
+        returns: List of (sent_start, sent_end, word_spans) for every sentence, word_spans are the same (start, end)
+        pairs that span_tokenize returns for the words of this sentence.
+        '''
+        if self.stats is not None:
+            return self._span_tokenize_sentence_words_instrumented(text)
+        if self.memo is not None:
+            return self._span_tokenize_sentence_words_memoized(text)
+        if self._fused:
+            norm_text = self._sent_tokenizer.normalize(text)
+            return [(sent_start, sent_end, self._word_tokenizer.span_tokenize_window(norm_text, sent_start, sent_end))
+                    for sent_start, sent_end in self._sent_tokenizer.span_tokenize_normalized(norm_text)]
+        return [(sent_start, sent_end, self._sentence_word_segments(text, (sent_start, sent_end)))
+                for sent_start, sent_end in self._sent_tokenizer.span_tokenize(text)]
+
+
+    def _span_tokenize_sentence_words_memoized(self, text):
+        '''Same as span_tokenize_sentence_words, but word spans of sentences seen before are taken from self.memo.'''
+        if self._fused:
+            sent_text = self._sent_tokenizer.normalize(text)
+            sent_spans = self._sent_tokenizer.span_tokenize_normalized(sent_text)
+        else:
+            sent_text = text
+            sent_spans = self._sent_tokenizer.span_tokenize(text)
+        return [(sent_start, sent_end, self._memoized_sentence_spans(sent_text[sent_start:sent_end], sent_start))
+                for sent_start, sent_end in sent_spans]
+
+
+    def _span_tokenize_sentence_words_instrumented(self, text):
+        '''Same as span_tokenize_sentence_words, but every stage is timed and results are recorded in self.stats.'''
+        stage_seconds = {}
+        start_time = time.perf_counter()
+        if self._fused:
+            norm_text = self._sent_tokenizer.normalize(text)
+            normalized_time = time.perf_counter()
+            stage_seconds[STAGE_NORMALIZE] = normalized_time - start_time
+            sent_spans = list(self._sent_tokenizer.span_tokenize_normalized(norm_text))
+            sentences_time = time.perf_counter()
+            stage_seconds[STAGE_SENTENCES] = sentences_time - normalized_time
+            sent_words = [(sent_start, sent_end, self._word_tokenizer.span_tokenize_window(norm_text, sent_start, sent_end))
+                          for sent_start, sent_end in sent_spans]
+        else:
+            sent_spans = list(self._sent_tokenizer.span_tokenize(text))
+            sentences_time = time.perf_counter()
+            stage_seconds[STAGE_SENTENCES] = sentences_time - start_time
+            sent_words = [(sent_start, sent_end, self._sentence_word_segments(text, (sent_start, sent_end)))
+                          for sent_start, sent_end in sent_spans]
+        stage_seconds[STAGE_WORDS] = time.perf_counter() - sentences_time
+
+        word_segments = [word_span for _, _, word_spans in sent_words for word_span in word_spans]
+        self.stats.add_document(text, sent_spans, word_segments, stage_seconds)
+        return sent_words
+
+
+    def span_tokenize_compact(self, text):
+        '''
+        Same as span_tokenize, but word spans are returned as SpanArray, which needs much less memory than list of tuples.
+
+        :param text: Input text
+        returns: SpanArray with (start, end) word spans. Word is text[start:end].
+        '''
+        if self.stats is not None or self.memo is not None or not self._fused:
+            return SpanArray(self.span_tokenize(text))
+
+        norm_text = self._sent_tokenizer.normalize(text)
+        word_segments = SpanArray()
+        for sent_start, sent_end in self._sent_tokenizer.span_tokenize_normalized(norm_text):
+            word_segments.extend(self._word_tokenizer.span_tokenize_window(norm_text, sent_start, sent_end))
+        return word_segments
+
+
+    def span_tokenize_many(self, texts, workers=None, chunksize=None, compact=False, threads=False):
+        '''
+        Run span_tokenize on many texts using pool of worker processes. Results are returned in input order.
+
+        :param texts: Iterable of input texts
+        :param workers: Number of worker processes or threads. If None os.cpu_count() is used. If 1 texts are tokenized in this process.
+        :param chunksize: Number of texts sent to worker in one task. If None it is chosen based on the number of texts.
+        :param compact: Return SpanArray instead of list of tuples for every text (see span_tokenize_compact).
+        :param threads: Use thread pool that shares this tokenizer instead of processes (see parallel.span_tokenize_threaded).
+            It scales with threads only on free-threaded Python.
+        returns: List with list of (start, end) word spans for every input text.
+        '''
+        if workers == 1:
+            if compact:
+                return [self.span_tokenize_compact(text) for text in texts]
+            return [list(self.span_tokenize(text)) for text in texts]
+        if threads:
+            return span_tokenize_threaded(self, texts, workers, chunksize, compact)
+        return span_tokenize_parallel(self.worker_factory(), texts, workers, chunksize, compact)
+
+
+    def __getstate__(self):
+        # stats and memo belong to this process and can't be pickled because of their locks
+        state = self.__dict__.copy()
+        state['stats'] = None
+        state['memo'] = None
+        return state
+
+
+    def worker_factory(self):
+        '''
+        Returns picklable callable that creates tokenizer equivalent to this one inside worker process.
+        By default tokenizer is pickled and sent to every worker once, subclasses can override this to build tokenizer in worker instead.
+        '''
+        return tokenizer_factory_for(self)
+
+
     def tokenize(self, text):
         '''
         Run cascade of sentence tokenizer and word tokenizer and return list of word strings.
@@ -70,3 +301,17 @@ class CascadeTokenizer:
         '''
         return [text[start:end] for start, end in self.span_tokenize(text)]
 
+
+    def tokenize_ids(self, text, vocabulary, per_sentence=False):
+        '''
+        Run cascade and map words to integer ids, without building list of word strings.
+
+        :param text: Input text
+        :param vocabulary: vocab.Vocabulary, it grows with new words unless it is frozen.
+        :param per_sentence: Return one array per sentence.
+        returns: Array of word ids, or list of arrays for every sentence if per_sentence is True.
+        '''
+        if per_sentence:
+            return [vocabulary.encode(text, word_spans) for _, _, word_spans in self.span_tokenize_sentence_words(text)]
+        return vocabulary.encode(text, self.span_tokenize(text))
+
@@ -0,0 +1,103 @@
+import re
+
+
+#
+# Approximate sentence splitter for bulk jobs where speed matters more than the last bit of accuracy.
+#
+# One compiled regex finds every run of sentence end characters that is followed by whitespace, together with the
+# first character after the whitespace. The word before it is looked up only for a single period. The decision uses
+# only the abbreviation set, there are no ortho context, collocation or sentence starter statistics as in Punkt:
+#   - ? and ! always end the sentence
+#   - abbreviation followed by period doesn't end the sentence
+#   - initial (single letter) followed by period doesn't end the sentence
+#   - number followed by period (ordinal) and ellipsis end the sentence only if the next word is not lowercase
+#   - any other word followed by period ends the sentence
+#
+# Closing quotes and braces after the end characters belong to the sentence, like Punkt boundary realignment does.
+#
+
+# run of sentence end characters and closing quotes followed by whitespace, with the next non space character
+# quotes are listed with variants that normalize_text replaces, so text doesn't have to be normalized
+_RE_CANDIDATE = re.compile(r'([.?!]+)[\"\'\)\]»”“ˮ’‘]*(?=\s+(\S))')
+
+# opening quotes and braces which are not part of the word before period
+_OPENING = "\"'([«„“‚‘"
+
+_RE_NUMBER = re.compile(r'\d+(?:[.,]\d+)*')
+
+# abbreviation types learned by Punkt have all digits replaced by 0, as normalize_text does
+_DIGITS_TO_ZERO = str.maketrans("123456789", "000000000")
+
+
+def abbreviation_key(abbreviation):
+    '''
+    Returns lowercase word that precedes period for an abbreviation written as in abbreviations dictionary or as Punkt
+    abbreviation type: trailing period is removed and only the last word of multi word entry is kept ("и тд." -> "тд").
+    Empty string is returned for entries that can't precede period.
+    '''
+    if not abbreviation.strip(". ") or abbreviation.isupper():
+        # acronyms like "ЕУ" are not written with period
+        return ""
+    return abbreviation.rstrip(".").split()[-1].lower()
+
+
+class FastSentenceTokenizer:
+    '''
+    Approximate sentence tokenizer driven only by a set of abbreviations, see comment at the top of the module.
+    It is several times faster than Punkt, but it misses boundaries that Punkt finds with ortho context and it splits
+    after unknown abbreviations.
+
+    Characters that normalize_text replaces are handled by the regex, so text is not normalized: normalization costs
+    more than splitting itself. normalize() is provided only for fused CascadeTokenizer, which shares normalized text
+    with word tokenizer. Tokenizer is only read after construction, so it is thread safe.
+
+    :param abbreviations: Abbreviations as Punkt abbreviation types ("др") or as written in dictionary ("и тд.").
+    :param normalize: Function that normalizes text without changing its length.
+    '''
+    def __init__(self, abbreviations, normalize):
+        self.abbreviations = frozenset(key for key in map(abbreviation_key, abbreviations) if key)
+        self._normalize = normalize
+
+
+    def normalize(self, text):
+        return self._normalize(text)
+
+
+    def _is_break(self, text, start, end_chars, next_char):
+        if end_chars != ".":
+            if end_chars.strip(".") == "":
+                # ellipsis
+                return not next_char.islower()
+            return True
+        word_start = max(text.rfind(" ", 0, start), text.rfind("\n", 0, start), text.rfind("\xa0", 0, start)) + 1
+        word = text[word_start:start].lstrip(_OPENING).lower().translate(_DIGITS_TO_ZERO)
+        if word in self.abbreviations or word.split("-")[-1] in self.abbreviations:
+            return False
+        if len(word) == 1 and word.isalpha():
+            return False
+        if _RE_NUMBER.fullmatch(word):
+            return not next_char.islower()
+        return True
+
+
+    def span_tokenize(self, text):
+        '''Returns list of (start, end) sentence spans. Text doesn't need to be normalized, spans are the same.'''
+        spans = []
+        start = 0
+        for m in _RE_CANDIDATE.finditer(text):
+            if self._is_break(text, m.start(), m.group(1), m.group(2)):
+                spans.append((start, m.end()))
+                start = m.start(2)
+        end = len(text.rstrip())
+        if end > start:
+            spans.append((start, end))
+        return spans
+
+
+    def span_tokenize_normalized(self, norm_text):
+        '''Same as span_tokenize, used by fused CascadeTokenizer for text already normalized by normalize().'''
+        return self.span_tokenize(norm_text)
+
+
+    def tokenize(self, text):
+        return [text[start:end] for start, end in self.span_tokenize(text)]
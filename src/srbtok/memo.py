@@ -0,0 +1,136 @@
+import sys
+import json
+import threading
+from collections import OrderedDict
+
+
+# approximate size of one cached (start, end) tuple with its two ints
+SPAN_BYTES = 120
+
+
+def spans_size(key, spans):
+    '''Approximate memory in bytes of cache entry with text key and tuple of spans.'''
+    return sys.getsizeof(key) + sys.getsizeof(spans) + len(spans) * SPAN_BYTES
+
+
+class LRUCache:
+    '''
+    Least recently used cache bounded by number of entries and by approximate size in bytes. When a new entry
+    exceeds any of the limits, least recently used entries are evicted until it fits.
+
+    Hits, misses and evictions are counted, so the limits can be sized from as_dict() on real input. All operations
+    hold a lock, so cache can be shared by threads.
+
+    :param max_entries: Maximal number of entries. If None number of entries is not limited.
+    :param max_bytes: Maximal approximate size of keys and values in bytes. If None size is not limited.
+    :param sizeof: Function that returns size of entry from key and value.
+    '''
+    def __init__(self, max_entries=None, max_bytes=None, sizeof=spans_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+
+    def __len__(self):
+        return len(self._entries)
+
+
+    def __contains__(self, key):
+        return key in self._entries
+
+
+    def get(self, key):
+        '''Returns cached value and marks it as recently used, or None if key is not cached.'''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[0]
+
+
+    def put(self, key, value):
+        '''Adds value, entries that don't fit in the limits are evicted. Value larger than max_bytes is not cached.'''
+        size = self.sizeof(key, value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while ((self.max_entries is not None and len(self._entries) > self.max_entries) or
+                   (self.max_bytes is not None and self.bytes > self.max_bytes)):
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+    def as_dict(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hit_rate(),
+            }
+
+
+def _split_limit(limit):
+    '''Splits limit into two halves whose sum is limit, None stays unlimited for both.'''
+    if limit is None:
+        return None, None
+    return limit // 2, limit - limit // 2
+
+
+class TokenizerMemo:
+    '''
+    Memoization of CascadeTokenizer results for repeated input, e.g. bylines, agency tags and legal footers in news.
+
+    Set it as CascadeTokenizer.memo to enable it. There are two caches that share the limits, each gets one half:
+      - texts: word spans of whole texts passed to span_tokenize (lines when stream is tokenized)
+      - sentences: word spans of single sentences, relative to sentence start
+
+    :param max_entries: Maximal total number of entries of both caches. If None number of entries is not limited.
+    :param max_bytes: Maximal total approximate size of both caches in bytes. If None size is not limited.
+    '''
+    def __init__(self, max_entries=None, max_bytes=None):
+        texts_entries, sentences_entries = _split_limit(max_entries)
+        texts_bytes, sentences_bytes = _split_limit(max_bytes)
+        self.texts = LRUCache(texts_entries, texts_bytes)
+        self.sentences = LRUCache(sentences_entries, sentences_bytes)
+
+
+    def clear(self):
+        self.texts.clear()
+        self.sentences.clear()
+
+
+    def as_dict(self):
+        return {"texts": self.texts.as_dict(), "sentences": self.sentences.as_dict()}
+
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
@@ -0,0 +1,135 @@
+import os
+import functools
+import collections
+import multiprocessing
+import concurrent.futures
+
+
+# ##########################################################################
+# Process pool where every worker owns one tokenizer instance.
+# ##########################################################################
+
+# tokenizer created by pool initializer, one per worker process
+_worker_tokenizer = None
+
+
+def _identity(obj):
+    return obj
+
+
+def tokenizer_factory_for(tokenizer):
+    '''
+    Returns picklable factory that gives workers their own copy of already constructed tokenizer.
+    The tokenizer is pickled once per worker, not once per task.
+    '''
+    return functools.partial(_identity, tokenizer)
+
+
+def _init_worker(tokenizer_factory):
+    global _worker_tokenizer
+    _worker_tokenizer = tokenizer_factory()
+
+
+def get_worker_tokenizer():
+    '''Returns tokenizer owned by current worker process.'''
+    return _worker_tokenizer
+
+
+def create_worker_pool(tokenizer_factory, workers=None):
+    '''
+    Creates process pool in which every worker calls tokenizer_factory() once on startup.
+
+    :param tokenizer_factory: Picklable callable without arguments which returns tokenizer.
+    :param workers: Number of worker processes. If None os.cpu_count() is used.
+    '''
+    return multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=(tokenizer_factory,))
+
+
+def _span_tokenize(text):
+    return _worker_tokenizer.span_tokenize(text)
+
+
+def _span_tokenize_compact(text):
+    return _worker_tokenizer.span_tokenize_compact(text)
+
+
+def span_tokenize_parallel(tokenizer_factory, texts, workers=None, chunksize=None, compact=False):
+    '''
+    Runs span_tokenize (or span_tokenize_compact if compact is True) on every text in worker pool.
+
+    :param tokenizer_factory: Picklable callable without arguments which returns tokenizer.
+    :param texts: Iterable of input texts
+    :param workers: Number of worker processes. If None os.cpu_count() is used.
+    :param chunksize: Number of texts sent to worker in one task. If None it is chosen based on the number of texts.
+    :param compact: Return SpanArray for each text, which is also much faster to pickle when sent back from workers.
+    returns: List of word spans for each text, in the same order as input texts.
+    '''
+    with create_worker_pool(tokenizer_factory, workers) as pool:
+        return pool.map(_span_tokenize_compact if compact else _span_tokenize, texts, chunksize)
+
+
+def _run_with_worker_tokenizer(task):
+    func, args = task
+    return func(_worker_tokenizer, *args)
+
+
+def imap_with_tokenizer(tokenizer_factory, func, args_iter, workers=None, max_pending=None):
+    '''
+    Calls func(tokenizer, *args) in worker pool for every args tuple and yields results in input order.
+
+    Unlike Pool.imap input is consumed lazily: at most max_pending tasks are submitted and not yet yielded, so memory
+    stays bounded when input is a large stream.
+
+    :param tokenizer_factory: Picklable callable without arguments which returns tokenizer.
+    :param func: Picklable (module level) function whose first argument is tokenizer.
+    :param args_iter: Iterable of argument tuples
+    :param workers: Number of worker processes. If None os.cpu_count() is used.
+    :param max_pending: Maximal number of submitted tasks that are not yielded. Default is twice the number of workers.
+    '''
+    workers = workers or os.cpu_count()
+    max_pending = max_pending or 2 * workers
+    with create_worker_pool(tokenizer_factory, workers) as pool:
+        pending = collections.deque()
+        for args in args_iter:
+            pending.append(pool.apply_async(_run_with_worker_tokenizer, ((func, args),)))
+            if len(pending) >= max_pending:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+# ##########################################################################
+# Thread pool sharing one tokenizer.
+# ##########################################################################
+
+def _span_tokenize_texts(span_tokenize, texts):
+    return [span_tokenize(text) for text in texts]
+
+
+def span_tokenize_threaded(tokenizer, texts, workers=None, chunksize=None, compact=False):
+    '''
+    Same as span_tokenize_parallel, but texts are tokenized in thread pool by one shared tokenizer. Nothing is pickled
+    and the model is in memory once. Threads run in parallel only on free-threaded Python, with GIL this gives
+    concurrency but not speedup.
+
+    :param tokenizer: Thread safe tokenizer, e.g. SrbTokenizer
+    :param texts: Iterable of input texts
+    :param workers: Number of threads. If None os.cpu_count() is used.
+    :param chunksize: Number of texts tokenized by thread in one task. If None it is chosen based on the number of texts.
+    :param compact: Return SpanArray for each text.
+    returns: List of word spans for each text, in the same order as input texts.
+    '''
+    texts = list(texts)
+    workers = workers or os.cpu_count()
+    if chunksize is None:
+        # same heuristic as multiprocessing.Pool.map
+        chunksize, extra = divmod(len(texts), workers * 4)
+        chunksize += 1 if extra else 0
+    chunksize = max(chunksize, 1)
+    span_tokenize = tokenizer.span_tokenize_compact if compact else tokenizer.span_tokenize
+    chunks = [texts[i:i + chunksize] for i in range(0, len(texts), chunksize)]
+    with concurrent.futures.ThreadPoolExecutor(workers, thread_name_prefix="srbtok") as executor:
+        results = []
+        for chunk_results in executor.map(functools.partial(_span_tokenize_texts, span_tokenize), chunks):
+            results.extend(chunk_results)
+        return results
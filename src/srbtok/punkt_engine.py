@@ -0,0 +1,217 @@
+import re
+
+from nltk.tokenize.punkt import PunktToken, PunktSentenceTokenizer
+from nltk.tokenize.punkt import _ORTHO_LC, _ORTHO_UC, _ORTHO_MID_UC, _ORTHO_BEG_LC
+
+
+#
+# Runtime sentence boundary detection with learned PunktParameters, without NLTK machinery.
+#
+# NLTK finds candidate ends with period context regex and for every candidate runs text_contains_sentbreak on the
+# context: the word before, the end character and the next token. It creates PunktToken for every token of the
+# context and runs both annotation passes through chained generators. PunktEngine makes the same decisions directly
+# on token strings: the first pass is one function of the token, the second pass looks only at pairs of tokens where
+# the first one ends with period. Parameters are copied to frozensets and plain dictionary, so lookups don't insert
+# missing keys into ortho_context defaultdict.
+#
+# Every step follows NLTK 3.9 code, including its quirks (ASCII only whitespace when looking for the word before
+# candidate, overlapping contexts), so boundaries are exactly the same.
+#
+
+# matches up to the last whitespace character, same characters as string.whitespace used by
+# PunktSentenceTokenizer._get_last_whitespace_index
+_RE_UP_TO_LAST_SPACE = re.compile(r'.*[ \t\n\r\x0b\x0c]', re.DOTALL)
+
+_RE_NUMERIC = PunktToken._RE_NUMERIC
+_RE_ELLIPSIS = PunktToken._RE_ELLIPSIS
+_RE_INITIAL = PunktToken._RE_INITIAL
+_PUNCTUATION = frozenset(PunktSentenceTokenizer.PUNCTUATION)
+
+# first pass annotation of token
+_NONE = 0
+_SENTBREAK = 1
+_ABBR = 2
+_ELLIPSIS = 3
+
+
+def _token_type(tok):
+    '''Same as PunktToken.type'''
+    return _RE_NUMERIC.sub("##number##", tok.lower())
+
+
+def _type_no_period(typ):
+    if len(typ) > 1 and typ[-1] == ".":
+        return typ[:-1]
+    return typ
+
+
+class PunktEngine:
+    '''
+    Sentence splitter that gives the same spans as PunktSentenceTokenizer.span_tokenize with the same parameters and
+    language variables. Parameters are copied when engine is created, later changes of params are not seen.
+
+    Engine is immutable after construction and can be shared by threads.
+
+    :param params: PunktParameters
+    :param lang_vars: PunktLanguageVars, its regexes are compiled here.
+    '''
+    def __init__(self, params, lang_vars):
+        self.abbrev_types = frozenset(params.abbrev_types)
+        self.collocations = frozenset(params.collocations)
+        self.sent_starters = frozenset(params.sent_starters)
+        self.ortho_context = {typ: flags for typ, flags in params.ortho_context.items() if flags}
+        self.sent_end_chars = frozenset(lang_vars.sent_end_chars)
+        self._period_context_re = lang_vars.period_context_re()
+        self._word_tokenizer_re = lang_vars._word_tokenizer_re()
+        self._boundary_realignment_re = lang_vars.re_boundary_realignment
+
+
+    # ##########################################################################
+    # Token annotation
+    # ##########################################################################
+
+    def _first_pass(self, tok):
+        '''Same as PunktBaseClass._first_pass_annotation.'''
+        if tok in self.sent_end_chars:
+            return _SENTBREAK
+        if tok[-1] != ".":
+            return _NONE
+        if tok[0] == "." and _RE_ELLIPSIS.match(tok):
+            return _ELLIPSIS
+        if tok.endswith(".."):
+            return _NONE
+        typ = tok[:-1].lower()
+        if typ in self.abbrev_types or typ.split("-")[-1] in self.abbrev_types:
+            return _ABBR
+        return _SENTBREAK
+
+
+    def _ortho_heuristic(self, tok, type_no_sentperiod):
+        '''Same as PunktSentenceTokenizer._ortho_heuristic, returns True, False or None if unknown.'''
+        if tok in _PUNCTUATION:
+            return False
+        ortho_context = self.ortho_context.get(type_no_sentperiod, 0)
+        if tok[0].isupper() and (ortho_context & _ORTHO_LC) and not (ortho_context & _ORTHO_MID_UC):
+            return True
+        if tok[0].islower() and ((ortho_context & _ORTHO_UC) or not (ortho_context & _ORTHO_BEG_LC)):
+            return False
+        return None
+
+
+    def _is_sentbreak(self, tok1, annotation1, tok2, annotation2):
+        '''
+        Returns True if tok1 is sentence break after PunktSentenceTokenizer._second_pass_annotation with the next
+        token tok2. annotation1 and annotation2 are results of the first pass.
+        '''
+        if tok1[-1] != ".":
+            return annotation1 == _SENTBREAK
+
+        typ = _type_no_period(_token_type(tok1))
+        next_typ = _token_type(tok2)
+        if annotation2 == _SENTBREAK:
+            next_typ = _type_no_period(next_typ)
+        tok_is_initial = _RE_INITIAL.match(tok1)
+
+        if (typ, next_typ) in self.collocations:
+            return False
+
+        if (annotation1 == _ABBR or annotation1 == _ELLIPSIS) and not tok_is_initial:
+            if self._ortho_heuristic(tok2, next_typ) is True:
+                return True
+            if tok2[0].isupper() and next_typ in self.sent_starters:
+                return True
+
+        if tok_is_initial or typ == "##number##":
+            is_sent_starter = self._ortho_heuristic(tok2, next_typ)
+            if is_sent_starter is False:
+                return False
+            if (is_sent_starter is None and tok_is_initial and tok2[0].isupper() and
+                    not (self.ortho_context.get(next_typ, 0) & _ORTHO_LC)):
+                return False
+
+        return annotation1 == _SENTBREAK
+
+
+    def text_contains_sentbreak(self, text):
+        '''Same as PunktSentenceTokenizer.text_contains_sentbreak: True if any token but the last one is sentence break.'''
+        if "\n" in text:
+            tokens = []
+            for line in text.split("\n"):
+                if line.strip():
+                    tokens.extend(self._word_tokenizer_re.findall(line))
+        else:
+            tokens = self._word_tokenizer_re.findall(text)
+        if len(tokens) < 2:
+            return False
+
+        annotations = [self._first_pass(tok) for tok in tokens]
+        for i in range(len(tokens) - 1):
+            if annotations[i] == _NONE:
+                # second pass sets sentence break only on abbreviations and ellipsis
+                continue
+            if self._is_sentbreak(tokens[i], annotations[i], tokens[i + 1], annotations[i + 1]):
+                return True
+        return False
+
+
+    # ##########################################################################
+    # Sentence spans
+    # ##########################################################################
+
+    def _potential_end_contexts(self, text):
+        '''Same as PunktSentenceTokenizer._match_potential_end_contexts, yields (match, context).'''
+        prev_start = prev_stop = 0
+        prev_match = None
+        for match in self._period_context_re.finditer(text):
+            match_start = match.start()
+            # start of the word before match, nltk ignores whitespace at the first position after previous match
+            m = _RE_UP_TO_LAST_SPACE.match(text, prev_stop, match_start)
+            word_start = m.end() if m is not None and m.end() > prev_stop + 1 else prev_start
+
+            if prev_match is not None and prev_stop <= word_start:
+                yield prev_match, text[prev_start:prev_stop] + prev_match.group() + prev_match.group("after_tok")
+            prev_match = match
+            prev_start, prev_stop = word_start, match_start
+
+        if prev_match is not None:
+            yield prev_match, text[prev_start:prev_stop] + prev_match.group() + prev_match.group("after_tok")
+
+
+    def _sentence_slices(self, text):
+        '''Same as PunktSentenceTokenizer._slices_from_text, yields (start, end).'''
+        last_break = 0
+        for match, context in self._potential_end_contexts(text):
+            if self.text_contains_sentbreak(context):
+                yield last_break, match.end()
+                if match.group("next_tok"):
+                    last_break = match.start("next_tok")
+                else:
+                    last_break = match.end()
+        yield last_break, len(text.rstrip())
+
+
+    def span_tokenize(self, text):
+        '''
+        Returns list of (start, end) sentence spans, same as PunktSentenceTokenizer.span_tokenize with
+        realign_boundaries=True.
+        '''
+        spans = []
+        realign = 0
+        slices = self._sentence_slices(text)
+        start1, end1 = next(slices)
+        for start2, end2 in slices:
+            start1 += realign
+            m = self._boundary_realignment_re.match(text, start2, end2)
+            if m:
+                spans.append((start1, start2 + len(m.group(0).rstrip())))
+                realign = m.end() - start2
+            else:
+                realign = 0
+                if end1 > start1:
+                    spans.append((start1, end1))
+            start1, end1 = start2, end2
+
+        start1 += realign
+        if end1 > start1:
+            spans.append((start1, end1))
+        return spans
@@ -0,0 +1,93 @@
+import struct
+from collections import defaultdict
+from nltk.tokenize.punkt import PunktParameters
+
+
+# ##########################################################################
+# Compact Punkt model format
+# ##########################################################################
+#
+# Binary file that stores PunktParameters without pickle:
+#
+#   magic          8 bytes   b'SRBPUNKT'
+#   version        uint32
+#   section sizes  5 x uint32, in bytes
+#   sections       abbrev_types, collocations, sent_starters, ortho_context types, ortho_context flags
+#
+# All integers are little endian. String sections are sorted UTF-8 entries separated by new line, collocations
+# are stored as "type1<TAB>type2". Ortho context flags are one byte per type, in the same order as ortho context
+# types. Punkt types never contain whitespace, so new line and tab can be used as separators. Every section
+# is loaded with a single decode and split, which is much faster than unpickling python objects one by one.
+
+MODEL_MAGIC = b'SRBPUNKT'
+MODEL_VERSION = 1
+
+_HEADER = struct.Struct('<8sI5I')
+_ENTRY_SEP = '\n'
+_PAIR_SEP = '\t'
+
+
+def _encode_strings(strings):
+    return _ENTRY_SEP.join(sorted(strings)).encode('utf-8')
+
+
+def _decode_strings(data):
+    if not data:
+        return []
+    return data.decode('utf-8').split(_ENTRY_SEP)
+
+
+def save_punkt_params(params, path):
+    '''
+    Saves PunktParameters in compact model format.
+
+    :param params: nltk PunktParameters
+    :param path: Output model file
+    '''
+    ortho_types = sorted(typ for typ, flags in params.ortho_context.items() if flags)
+    sections = [
+        _encode_strings(params.abbrev_types),
+        _encode_strings(_PAIR_SEP.join(pair) for pair in params.collocations),
+        _encode_strings(params.sent_starters),
+        _encode_strings(ortho_types),
+        bytes(params.ortho_context[typ] for typ in ortho_types),
+    ]
+    with open(path, 'wb') as f:
+        f.write(_HEADER.pack(MODEL_MAGIC, MODEL_VERSION, *[len(section) for section in sections]))
+        for section in sections:
+            f.write(section)
+
+
+def load_punkt_params(path):
+    '''
+    Loads PunktParameters saved by save_punkt_params().
+
+    :param path: Model file
+    returns: nltk PunktParameters
+    '''
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if len(data) < _HEADER.size:
+        raise ValueError("Punkt model file is too short: %s" % path)
+    magic, version, *sizes = _HEADER.unpack_from(data)
+    if magic != MODEL_MAGIC:
+        raise ValueError("Not a punkt model file: %s" % path)
+    if version != MODEL_VERSION:
+        raise ValueError("Unsupported punkt model version %d in %s, expected %d" % (version, path, MODEL_VERSION))
+    if _HEADER.size + sum(sizes) != len(data):
+        raise ValueError("Punkt model file size doesn't match its header: %s" % path)
+
+    sections = []
+    offset = _HEADER.size
+    for size in sizes:
+        sections.append(data[offset:offset + size])
+        offset += size
+    abbrev_types, collocations, sent_starters, ortho_types, ortho_flags = sections
+
+    params = PunktParameters()
+    params.abbrev_types = set(_decode_strings(abbrev_types))
+    params.collocations = set(tuple(pair.split(_PAIR_SEP)) for pair in _decode_strings(collocations))
+    params.sent_starters = set(_decode_strings(sent_starters))
+    params.ortho_context = defaultdict(int, zip(_decode_strings(ortho_types), ortho_flags))
+    return params
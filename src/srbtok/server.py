@@ -0,0 +1,431 @@
+import os
+import sys
+import json
+import time
+import queue
+import signal
+import socket
+import argparse
+import threading
+import socketserver
+import http.client
+import concurrent.futures
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from .parallel import create_worker_pool, _run_with_worker_tokenizer
+
+
+#
+# Local tokenization server. Model is loaded once and scripts that tokenize a paragraph at a time don't pay import and
+# model loading cost on every call. Protocols:
+#
+#  - HTTP on localhost, POST /tokenize?format=tokens|spans
+#      Content-Type: application/json  {"text": "..."} -> {"tokens": [...]}
+#                                      {"texts": ["...", ...]} -> {"tokens": [[...], ...]}
+#      any other content type          one text per line -> one JSON array per line (application/x-ndjson)
+#    GET /stats returns batching statistics.
+#  - Unix socket, one JSON request per line, same as HTTP JSON body, and one JSON response per line.
+#    Format can be given in request as "format" key.
+#
+# Requests of all connections are put in one queue and coalesced into micro batches: while workers are busy
+# requests accumulate in the queue and the next batch takes all of them (up to max_batch texts).
+#
+
+DEFAULT_PORT = 8765
+DEFAULT_MAX_BATCH = 64
+FORMATS = ('tokens', 'spans')
+DEFAULT_FORMAT = 'tokens'
+
+
+def process_requests(tokenizer, requests):
+    '''
+    Tokenizes batch of (format, text) requests, runs in worker process.
+    returns: List of word strings or list of (start, end) word spans for every request.
+    '''
+    results = []
+    for fmt, text in requests:
+        word_spans = tokenizer.span_tokenize(text)
+        if fmt == 'spans':
+            results.append(list(word_spans))
+        else:
+            results.append([text[start:end] for start, end in word_spans])
+    return results
+
+
+# ##########################################################################
+# Micro batching
+# ##########################################################################
+
+class MicroBatcher:
+    '''
+    Coalesces concurrent requests into batches that are tokenized in worker pool, or in batcher thread if workers is 1.
+
+    :param tokenizer: Tokenizer used in batcher thread, workers create their own with tokenizer.worker_factory().
+    :param workers: Number of worker processes. If None os.cpu_count() is used.
+    :param max_batch: Maximal number of texts in one batch.
+    :param max_delay: Seconds to wait for more requests before the batch is sent. Default is 0: batch is sent as soon
+        as a worker is free, with requests that arrived while workers were busy.
+    '''
+    def __init__(self, tokenizer, workers=1, max_batch=DEFAULT_MAX_BATCH, max_delay=0.0):
+        self.tokenizer = tokenizer
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue = queue.Queue()
+        self._pool = None
+        if workers != 1:
+            workers = workers or os.cpu_count()
+            self._pool = create_worker_pool(tokenizer.worker_factory(), workers)
+        # one batch per worker is being tokenized, next one is collected meanwhile
+        self._free_workers = threading.Semaphore(workers)
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.texts = 0
+        self.batches = 0
+        self._thread = threading.Thread(target=self._run, name="srbtok-batcher", daemon=True)
+        self._thread.start()
+
+
+    def submit(self, fmt, texts):
+        '''Returns concurrent.futures.Future with list of results for texts.'''
+        if fmt not in FORMATS:
+            raise ValueError("Unknown format %r, expected one of %s" % (fmt, ", ".join(FORMATS)))
+        future = concurrent.futures.Future()
+        if not texts:
+            future.set_result([])
+            return future
+        self._queue.put((fmt, texts, future))
+        return future
+
+
+    def tokenize(self, fmt, texts):
+        '''Returns list of results for texts, waits until their batch is tokenized.'''
+        return self.submit(fmt, texts).result()
+
+
+    def _collect_batch(self, first):
+        batch = [first]
+        size = len(first[1])
+        deadline = time.monotonic() + self.max_delay
+        while size < self.max_batch:
+            try:
+                timeout = deadline - time.monotonic()
+                item = self._queue.get(timeout=timeout) if timeout > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # stop after this batch
+                self._queue.put(None)
+                break
+            batch.append(item)
+            size += len(item[1])
+        return batch
+
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            self._free_workers.acquire()
+            batch = self._collect_batch(first)
+            requests = [(fmt, text) for fmt, texts, _ in batch for text in texts]
+            with self._stats_lock:
+                self.requests += len(batch)
+                self.texts += len(requests)
+                self.batches += 1
+
+            if self._pool is None:
+                try:
+                    self._resolve(batch, process_requests(self.tokenizer, requests))
+                except Exception as e:
+                    self._fail(batch, e)
+            else:
+                self._pool.apply_async(_run_with_worker_tokenizer, ((process_requests, (requests,)),),
+                                       callback=lambda results, batch=batch: self._resolve(batch, results),
+                                       error_callback=lambda e, batch=batch: self._fail(batch, e))
+
+
+    def _resolve(self, batch, results):
+        self._free_workers.release()
+        pos = 0
+        for _, texts, future in batch:
+            future.set_result(results[pos:pos + len(texts)])
+            pos += len(texts)
+
+
+    def _fail(self, batch, error):
+        self._free_workers.release()
+        for _, _, future in batch:
+            future.set_exception(error)
+
+
+    def as_dict(self):
+        with self._stats_lock:
+            return {
+                "requests": self.requests,
+                "texts": self.texts,
+                "batches": self.batches,
+                "mean_batch_texts": self.texts / self.batches if self.batches else 0.0,
+                "queued": self._queue.qsize(),
+            }
+
+
+    def close(self):
+        '''Tokenizes requests that are already queued and stops workers.'''
+        self._queue.put(None)
+        self._thread.join()
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+
+
+def handle_request(batcher, request, default_format=DEFAULT_FORMAT):
+    '''
+    Handles JSON request {"text": str} or {"texts": [str, ...]} with optional "format".
+    returns: Response dictionary with format as key.
+    '''
+    if not isinstance(request, dict):
+        raise ValueError("Request must be JSON object")
+    fmt = request.get('format', default_format)
+    if 'text' in request:
+        texts = [request['text']]
+    elif 'texts' in request:
+        texts = request['texts']
+        if not isinstance(texts, list):
+            raise ValueError("texts must be list of strings")
+    else:
+        raise ValueError("Request must contain text or texts")
+    if not all(isinstance(text, str) for text in texts):
+        raise ValueError("Texts must be strings")
+
+    results = batcher.tokenize(fmt, texts)
+    return {fmt: results[0] if 'text' in request else results}
+
+
+# ##########################################################################
+# Servers
+# ##########################################################################
+
+def split_body_lines(body):
+    '''
+    Splits line delimited request body into texts. Only \n (and \r\n) separate lines, unlike str.splitlines() which
+    also splits on form feed, \u2028 and other characters that can be part of a text. Body can end with new line.
+    '''
+    lines = [line.rstrip('\r') for line in body.split('\n')]
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+class HttpHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately, with Nagle algorithm small responses wait for delayed ACK
+    disable_nagle_algorithm = True
+
+    def _send(self, status, body, content_type='application/json'):
+        body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type + '; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def _send_json(self, status, value):
+        self._send(status, json.dumps(value, ensure_ascii=False))
+
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/stats':
+            self._send_json(200, self.server.batcher.as_dict())
+        else:
+            self._send_json(404, {"error": "Not found"})
+
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        try:
+            content_length = int(self.headers.get('Content-Length', 0))
+            if content_length < 0:
+                raise ValueError("Negative Content-Length")
+        except ValueError as e:
+            # body can't be read, so the connection can't be reused
+            self.close_connection = True
+            self._send_json(400, {"error": "Invalid Content-Length: %s" % e})
+            return
+        # body is read before any response, so the connection can be kept alive
+        body = self.rfile.read(content_length)
+        if url.path != '/tokenize':
+            self._send_json(404, {"error": "Not found"})
+            return
+        fmt = parse_qs(url.query).get('format', [DEFAULT_FORMAT])[0]
+        try:
+            # invalid UTF-8 (UnicodeDecodeError) and invalid JSON are ValueErrors too
+            body = body.decode('utf-8')
+            if self.headers.get_content_type() == 'application/json':
+                response = handle_request(self.server.batcher, json.loads(body), fmt)
+            else:
+                results = self.server.batcher.tokenize(fmt, split_body_lines(body))
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            self._send_json(500, {"error": "%s: %s" % (type(e).__name__, e)})
+            return
+
+        if self.headers.get_content_type() == 'application/json':
+            self._send_json(200, response)
+        else:
+            self._send(200, "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results), 'application/x-ndjson')
+
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super(HttpHandler, self).log_message(format, *args)
+
+
+class UnixSocketHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = handle_request(self.server.batcher, json.loads(line.decode('utf-8')))
+            except ValueError as e:
+                response = {"error": str(e)}
+            except Exception as e:
+                response = {"error": "%s: %s" % (type(e).__name__, e)}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b"\n")
+            self.wfile.flush()
+
+
+class TokenizerHttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, batcher, verbose=False):
+        super(TokenizerHttpServer, self).__init__(address, HttpHandler)
+        self.batcher = batcher
+        self.verbose = verbose
+
+
+class TokenizerUnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, batcher, verbose=False):
+        if os.path.exists(path):
+            os.remove(path)
+        super(TokenizerUnixServer, self).__init__(path, UnixSocketHandler)
+        self.batcher = batcher
+        self.verbose = verbose
+
+
+    def server_close(self):
+        super(TokenizerUnixServer, self).server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+# ##########################################################################
+# Client
+# ##########################################################################
+
+class Client:
+    '''
+    Client of tokenization server with one persistent connection. It doesn't import the tokenizer, so it is cheap to
+    use from short scripts. Not thread safe, use one client per thread.
+
+    :param unix_socket: Path of server Unix socket. If None HTTP is used.
+    :param port: Server HTTP port on localhost.
+    '''
+    def __init__(self, unix_socket=None, port=DEFAULT_PORT, host='127.0.0.1', timeout=None):
+        self.unix_socket = unix_socket
+        if unix_socket is not None:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.settimeout(timeout)
+            self._sock.connect(unix_socket)
+            self._file = self._sock.makefile('rwb')
+        else:
+            self._conn = http.client.HTTPConnection(host, port, timeout=timeout)
+
+
+    def request(self, request):
+        '''Sends JSON request, see handle_request, and returns JSON response.'''
+        if self.unix_socket is not None:
+            self._file.write(json.dumps(request, ensure_ascii=False).encode('utf-8') + b"\n")
+            self._file.flush()
+            response = json.loads(self._file.readline().decode('utf-8'))
+        else:
+            self._conn.request('POST', '/tokenize', json.dumps(request, ensure_ascii=False).encode('utf-8'), {'Content-Type': 'application/json'})
+            response = json.loads(self._conn.getresponse().read().decode('utf-8'))
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response
+
+
+    def tokenize(self, text):
+        return self.request({"text": text, "format": "tokens"})["tokens"]
+
+
+    def span_tokenize(self, text):
+        return [tuple(span) for span in self.request({"text": text, "format": "spans"})["spans"]]
+
+
+    def close(self):
+        if self.unix_socket is not None:
+            self._file.close()
+            self._sock.close()
+        else:
+            self._conn.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# ##########################################################################
+# python -m srbtok serve
+# ##########################################################################
+
+def create_server(tokenizer, unix_socket=None, port=DEFAULT_PORT, workers=1, max_batch=DEFAULT_MAX_BATCH, max_delay=0.0, verbose=False):
+    '''Returns server listening on Unix socket, or on localhost HTTP port if unix_socket is None. Port 0 picks free port.'''
+    batcher = MicroBatcher(tokenizer, workers, max_batch, max_delay)
+    if unix_socket is not None:
+        return TokenizerUnixServer(unix_socket, batcher, verbose)
+    return TokenizerHttpServer(('127.0.0.1', port), batcher, verbose)
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m srbtok serve', description='Runs local tokenization server that keeps the model loaded. Requests are coalesced into batches for worker processes.')
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT, help='HTTP port on localhost.')
+    parser.add_argument('-u', '--unix-socket', help='Listen on this Unix socket instead of HTTP.')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes, 1 means tokenization in server process, 0 means number of CPUs.')
+    parser.add_argument('-mb', '--max-batch', type=int, default=DEFAULT_MAX_BATCH, help='Maximal number of texts in one batch.')
+    parser.add_argument('-md', '--max-delay-ms', type=float, default=0.0, help='Wait this many milliseconds for more requests before batch is sent.')
+    parser.add_argument('-f', '--fast', action='store_true', help='Use approximate fast sentence splitter instead of Punkt, see SrbTokenizer.')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every HTTP request to stderr.')
+    args = parser.parse_args(argv)
+    if args.jobs < 0:
+        parser.error("--jobs must not be negative")
+    if args.max_batch < 1:
+        parser.error("--max-batch must be positive")
+    return args
+
+
+def main(argv):
+    from .srb_tokenizer import get_tokenizer
+
+    args = parse_args(argv)
+    server = create_server(get_tokenizer(args.fast), args.unix_socket, args.port, args.jobs, args.max_batch, args.max_delay_ms / 1000, args.verbose)
+    sys.stderr.write("srbtok server listening on %s\n" % (args.unix_socket or "http://127.0.0.1:%d" % server.server_address[1]))
+    # stop cleanly on SIGTERM too, so Unix socket file is removed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
@@ -0,0 +1,110 @@
+from array import array
+from itertools import chain
+
+
+class SpanArray:
+    '''
+    Compact sequence of (start, end) spans. All offsets are stored in one flat array of 64 bit integers:
+    [start0, end0, start1, end1, ...], instead of a list with one tuple object per span.
+
+    It behaves like read only list of (start, end) tuples: supports len(), indexing, slicing and iteration, so it
+    can be used wherever list of spans is expected, e.g. in word_spans_to_tokenized_text.
+
+    Offsets can be wrapped by NumPy without copying:
+        numpy.frombuffer(spans.buffer, dtype=numpy.int64).reshape(-1, 2)
+    '''
+    __slots__ = ('_data',)
+
+    TYPECODE = 'q'
+
+    def __init__(self, spans=()):
+        self._data = array(self.TYPECODE)
+        self.extend(spans)
+
+
+    @classmethod
+    def from_flat(cls, offsets):
+        '''Creates span array from flat iterable of offsets [start0, end0, start1, end1, ...].'''
+        spans = cls()
+        spans._data.extend(offsets)
+        assert len(spans._data) % 2 == 0, "Flat offsets must have even length"
+        return spans
+
+
+    def append(self, span):
+        start, end = span
+        self._data.append(start)
+        self._data.append(end)
+
+
+    def extend(self, spans):
+        if isinstance(spans, SpanArray):
+            self._data.extend(spans._data)
+        else:
+            self._data.extend(chain.from_iterable(spans))
+
+
+    def shift(self, offset):
+        '''Adds offset to all starts and ends in place.'''
+        data = self._data
+        for i in range(len(data)):
+            data[i] += offset
+        return self
+
+
+    def starts(self):
+        return self._data[0::2]
+
+
+    def ends(self):
+        return self._data[1::2]
+
+
+    @property
+    def buffer(self):
+        '''Flat offsets as memoryview of 64 bit integers, without copying.'''
+        return memoryview(self._data)
+
+
+    def tolist(self):
+        return list(self)
+
+
+    def __len__(self):
+        return len(self._data) // 2
+
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return SpanArray.from_flat(self._data[2 * start:2 * max(start, stop)])
+            return SpanArray(self[i] for i in range(start, stop, step))
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("span index out of range")
+        return (self._data[2 * index], self._data[2 * index + 1])
+
+
+    def __iter__(self):
+        values = iter(self._data)
+        return zip(values, values)
+
+
+    def __eq__(self, other):
+        if isinstance(other, SpanArray):
+            return self._data == other._data
+        try:
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        except TypeError:
+            return NotImplemented
+
+
+    def __repr__(self):
+        return "SpanArray(%r)" % self.tolist()
+
+
+    def __reduce__(self):
+        return (SpanArray.from_flat, (self._data,))
@@ -0,0 +1,336 @@
+import os
+import mmap
+import struct
+from array import array
+
+from .spans import SpanArray
+from .parallel import imap_with_tokenizer
+from .utils import iter_line_blocks, list_corpus_files, DEFAULT_BLOCK_LINES
+
+
+#
+# Binary index of tokenizations: sentence and word boundaries of many documents in one file.
+#
+# Layout, all integers are little endian:
+#   - header: MAGIC
+#   - documents, one after another. Every document is a sequence of unsigned LEB128 varints:
+#       number of sentences, then for every sentence:
+#         sentence start - previous sentence end, sentence length, number of words, then for every word:
+#           word start - previous word end (sentence start for the first word), word length
+#   - zero padding to multiple of 8 bytes
+#   - offset table: number of documents + 1 uint64 file offsets, document i is between entries i and i + 1
+#   - names: optional UTF-8 document names separated by new line
+#   - trailer: offset of table, number of documents, offset of names (0 if there are no names), MAGIC
+#
+# Offsets are character offsets in the document text, so word is text[start:end] of the original text. Deltas are
+# small, most of them fit in one byte. Reader needs only the trailer and two table entries to find a document.
+#
+
+MAGIC = b"SRBSPAN1"
+
+# table offset, number of documents, names offset, magic
+_TRAILER = struct.Struct("<QQQ8s")
+_OFFSET = struct.Struct("<Q")
+
+
+def encode_varints(values, out):
+    '''Appends non negative integers to bytearray out as unsigned LEB128 varints.'''
+    for value in values:
+        if value < 0:
+            raise ValueError("Negative value can't be encoded: %d" % value)
+        while value >= 0x80:
+            out.append((value & 0x7f) | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def decode_varints(buf, start, end):
+    '''Decodes all varints in buf[start:end] and returns list of integers.'''
+    values = []
+    pos = start
+    while pos < end:
+        byte = buf[pos]
+        pos += 1
+        value = byte & 0x7f
+        shift = 7
+        while byte & 0x80:
+            byte = buf[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+        values.append(value)
+    return values
+
+
+def encode_document(sentences):
+    '''
+    Encodes spans of one document.
+
+    :param sentences: List of (sent_start, sent_end, word_spans), e.g. from CascadeTokenizer.span_tokenize_sentence_words.
+                      Sentences and words have to be sorted and must not overlap, words have to be inside their sentence.
+    returns: bytes
+    '''
+    values = [len(sentences)]
+    prev_end = 0
+    for sent_start, sent_end, word_spans in sentences:
+        values.extend((sent_start - prev_end, sent_end - sent_start, len(word_spans)))
+        prev_word_end = sent_start
+        for word_start, word_end in word_spans:
+            values.extend((word_start - prev_word_end, word_end - word_start))
+            prev_word_end = word_end
+        if prev_word_end > sent_end:
+            raise ValueError("Word ends after its sentence: %d > %d" % (prev_word_end, sent_end))
+        prev_end = sent_end
+    out = bytearray()
+    encode_varints(values, out)
+    return bytes(out)
+
+
+def decode_document(buf, start, end):
+    '''Decodes document encoded by encode_document from buf[start:end], returns list of (sent_start, sent_end, SpanArray of words).'''
+    values = decode_varints(buf, start, end)
+    sentences = []
+    pos = 1
+    prev_end = 0
+    for _ in range(values[0] if values else 0):
+        sent_start = prev_end + values[pos]
+        sent_end = sent_start + values[pos + 1]
+        word_count = values[pos + 2]
+        pos += 3
+        offsets = array(SpanArray.TYPECODE)
+        word_end = sent_start
+        for i in range(pos, pos + 2 * word_count, 2):
+            word_start = word_end + values[i]
+            word_end = word_start + values[i + 1]
+            offsets.append(word_start)
+            offsets.append(word_end)
+        pos += 2 * word_count
+        sentences.append((sent_start, sent_end, SpanArray.from_flat(offsets)))
+        prev_end = sent_end
+    return sentences
+
+
+# ##########################################################################
+# Writing
+# ##########################################################################
+
+class SpansIndexWriter:
+    '''
+    Writes binary spans index to binary file object, which doesn't have to be seekable (e.g. stdout), documents are
+    written as they are added and the offset table at the end.
+
+    :param fileobj: Binary file object opened for writing. It is not closed by the writer.
+    '''
+    def __init__(self, fileobj):
+        self._file = fileobj
+        self._offsets = []
+        self._names = []
+        self._position = 0
+        self._write(MAGIC)
+
+
+    def _write(self, data):
+        self._file.write(data)
+        self._position += len(data)
+
+
+    def add(self, encoded_document, name=None):
+        '''
+        Adds document encoded by encode_document.
+
+        :param name: Document name, e.g. relative path. Either all documents have names or none of them.
+        '''
+        if (name is None) != (not self._names) and self._offsets:
+            raise ValueError("Either all documents have names or none of them")
+        if name is not None:
+            if "\n" in name:
+                raise ValueError("Document name can't contain new line: %r" % name)
+            self._names.append(name)
+        self._offsets.append(self._position)
+        self._write(encoded_document)
+
+
+    def add_sentences(self, sentences, name=None):
+        '''Adds document from list of (sent_start, sent_end, word_spans), see encode_document.'''
+        self.add(encode_document(sentences), name)
+
+
+    def __len__(self):
+        return len(self._offsets)
+
+
+    def close(self):
+        '''Writes offset table, names and trailer.'''
+        self._write(bytes(-self._position % 8))
+        table_offset = self._position
+        for offset in self._offsets + [table_offset]:
+            self._write(_OFFSET.pack(offset))
+        names_offset = 0
+        if self._names:
+            names_offset = self._position
+            self._write("\n".join(self._names).encode("utf-8"))
+        self._write(_TRAILER.pack(table_offset, len(self._offsets), names_offset, MAGIC))
+        self._file.flush()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+
+
+def write_spans_index(documents, fileobj):
+    '''
+    Writes documents to binary file object as spans index.
+
+    :param documents: Iterable of (name, encoded_document), name can be None.
+    returns: Number of documents.
+    '''
+    with SpansIndexWriter(fileobj) as writer:
+        for name, encoded_document in documents:
+            writer.add(encoded_document, name)
+    return len(writer)
+
+
+# ##########################################################################
+# Reading
+# ##########################################################################
+
+class SpansIndex:
+    '''
+    Memory mapped spans index with random access to documents. Only the requested document is decoded, the rest of
+    the file is not read.
+
+        with SpansIndex("archive.spans") as index:
+            for sent_start, sent_end, word_spans in index[42]:
+                words = [text[start:end] for start, end in word_spans]
+
+    :param path: File written by SpansIndexWriter
+    '''
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < len(MAGIC) + _TRAILER.size or self._mmap[:len(MAGIC)] != MAGIC:
+            self._mmap.close()
+            raise ValueError("Not a spans index: %s" % path)
+        self._table_offset, self._count, names_offset, magic = _TRAILER.unpack_from(self._mmap, len(self._mmap) - _TRAILER.size)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise ValueError("Spans index is truncated: %s" % path)
+        self._names_offset = names_offset
+        self._names = None
+        self._name_index = None
+
+
+    def __len__(self):
+        return self._count
+
+
+    def _document_range(self, index):
+        if index < 0:
+            index += self._count
+        if index < 0 or index >= self._count:
+            raise IndexError("document index out of range")
+        start, = _OFFSET.unpack_from(self._mmap, self._table_offset + index * _OFFSET.size)
+        end, = _OFFSET.unpack_from(self._mmap, self._table_offset + (index + 1) * _OFFSET.size)
+        return start, end
+
+
+    def __getitem__(self, index):
+        '''Returns list of (sent_start, sent_end, SpanArray of word spans) of document.'''
+        return decode_document(self._mmap, *self._document_range(index))
+
+
+    def sentence_spans(self, index):
+        '''Returns SpanArray of sentence spans of document.'''
+        return SpanArray((sent_start, sent_end) for sent_start, sent_end, _ in self[index])
+
+
+    def word_spans(self, index):
+        '''Returns SpanArray of all word spans of document, same as span_tokenize of the document text.'''
+        word_spans = SpanArray()
+        for _, _, sentence_word_spans in self[index]:
+            word_spans.extend(sentence_word_spans)
+        return word_spans
+
+
+    @property
+    def names(self):
+        '''List of document names, or None if documents don't have names.'''
+        if self._names is None and self._names_offset:
+            names_end = len(self._mmap) - _TRAILER.size
+            self._names = self._mmap[self._names_offset:names_end].decode("utf-8").split("\n")
+        return self._names
+
+
+    def index_of(self, name):
+        '''Returns index of document with name, raises KeyError if there is no such document.'''
+        if self._name_index is None:
+            self._name_index = {name: i for i, name in enumerate(self.names or [])}
+        return self._name_index[name]
+
+
+    def close(self):
+        self._mmap.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# ##########################################################################
+# Encoding streams and corpora
+# ##########################################################################
+
+def encode_text(tokenizer, text):
+    return encode_document(tokenizer.span_tokenize_sentence_words(text))
+
+
+def encode_lines(tokenizer, lines):
+    '''Encodes every line (without line terminator) as one document.'''
+    return [encode_text(tokenizer, line.rstrip('\r\n')) for line in lines]
+
+
+def encode_file(tokenizer, path):
+    '''Encodes whole file as one document, offsets are in text read in text mode (new lines are translated to \\n).'''
+    with open(path, 'r', encoding='utf-8') as f:
+        return encode_text(tokenizer, f.read())
+
+
+def iter_encode_stream(istream, tokenizer, block_lines=DEFAULT_BLOCK_LINES, workers=1):
+    '''
+    Yields (None, encoded_document) for every line of input stream, blocks of lines are encoded in worker processes if
+    workers is not 1.
+    '''
+    if workers == 1:
+        for line in istream:
+            yield None, encode_text(tokenizer, line.rstrip('\r\n'))
+        return
+    blocks = ((lines,) for lines in iter_line_blocks(istream, block_lines))
+    for encoded_documents in imap_with_tokenizer(tokenizer.worker_factory(), encode_lines, blocks, workers):
+        for encoded_document in encoded_documents:
+            yield None, encoded_document
+
+
+def iter_encode_corpus(tokenizer, input_dir, file_names=None, workers=1):
+    '''
+    Yields (name, encoded_document) for every file of corpus, name is path relative to input_dir.
+
+    :param file_names: Paths relative to input_dir. If None all files in input_dir tree are encoded.
+    :param workers: Number of worker processes, if 1 files are encoded in this process.
+    '''
+    if file_names is None:
+        file_names = list_corpus_files(input_dir)
+    tasks = ((os.path.join(input_dir, name),) for name in file_names)
+    if workers == 1:
+        encoded_documents = (encode_file(tokenizer, *args) for args in tasks)
+    else:
+        encoded_documents = imap_with_tokenizer(tokenizer.worker_factory(), encode_file, tasks, workers)
+    return zip(file_names, encoded_documents)
@@ -1,8 +1,13 @@
 from nltk.tokenize import PunktSentenceTokenizer, RegexpTokenizer
 from .cascade_tokenizer import CascadeTokenizer
+from .punkt_model import load_punkt_params
+from .punkt_engine import PunktEngine
+from .fast_sentence import FastSentenceTokenizer
 import re
 import os
 import pickle
+import functools
+import threading
 
 
 # ##########################################################################
@@ -37,6 +42,10 @@ def normalize_text(text):
     return text.translate(trans_table)
 
 
+# Punkt runtime engines, both produce the same spans, see NormPunktTokenizer
+PUNKT_ENGINES = ('nltk', 'fast')
+
+
 class NormPunktTokenizer(PunktSentenceTokenizer):
     '''
     Wrapper around NLTK PunktSentenceTokenizer which normalizes characters by calling utils.normalize().
@@ -46,13 +55,40 @@ class NormPunktTokenizer(PunktSentenceTokenizer):
     concerned.
 
     For best performance, the training data for PunktTokenizer should be normalized as well.
+
+    Sentence boundaries are found by engine selected by engine argument or engine class attribute:
+      - nltk: PunktSentenceTokenizer.span_tokenize
+      - fast: punkt_engine.PunktEngine, same boundaries without PunktToken objects and annotation generators. It
+        copies parameters on construction, so parameters must not be changed afterwards.
+
+    Tokenizer is thread safe: parameters are only read and regexes that NLTK compiles lazily on first use are compiled
+    here, so concurrent calls don't write shared state.
     '''
-    def __init__(self, *args, **kwargs):
+    engine = 'fast'
+
+    def __init__(self, *args, engine=None, **kwargs):
         super(NormPunktTokenizer, self).__init__(*args, **kwargs)
+        if engine is not None:
+            self.engine = engine
+        assert self.engine in PUNKT_ENGINES, "Unknown Punkt engine: %s" % self.engine
+        self._lang_vars.period_context_re()
+        self._lang_vars._word_tokenizer_re()
+        self._engine = PunktEngine(self._params, self._lang_vars) if self.engine == 'fast' else None
     
 
+    def normalize(self, text):
+        return normalize_text(text)
+
+
     def span_tokenize(self, text):
-        return super(NormPunktTokenizer, self).span_tokenize(normalize_text(text))
+        return self.span_tokenize_normalized(normalize_text(text))
+
+
+    def span_tokenize_normalized(self, norm_text):
+        '''Same as span_tokenize, but for text that is already normalized.'''
+        if self._engine is not None:
+            return self._engine.span_tokenize(norm_text)
+        return super(NormPunktTokenizer, self).span_tokenize(norm_text)
     
 
     def tokenize(self, text):
@@ -65,15 +101,56 @@ class NormPunktTokenizer(PunktSentenceTokenizer):
 # ##########################################################################
 
 
-def create_serbian_punkt_tokenizer():
+def load_newest_punkt_params(model_path, pickle_path):
     '''
-    Loads serbian punkt tokenizer from picke came with this module.
+    Loads punkt parameters from compact model if it exists and is not older than pickle, otherwise from pickle.
+    Model older than pickle was exported before the last (resumed) training and is stale, so it is ignored.
+
+    :param model_path: Compact model file (see punkt_model.py)
+    :param pickle_path: Pickled nltk PunktParameters
+    returns: nltk PunktParameters
+    '''
+    if os.path.exists(model_path):
+        if not os.path.exists(pickle_path) or os.path.getmtime(model_path) >= os.path.getmtime(pickle_path):
+            return load_punkt_params(model_path)
+
+    with open(pickle_path, 'rb') as f:
+        return pickle.load(f)
+
+
+@functools.lru_cache(maxsize=None)
+def load_serbian_punkt_params():
+    '''
+    Loads serbian punkt parameters that came with this module. Compact model is used if it exists and is up to date,
+    otherwise pickle is loaded (see load_newest_punkt_params).
+    Parameters are loaded once per process and shared by all tokenizers, tokenizers only read them.
     '''
     script_dir = os.path.dirname(os.path.realpath(__file__))
-    srb_pickle = os.path.join(script_dir, "serbian_punkt_nltk.pickle")
-    with open(srb_pickle, 'rb') as f:
-        params = pickle.load(f)
-        return NormPunktTokenizer(params)
+    return load_newest_punkt_params(os.path.join(script_dir, "serbian_punkt.model"),
+                                    os.path.join(script_dir, "serbian_punkt_nltk.pickle"))
+
+
+# lru_cache doesn't lock while the function runs, tokenizers created in many threads would load the model many times
+_load_params_lock = threading.Lock()
+
+
+def create_serbian_punkt_tokenizer():
+    '''
+    Loads serbian punkt tokenizer from model came with this module.
+    '''
+    with _load_params_lock:
+        params = load_serbian_punkt_params()
+    return NormPunktTokenizer(params)
+
+
+def create_serbian_fast_sentence_tokenizer():
+    '''
+    Creates approximate fast_sentence.FastSentenceTokenizer from abbreviation types of the model that came with this
+    module. The model contains abbreviations learned by Punkt and all entries of data/train/abbreviations_dict.txt.
+    '''
+    with _load_params_lock:
+        params = load_serbian_punkt_params()
+    return FastSentenceTokenizer(params.abbrev_types, normalize_text)
 
 
 
@@ -89,81 +166,138 @@ def _re_esc(regex_str, ignore_pipe=True):
 # Serbian word tokenization
 # ##########################################################################
 
-class SrbRegexpWordTokenizer(RegexpTokenizer):
+def _build_word_patterns():
     '''
-    Serbian word tokenizer based on handcrafted regular expressions. This tokenizer can't handle sentence segmentation and therefore should
-    be used in cascade with tokenizer specialized for sentence segmentation.
+    Builds word regex as union of handcrafted regexes for each kind of token. Order matters, first matching alternative wins.
+    returns: Pair of equivalent patterns: plain alternation and alternation grouped by the first character (see ENGINES).
     '''
-    def __init__(self):
-        # words and abbreviations (option dot)
-        word = r'\w+\.?(?=\s+[^\s])'
+    # words and abbreviations (option dot)
+    word_suffix = r'\.?(?=\s+[^\s])'
+    word = r'\w+' + word_suffix
+
+    # last word in the sentence can't be abbreviation
+    last_word = r'\w+'
 
-        # last word in the sentence can't be abbreviation
-        last_word = r'\w+'
+    # dot at the end of the sentence (could be multiple)
+    eos_dot = r'\.+$'
 
-        # dot at the end of the sentence (could be multiple)
-        eos_dot = r'\.+$'
+    # three dots is a single word
+    three_dots = r'…|\.\.\.'
 
-        # three dots is a single word
-        three_dots = r'…|\.\.\.'
+    # unicode email address
+    email_suffix = r'@\w+\.(?:\w\w\w?)'
+    email = r'\w+' + email_suffix
 
-        # unicode email address
-        email = r'\w+@\w+\.(?:\w\w\w?)'
+    # url
+    url_prefix = r'(?:http://|https://)'
+    url_suffix = r'(?:\.\w+)+'
+    url = url_prefix + r'?\w+' + url_suffix
 
-        # url
-        url = r'(?:http://|https://)?\w+(?:\.\w+)+'
+    # date
+    date = r'\d?\d\.\d?\d\.(?:\d\d\d\d|\d\d)?\.?'
 
-        # date
-        date = r'\d?\d\.\d?\d\.(?:\d\d\d\d|\d\d)?\.?'
+    # braces should be treated as words
+    braces_str = _re_esc(r'()[]{}<>')
+    braces = rf'(?:[{braces_str}])'
 
-        # braces should be treated as words
-        braces_str = _re_esc(r'()[]{}<>')
-        braces = rf'(?:[{braces_str}])'
+    # dot at the end of the quoted sentence should be separated from closing quotes
+    quoted_eos_dot = r'\.(?="|\'\')'
 
-        # dot at the end of the quoted sentence should be separated from closing quotes
-        quoted_eos_dot = r'\.(?="|\'\')'
+    # emoji is one word
+    emoji = _re_esc(r':)|:(|;)|:-)|:-(')
 
-        # emoji is one word
-        emoji = _re_esc(r':)|:(|;)|:-)|:-(')
+    # 1 character
+    quotes_1ch_str = r'"\''
+    quotes_1ch = rf'(?:[{quotes_1ch_str}])'
 
-        # 1 character
-        quotes_1ch_str = r'"\''
-        quotes_1ch = rf'(?:[{quotes_1ch_str}])'
+    # 2 char quotes
+    quotes_2ch = r'(?:\'\')'
 
-        # 2 char quotes
-        quotes_2ch = r'(?:\'\')'
+    # longer quotes first to give them priority
+    quotes = r'|'.join([quotes_2ch, quotes_1ch]) 
 
-        # longer quotes first to give them priority
-        quotes = r'|'.join([quotes_2ch, quotes_1ch]) 
+    # punctuation no dot - eos dot handled separately, dot inside sentence is not punctuation
+    punct_str = _re_esc('!|?|:|-|!|;')
+    punct = _re_esc(rf'(?:[{punct_str}])')
 
-        # punctuation no dot - eos dot handled separately, dot inside sentence is not punctuation
-        punct_str = _re_esc('!|?|:|-|!|;')
-        punct = _re_esc(rf'(?:[{punct_str}])')
+    # all other characters should be grouped in spans (other = no letters, no digits, no quotes)
+    other_chars = rf'[^\w\s\.{quotes_1ch_str}{braces_str}]+'
 
-        # all other characters should be grouped in spans (other = no letters, no digits, no quotes)
-        other_chars = rf'[^\w\s\.{quotes_1ch_str}{braces_str}]+'
+    # decimal numbers, dot at the end for ordinal numbers
+    decimal_number_srb = r'\-?\d+(?:\.\d\d\d+)*(?:,\d+)?(?=\s)'
+    decimal_number_usa = r'\-?\d+(?:\,\d\d\d+)*(?:.\d+)?(?=\s)'
+    ordinal_number = r'\d+\.(?=\s)'
+    number = r'|'.join([ordinal_number, decimal_number_srb, decimal_number_usa])
+    # abbreviation inflections
+    # abbrev_inf_only_str = r'ових|овог|овом|овим|овој|ове|ова|ову|ови|ом|ов|ја|ју|а|у|е|и'
+
+    # do not break on dash (could be multiple)
+    word_with_dash_suffix = r'(?:\-\w+)+'
+    word_with_dash = r'\w+' + word_with_dash_suffix
+
+    # need to support time formats
+    # 8:01,67 минута
+    # 
+    
+    # this rule will catch any non blank character that other rules missed and declare it as word token
+    catch_any = r'[^\s]'
+
+    # regex pattern is union of all of above groups
+    pattern = r'|'.join([number, word_with_dash, word, date, quotes, three_dots, email, url, emoji, braces, punct, other_chars, last_word, eos_dot, quoted_eos_dot, catch_any])
+
+    # Same alternatives grouped by the class of the first character. Classes don't overlap, so at any position only one
+    # group is tried and it contains, in the original order, only alternatives that can start with that character.
+    # Alternatives starting with \w+ can only match when \w+ takes the whole run of word characters (they continue with
+    # non word character or lookahead for space), so they share one \w+ and only their suffixes are tried in order.
+    # Empty suffix is last_word. Prefixed url comes first because other \w+ alternatives can't match 'http:'.
+    wplus_all = rf'\w+(?:{word_with_dash_suffix}|{word_suffix}|{email_suffix}|{url_suffix}|)'
+    wplus_word_dash = rf'\w+(?:{word_with_dash_suffix}|{word_suffix})'
+    wplus_email_url_last = rf'\w+(?:{email_suffix}|{url_suffix}|)'
+    groups = [
+        (r'[^\W\d]', [url_prefix + r'\w+' + url_suffix, wplus_all]),
+        (r'\d', [number, wplus_word_dash, date, wplus_email_url_last]),
+        (r'\-', [decimal_number_srb, decimal_number_usa, other_chars]),
+        (r'\.', [three_dots, eos_dot, quoted_eos_dot]),
+        (rf'[{quotes_1ch_str}]', [quotes]),
+        (r'[:;]', [emoji, punct, other_chars]),
+        (rf'[^\w\s\-\.{quotes_1ch_str}:;]', [three_dots, braces, punct, other_chars]),
+    ]
+    dispatch_pattern = r'|'.join([rf'(?={first_char})(?:{"|".join(alternatives)})' for first_char, alternatives in groups] + [catch_any])
+    return pattern, dispatch_pattern
+
+
+# regex patterns are compiled once and shared by all word tokenizers, flags are the same as RegexpTokenizer default flags
+WORD_PATTERN, WORD_DISPATCH_PATTERN = _build_word_patterns()
+WORD_REGEXP = re.compile(WORD_PATTERN, re.UNICODE | re.MULTILINE | re.DOTALL)
+WORD_DISPATCH_REGEXP = re.compile(WORD_DISPATCH_PATTERN, re.UNICODE | re.MULTILINE | re.DOTALL)
+
+# Word regex engines, all produce the same spans:
+#  - alternation: all alternatives are tried in order at every position, words are rescanned by each alternative starting with \w+
+#  - dispatch: only alternatives that can start with the character at current position are tried and \w+ is matched once
+ENGINES = {
+    'alternation': (WORD_PATTERN, WORD_REGEXP),
+    'dispatch': (WORD_DISPATCH_PATTERN, WORD_DISPATCH_REGEXP),
+}
 
-        # decimal numbers, dot at the end for ordinal numbers
-        decimal_number_srb = r'\-?\d+(?:\.\d\d\d+)*(?:,\d+)?(?=\s)'
-        decimal_number_usa = r'\-?\d+(?:\,\d\d\d+)*(?:.\d+)?(?=\s)'
-        ordinal_number = r'\d+\.(?=\s)'
-        number = r'|'.join([ordinal_number, decimal_number_srb, decimal_number_usa])
-        # abbreviation inflections
-        # abbrev_inf_only_str = r'ових|овог|овом|овим|овој|ове|ова|ову|ови|ом|ов|ја|ју|а|у|е|и'
 
-        # do not break on dash (could be multiple)
-        word_with_dash=r'\w+(?:\-\w+)+'
+class SrbRegexpWordTokenizer(RegexpTokenizer):
+    '''
+    Serbian word tokenizer based on handcrafted regular expressions. This tokenizer can't handle sentence segmentation and therefore should
+    be used in cascade with tokenizer specialized for sentence segmentation.
 
-        # need to support time formats
-        # 8:01,67 минута
-        # 
-        
-        # this rule will catch any non blank character that other rules missed and declare it as word token
-        catch_any = r'[^\s]'
+    Regex engine is selected by engine argument or engine class attribute, see ENGINES. Compiled regex is set in
+    constructor and only read afterwards, so tokenizer is thread safe.
+    '''
+    engine = 'dispatch'
 
-        # regex pattern is union of all of above groups
-        pattern = r'|'.join([number, word_with_dash, word, date, quotes, three_dots, email, url, emoji, braces, punct, other_chars, last_word, eos_dot, quoted_eos_dot, catch_any])
+    def __init__(self, engine=None):
+        if engine is not None:
+            self.engine = engine
+        assert self.engine in ENGINES, "Unknown word regex engine: %s" % self.engine
+        pattern, regexp = ENGINES[self.engine]
         super(SrbRegexpWordTokenizer, self).__init__(pattern)
+        # all instances share regex compiled once per process
+        self._regexp = regexp
 
 
     def span_tokenize(self, text):
@@ -171,6 +305,17 @@ class SrbRegexpWordTokenizer(RegexpTokenizer):
         return super(SrbRegexpWordTokenizer, self).span_tokenize(normalize_text(text))
 
 
+    def span_tokenize_window(self, norm_text, start, end):
+        '''
+        Produces word spans for norm_text[start:end] without copying it. Spans are offsets in norm_text.
+        Regex matching is limited to the window, so $ and lookaheads behave the same as on the sliced text.
+
+        :param norm_text: Text already normalized by normalize_text()
+        '''
+        self._check_regexp()
+        return [m.span() for m in self._regexp.finditer(norm_text, start, end)]
+
+
     def tokenize(self, text):
         '''Returns list of sentence strings.'''
         return [text[start:end] for start, end in self.span_tokenize(text)]
@@ -181,7 +326,39 @@ class SrbRegexpWordTokenizer(RegexpTokenizer):
 # ##########################################################################
 
 class SrbTokenizer(CascadeTokenizer):
-    '''Tokenizer for SerbianCyrillic. This is what you want to use to tokenize the text.'''
-    def __init__(self):
-        super(SrbTokenizer, self).__init__(create_serbian_punkt_tokenizer(), SrbRegexpWordTokenizer())
+    '''
+    Tokenizer for SerbianCyrillic. This is what you want to use to tokenize the text.
+
+    :param fast: Use approximate FastSentenceTokenizer instead of Punkt for sentence segmentation. It is several times
+                 faster, but some sentence boundaries are different, meant for bulk jobs like pre-filtering.
+    '''
+    def __init__(self, fast=False):
+        self.fast = fast
+        sent_tokenizer = create_serbian_fast_sentence_tokenizer() if fast else create_serbian_punkt_tokenizer()
+        super(SrbTokenizer, self).__init__(sent_tokenizer, SrbRegexpWordTokenizer())
+
+
+    def worker_factory(self):
+        '''Every worker loads punkt model and compiles word regex itself, so parent doesn't have to pickle the model for each worker.'''
+        return functools.partial(SrbTokenizer, fast=self.fast) if self.fast else SrbTokenizer
 
+
+# shared tokenizers by value of fast argument
+_shared_tokenizers = {}
+_shared_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer(fast=False):
+    '''
+    Returns SrbTokenizer shared by the whole process. Use it instead of creating new tokenizer for every request.
+    It is created once even if first calls come from many threads at the same time.
+
+    :param fast: Returns shared SrbTokenizer(fast=True), see SrbTokenizer.
+    '''
+    tokenizer = _shared_tokenizers.get(fast)
+    if tokenizer is None:
+        with _shared_tokenizer_lock:
+            tokenizer = _shared_tokenizers.get(fast)
+            if tokenizer is None:
+                tokenizer = _shared_tokenizers[fast] = SrbTokenizer(fast)
+    return tokenizer
@@ -0,0 +1,129 @@
+import json
+import threading
+from collections import defaultdict
+
+
+# stage names used by CascadeTokenizer and utils
+STAGE_NORMALIZE = 'normalize'
+STAGE_SENTENCES = 'sentences'
+STAGE_WORDS = 'words'
+STAGE_SPAN_CONVERSION = 'span_conversion'
+
+
+class LengthHistogram:
+    '''
+    Histogram of lengths in power of two buckets: [1, 1], [2, 3], [4, 7], ...
+    '''
+    def __init__(self):
+        self._buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+
+
+    def add_spans(self, spans):
+        for start, end in spans:
+            length = end - start
+            self._buckets[length.bit_length()] += 1
+            self.total += length
+            if length > self.max:
+                self.max = length
+        self.count += len(spans)
+
+
+    def as_dict(self):
+        buckets = {}
+        for bits, count in sorted(self._buckets.items()):
+            low = 1 << (bits - 1) if bits else 0
+            high = (1 << bits) - 1
+            buckets["%d-%d" % (low, high)] = count
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+class TokenizerStats:
+    '''
+    Collects per stage wall time, call counts, number of sentences and tokens and their length distribution.
+
+    Set it as CascadeTokenizer.stats to enable instrumentation. Optional callback is called after every document
+    with dictionary that describes that document only, which can be used to export numbers to monitoring.
+    Updates hold a lock, so stats can be shared by threads.
+    '''
+    def __init__(self, callback=None):
+        self.callback = callback
+        self.stage_seconds = defaultdict(float)
+        self.stage_calls = defaultdict(int)
+        self.documents = 0
+        self.chars = 0
+        self.sentence_lengths = LengthHistogram()
+        self.token_lengths = LengthHistogram()
+        self._lock = threading.RLock()
+
+
+    def add_stage(self, stage, seconds):
+        with self._lock:
+            self.stage_seconds[stage] += seconds
+            self.stage_calls[stage] += 1
+
+
+    def add_sentences(self, sent_spans):
+        with self._lock:
+            self.sentence_lengths.add_spans(sent_spans)
+
+
+    def add_tokens(self, word_spans):
+        with self._lock:
+            self.token_lengths.add_spans(word_spans)
+
+
+    def add_document(self, text, sent_spans, word_spans, stage_seconds):
+        '''
+        Records one tokenized document.
+
+        :param text: Input text
+        :param sent_spans: Sentence spans, can be None if sentences were not detected
+        :param word_spans: Word spans, can be None if words were not detected
+        :param stage_seconds: Dictionary that maps stage name to wall time in seconds spent on this document
+        '''
+        with self._lock:
+            self.documents += 1
+            self.chars += len(text)
+            for stage, seconds in stage_seconds.items():
+                self.add_stage(stage, seconds)
+            if sent_spans is not None:
+                self.add_sentences(sent_spans)
+            if word_spans is not None:
+                self.add_tokens(word_spans)
+
+        if self.callback is not None:
+            self.callback({
+                "chars": len(text),
+                "sentences": len(sent_spans) if sent_spans is not None else 0,
+                "tokens": len(word_spans) if word_spans is not None else 0,
+                "stage_seconds": dict(stage_seconds),
+            })
+
+
+    def as_dict(self):
+        with self._lock:
+            return self._as_dict()
+
+
+    def _as_dict(self):
+        return {
+            "documents": self.documents,
+            "chars": self.chars,
+            "sentences": self.sentence_lengths.count,
+            "tokens": self.token_lengths.count,
+            "stages": {stage: {"seconds": self.stage_seconds[stage], "calls": self.stage_calls[stage]} for stage in sorted(self.stage_seconds)},
+            "sentence_lengths": self.sentence_lengths.as_dict(),
+            "token_lengths": self.token_lengths.as_dict(),
+        }
+
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2)
@@ -1,3 +1,14 @@
+import os
+import mmap
+import stat
+import time
+from itertools import chain, islice
+
+from .stats import STAGE_SPAN_CONVERSION
+from .spans import SpanArray
+from .parallel import imap_with_tokenizer
+
+
 
 # ##########################################################################
 # Producing text with space separated tokens from list of word spans.
@@ -59,39 +70,339 @@ def word_spans_to_tokenized_text(text, word_spans, debug=False):
 # Segmenting streams and files.
 # ##########################################################################
 
-def tokenize_stream(istream, tokenizer):
+def _to_tokenized_text(tokenizer, text, word_spans):
+    '''Calls word_spans_to_tokenized_text and records its time if tokenizer collects stats.'''
+    stats = getattr(tokenizer, 'stats', None)
+    if stats is None:
+        return word_spans_to_tokenized_text(text, word_spans)
+
+    start_time = time.perf_counter()
+    tokenized_text = word_spans_to_tokenized_text(text, word_spans)
+    stats.add_stage(STAGE_SPAN_CONVERSION, time.perf_counter() - start_time)
+    return tokenized_text
+
+
+def iter_tokenize_stream(istream, tokenizer):
     '''
-    Segment input stream line by line and return WORD_SEP separated word tokens.
+    Segment input stream line by line and yield WORD_SEP separated word tokens for every line as soon as it is segmented.
     '''
-    segmented_lines = []
     for line in istream:
         line = line.rstrip('\r\n')
-        word_spans = list(tokenizer.span_tokenize(line))
-        segmented_lines.append(word_spans_to_tokenized_text(line, word_spans))
-    return "\n".join(segmented_lines)
+        word_spans = tokenizer.span_tokenize(line)
+        yield _to_tokenized_text(tokenizer, line, word_spans)
 
 
-def tokenize_stream_sent_per_line(istream, tokenizer):
+def iter_tokenize_stream_sent_per_line(istream, tokenizer):
     '''
-    Segment input stream line by line and return WORD_SEP separated word tokens.
+    Segment input stream line by line and yield WORD_SEP separated word tokens for every sentence as soon as it is segmented.
     '''
-    segmented_lines = []
     for line in istream:
         line = line.rstrip('\r\n')
-        for sent_start, sent_end in list(tokenizer.span_tokenize_sentences(line)):
+        for sent_start, sent_end in tokenizer.span_tokenize_sentences(line):
             # get sentence
             sentence = line[sent_start:sent_end]
-            
+
             # word spans for this sentence
-            word_spans = list(tokenizer.span_tokenize_words(sentence))
-        
+            word_spans = tokenizer.span_tokenize_words(sentence)
+
             # generate segmented text line
-            segmented_lines.append(word_spans_to_tokenized_text(sentence, word_spans))
-    
-    return "\n".join(segmented_lines)
+            yield _to_tokenized_text(tokenizer, sentence, word_spans)
+
+
+def tokenize_stream(istream, tokenizer):
+    '''
+    Segment input stream line by line and return WORD_SEP separated word tokens.
+    '''
+    return "\n".join(iter_tokenize_stream(istream, tokenizer))
+
+
+def tokenize_stream_sent_per_line(istream, tokenizer):
+    '''
+    Segment input stream line by line and return WORD_SEP separated word tokens.
+    '''
+    return "\n".join(iter_tokenize_stream_sent_per_line(istream, tokenizer))
 
 
 def tokenize_file(path, tokenizer):
     with open(path, 'r', encoding='utf-8') as file:
         return tokenize_stream(file, tokenizer)
 
+
+# ##########################################################################
+# Segmenting large files in chunks.
+# ##########################################################################
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+
+def is_regular_file(path):
+    '''
+    True if path is regular file that can be memory mapped and split into chunks. Pipes, FIFOs and process
+    substitution (e.g. <(zcat corpus.gz)) report size 0 and have to be read as stream.
+    '''
+    return stat.S_ISREG(os.stat(path).st_mode)
+
+
+def iter_file_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    '''
+    Splits file into byte ranges of about chunk_size bytes. Every range except the last one ends right after new line.
+    Text is tokenized line by line, so chunks split on line boundaries can be tokenized independently.
+
+    File is memory mapped and only scanned for new lines, it is never read into python string as a whole. It has to be
+    regular file (see is_regular_file).
+
+    :param path: Input file
+    :param chunk_size: Minimal size of chunk in bytes, chunk is extended to the end of the line.
+    returns: Iterator of (start, end) byte offsets.
+    '''
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            while start < size:
+                end = mm.find(b'\n', min(start + max(chunk_size, 1), size) - 1)
+                end = size if end < 0 else end + 1
+                yield start, end
+                start = end
+
+
+def read_file_chunk(path, start, end):
+    '''
+    Reads byte range of file through memory map and returns it as text with new lines translated the same way as
+    when the file is opened in text mode (\\r\\n and \\r become \\n).
+    '''
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            text = mm[start:end].decode('utf-8')
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+
+def split_chunk_lines(text):
+    '''Splits chunk text to lines, same lines as iterating over text file and stripping new line.'''
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    return lines
+
+
+def tokenize_lines(tokenizer, lines, sent_per_line=False):
+    '''
+    Tokenizes block of lines and returns list of output lines, same as iter_tokenize_stream (or
+    iter_tokenize_stream_sent_per_line) for these lines.
+    '''
+    if sent_per_line:
+        return list(iter_tokenize_stream_sent_per_line(lines, tokenizer))
+    return list(iter_tokenize_stream(lines, tokenizer))
+
+
+def tokenize_file_chunk(tokenizer, path, start, end, sent_per_line=False):
+    '''
+    Tokenizes byte range of file and returns list of output lines, same as iter_tokenize_stream for these lines.
+    '''
+    return tokenize_lines(tokenizer, split_chunk_lines(read_file_chunk(path, start, end)), sent_per_line)
+
+
+def span_tokenize_file_chunk(tokenizer, path, start, end):
+    '''
+    Tokenizes byte range of file line by line.
+    returns: Pair (word spans as SpanArray with offsets relative to chunk text, number of characters in chunk text)
+    '''
+    text = read_file_chunk(path, start, end)
+    word_spans = SpanArray()
+    line_start = 0
+    for line in split_chunk_lines(text):
+        word_spans.extend((word_start + line_start, word_end + line_start) for word_start, word_end in tokenizer.span_tokenize(line))
+        line_start += len(line) + 1
+    return word_spans, len(text)
+
+
+def _map_file_chunks(tokenizer, func, path, chunk_size, workers, extra_args=()):
+    chunks = ((path, start, end) + tuple(extra_args) for start, end in iter_file_chunks(path, chunk_size))
+    if workers == 1:
+        return (func(tokenizer, *args) for args in chunks)
+    return imap_with_tokenizer(tokenizer.worker_factory(), func, chunks, workers)
+
+
+def iter_tokenize_file(path, tokenizer, sent_per_line=False, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    '''
+    Tokenizes memory mapped file in chunks and yields output lines. Output is the same as iter_tokenize_stream (or
+    iter_tokenize_stream_sent_per_line) on the opened file, but only few chunks are kept in memory at any time.
+
+    :param path: Input UTF-8 text file
+    :param tokenizer: Tokenizer, it has to implement worker_factory() if workers is not 1
+    :param sent_per_line: Yield one sentence per line.
+    :param chunk_size: Approximate chunk size in bytes.
+    :param workers: Number of worker processes that tokenize chunks. If None os.cpu_count() is used. If 1 chunks are tokenized in this process.
+    '''
+    chunk_lines = _map_file_chunks(tokenizer, tokenize_file_chunk, path, chunk_size, workers, (sent_per_line,))
+    return chain.from_iterable(chunk_lines)
+
+
+def iter_span_tokenize_file(path, tokenizer, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+    '''
+    Tokenizes memory mapped file line by line in chunks and yields SpanArray of word spans for every chunk.
+    Offsets are absolute character offsets in the file text (as read in text mode), so word is text[start:end].
+
+    :param path: Input UTF-8 text file
+    :param tokenizer: Tokenizer, it has to implement worker_factory() if workers is not 1
+    :param chunk_size: Approximate chunk size in bytes.
+    :param workers: Number of worker processes that tokenize chunks. If None os.cpu_count() is used. If 1 chunks are tokenized in this process.
+    '''
+    offset = 0
+    for word_spans, chunk_chars in _map_file_chunks(tokenizer, span_tokenize_file_chunk, path, chunk_size, workers):
+        yield word_spans.shift(offset)
+        offset += chunk_chars
+
+
+# ##########################################################################
+# Segmenting stream in blocks of lines in worker processes.
+# ##########################################################################
+
+DEFAULT_BLOCK_LINES = 1000
+
+
+def iter_line_blocks(istream, block_lines=DEFAULT_BLOCK_LINES):
+    '''Reads input stream in lists of at most block_lines lines.'''
+    while True:
+        lines = list(islice(istream, block_lines))
+        if not lines:
+            return
+        yield lines
+
+
+def iter_tokenize_stream_parallel(istream, tokenizer, sent_per_line=False, block_lines=DEFAULT_BLOCK_LINES, workers=None):
+    '''
+    Segment input stream in blocks of lines in worker processes and yield output lines in the original order.
+    Output is the same as iter_tokenize_stream (or iter_tokenize_stream_sent_per_line), input is read only a few blocks
+    ahead of the output.
+
+    :param istream: Input text stream
+    :param tokenizer: Tokenizer that implements worker_factory()
+    :param sent_per_line: Yield one sentence per line.
+    :param block_lines: Number of input lines sent to worker in one task.
+    :param workers: Number of worker processes. If None os.cpu_count() is used.
+    '''
+    blocks = ((lines, sent_per_line) for lines in iter_line_blocks(istream, block_lines))
+    block_out_lines = imap_with_tokenizer(tokenizer.worker_factory(), tokenize_lines, blocks, workers)
+    return chain.from_iterable(block_out_lines)
+
+
+# ##########################################################################
+# Segmenting corpus of files.
+# ##########################################################################
+
+def read_file_list(path):
+    '''Reads file with one relative file name per line, empty lines are skipped.'''
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def list_corpus_files(input_dir):
+    '''Returns sorted paths of all files in directory tree, relative to input_dir.'''
+    file_names = []
+    for dir_path, dir_names, names in os.walk(input_dir):
+        dir_names.sort()
+        rel_dir = os.path.relpath(dir_path, input_dir)
+        file_names.extend(os.path.normpath(os.path.join(rel_dir, name)) for name in sorted(names))
+    return file_names
+
+
+def tokenize_corpus_file(tokenizer, in_path, out_path, sent_per_line=False):
+    '''
+    Tokenizes one file of corpus and writes the result to out_path, creating its directory if needed. Output is the same
+    as when the file is piped through python -m srbtok.
+    '''
+    out_dir = os.path.dirname(out_path)
+    if out_dir:
+        os.makedirs(out_dir, exist_ok=True)
+    with open(in_path, 'r', encoding='utf-8') as istream, open(out_path, 'w', encoding='utf-8') as ostream:
+        if sent_per_line:
+            out_lines = iter_tokenize_stream_sent_per_line(istream, tokenizer)
+        else:
+            out_lines = iter_tokenize_stream(istream, tokenizer)
+        write_lines(out_lines, ostream)
+    return out_path
+
+
+def tokenize_corpus(tokenizer, input_dir, output_dir, file_names=None, sent_per_line=False, workers=1, cache=None, cache_namespace="tokenize", cache_fingerprint=""):
+    '''
+    Tokenizes files from input_dir and writes them to the same relative paths in output_dir. Tokenizer is created once
+    for the whole corpus (once per worker), instead of once per file.
+
+    :param tokenizer: Tokenizer, it has to implement worker_factory() if workers is not 1
+    :param input_dir: Directory with input UTF-8 text files
+    :param output_dir: Directory for tokenized files, directory tree of input_dir is mirrored
+    :param file_names: Paths relative to input_dir. If None all files in input_dir tree are tokenized.
+    :param sent_per_line: Write one sentence per line.
+    :param workers: Number of worker processes, files are distributed between them. If None os.cpu_count() is used. If 1 files are tokenized in this process.
+    :param cache: Optional ResultCache with tokenized texts. Files whose content was already tokenized by tokenizer with the same fingerprint are copied from cache.
+    :param cache_namespace: Cache namespace, it should be different for every tokenizer configuration.
+    :param cache_fingerprint: Fingerprint of tokenizer code and model, e.g. from srbtok_fingerprint().
+    returns: Iterator of output file paths, yielded when the file is written. Without cache they are in the order of
+    file_names, with cache files taken from cache are yielded first.
+    '''
+    if file_names is None:
+        file_names = list_corpus_files(input_dir)
+    if cache is not None:
+        return _tokenize_corpus_cached(tokenizer, input_dir, output_dir, file_names, sent_per_line, workers, cache, cache_namespace, cache_fingerprint)
+    tasks = ((os.path.join(input_dir, name), os.path.join(output_dir, name), sent_per_line) for name in file_names)
+    if workers == 1:
+        return (tokenize_corpus_file(tokenizer, *args) for args in tasks)
+    return imap_with_tokenizer(tokenizer.worker_factory(), tokenize_corpus_file, tasks, workers)
+
+
+
+def _tokenize_corpus_cached(tokenizer, input_dir, output_dir, file_names, sent_per_line, workers, cache, cache_namespace, cache_fingerprint):
+    # imported here, hashlib and sqlite3 would add to the start up time of every CLI call
+    from .cache import content_hash, file_hash
+
+    missing_names = []
+    missing_keys = []
+    for name in file_names:
+        key = content_hash(cache_fingerprint, str(sent_per_line), file_hash(os.path.join(input_dir, name)))
+        out_text = cache.get(cache_namespace, key)
+        if out_text is None:
+            missing_names.append(name)
+            missing_keys.append(key)
+            continue
+
+        out_path = os.path.join(output_dir, name)
+        os.makedirs(os.path.dirname(out_path) or '.', exist_ok=True)
+        with open(out_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(out_text)
+        yield out_path
+
+    out_paths = tokenize_corpus(tokenizer, input_dir, output_dir, missing_names, sent_per_line, workers)
+    for key, out_path in zip(missing_keys, out_paths):
+        with open(out_path, 'r', encoding='utf-8', newline='') as f:
+            cache.put(cache_namespace, key, f.read(), cache_fingerprint)
+        yield out_path
+    cache.commit()
+
+
+def write_lines(lines, ostream, line_buffered=False):
+    '''
+    Write lines to output stream as they are produced, without keeping them in memory.
+
+    By default lines are separated by new line, so the output is the same as "\n".join(lines). In line buffered mode
+    every line is terminated by new line and stream is flushed after it, so the reader of a pipe gets each line immediately.
+
+    :param lines: Iterable of lines without new line character
+    :param ostream: Output text stream
+    :param line_buffered: Terminate and flush every line.
+    '''
+    if line_buffered:
+        for line in lines:
+            ostream.write(line)
+            ostream.write("\n")
+            ostream.flush()
+        return
+
+    separator = ""
+    for line in lines:
+        ostream.write(separator)
+        ostream.write(line)
+        separator = "\n"
+    ostream.flush()
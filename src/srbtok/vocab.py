@@ -0,0 +1,148 @@
+import threading
+from array import array
+from itertools import islice
+from collections import Counter
+
+
+# id of unknown token, the first entry of every vocabulary
+UNKNOWN_ID = 0
+UNKNOWN_TOKEN = "<unk>"
+
+# typecode of token id arrays, 32 bit unsigned integers
+ID_TYPECODE = 'I'
+
+
+class Vocabulary:
+    '''
+    Interned vocabulary that maps tokens to consecutive integer ids and counts how many times every token was encoded.
+
+    Tokens are encoded directly from word spans of the original text: every token string is created only for one
+    dictionary lookup, which also assigns id to a new token, so there are no lists of token strings and no second
+    hashing pass. Ids are returned as array of 32 bit integers, see ID_TYPECODE.
+
+    Vocabulary grows with every new token. Frozen vocabulary doesn't grow, unknown tokens get UNKNOWN_ID. Encoding
+    holds a lock, so vocabulary can be shared by threads.
+
+    :param tokens: Initial tokens, they get ids 1, 2, ... in this order.
+    :param frozen: Don't add new tokens.
+    '''
+    def __init__(self, tokens=(), frozen=False):
+        # ids are assigned in insertion order, so list of tokens can be rebuilt from dictionary keys
+        self._ids = {UNKNOWN_TOKEN: UNKNOWN_ID}
+        self._tokens = [UNKNOWN_TOKEN]
+        self.counts = Counter()
+        self.frozen = frozen
+        self._lock = threading.Lock()
+        for token in tokens:
+            self.add(token)
+
+
+    def __len__(self):
+        return len(self._ids)
+
+
+    def __contains__(self, token):
+        return token in self._ids
+
+
+    def add(self, token):
+        '''Returns id of token, new token is added even if vocabulary is frozen.'''
+        with self._lock:
+            return self._ids.setdefault(token, len(self._ids))
+
+
+    def id_of(self, token):
+        '''Returns id of token or UNKNOWN_ID if token is not in vocabulary.'''
+        return self._ids.get(token, UNKNOWN_ID)
+
+
+    def _token_list(self):
+        if len(self._tokens) < len(self._ids):
+            self._tokens.extend(islice(self._ids, len(self._tokens), None))
+        return self._tokens
+
+
+    def token(self, token_id):
+        return self._token_list()[token_id]
+
+
+    def encode(self, text, word_spans):
+        '''
+        Returns array of ids of tokens text[start:end] for (start, end) in word_spans and updates their counts.
+        New tokens are added unless vocabulary is frozen.
+        '''
+        token_ids = self._ids
+        with self._lock:
+            if self.frozen:
+                get = token_ids.get
+                ids = array(ID_TYPECODE, [get(text[start:end], UNKNOWN_ID) for start, end in word_spans])
+            else:
+                setdefault = token_ids.setdefault
+                ids = array(ID_TYPECODE, [setdefault(text[start:end], len(token_ids)) for start, end in word_spans])
+            self.counts.update(ids)
+        return ids
+
+
+    def encode_tokens(self, tokens):
+        '''Same as encode, but for iterable of token strings.'''
+        token_ids = self._ids
+        with self._lock:
+            if self.frozen:
+                get = token_ids.get
+                ids = array(ID_TYPECODE, [get(token, UNKNOWN_ID) for token in tokens])
+            else:
+                setdefault = token_ids.setdefault
+                ids = array(ID_TYPECODE, [setdefault(token, len(token_ids)) for token in tokens])
+            self.counts.update(ids)
+        return ids
+
+
+    def decode(self, ids):
+        '''Returns list of tokens of ids.'''
+        tokens = self._token_list()
+        return [tokens[token_id] for token_id in ids]
+
+
+    def most_common(self, n=None):
+        '''Returns list of (token, count) of n most common tokens, all tokens if n is None.'''
+        tokens = self._token_list()
+        return [(tokens[token_id], count) for token_id, count in self.counts.most_common(n)]
+
+
+    def save(self, path):
+        '''Writes vocabulary to UTF-8 file with one "token<TAB>count" line per token, line number is token id.'''
+        with open(path, 'w', encoding='utf-8', newline='\n') as f:
+            for token_id, token in enumerate(self._token_list()):
+                f.write("%s\t%d\n" % (token, self.counts[token_id]))
+
+
+    @classmethod
+    def load(cls, path, frozen=False):
+        '''Reads vocabulary written by save, counts continue from the saved values.'''
+        vocabulary = cls()
+        with open(path, 'r', encoding='utf-8', newline='\n') as f:
+            for line_no, line in enumerate(f):
+                token, count = line.rstrip('\n').rsplit('\t', 1)
+                if line_no == 0:
+                    if token != UNKNOWN_TOKEN:
+                        raise ValueError("First token of vocabulary has to be %s: %s" % (UNKNOWN_TOKEN, path))
+                elif vocabulary.add(token) != line_no:
+                    raise ValueError("Duplicate token %r in vocabulary: %s" % (token, path))
+                if int(count):
+                    vocabulary.counts[line_no] = int(count)
+        vocabulary.frozen = frozen
+        return vocabulary
+
+
+def iter_ids_stream(istream, tokenizer, vocabulary, sent_per_line=False):
+    '''
+    Tokenizes input stream line by line and yields space separated word ids for every line, or for every sentence if
+    sent_per_line is True.
+    '''
+    for line in istream:
+        line = line.rstrip('\r\n')
+        if sent_per_line:
+            for ids in tokenizer.tokenize_ids(line, vocabulary, per_sentence=True):
+                yield " ".join(map(str, ids))
+        else:
+            yield " ".join(map(str, tokenizer.tokenize_ids(line, vocabulary)))
@@ -0,0 +1,57 @@
+import os
+import sys
+import time
+import argparse
+
+# Add the parent directory to the system path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from srbtok.srb_tokenizer import SrbRegexpWordTokenizer, create_serbian_punkt_tokenizer
+from srbtok.cascade_tokenizer import CascadeTokenizer
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compares fused cascade (text normalized once) with per sentence cascade on a directory with raw texts.')
+    parser.add_argument('-d', '--raw-dir', default='data/test/politika/raw', help='Directory with raw text files.')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of runs, best time is reported.')
+    return parser.parse_args()
+
+
+def read_texts(raw_dir):
+    texts = []
+    for name in sorted(os.listdir(raw_dir)):
+        with open(os.path.join(raw_dir, name), 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+    return texts
+
+
+def best_time(tokenizer, texts, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            tokenizer.span_tokenize(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    texts = read_texts(args.raw_dir)
+    sent_tokenizer = create_serbian_punkt_tokenizer()
+    word_tokenizer = SrbRegexpWordTokenizer()
+    fused = CascadeTokenizer(sent_tokenizer, word_tokenizer)
+    per_sentence = CascadeTokenizer(sent_tokenizer, word_tokenizer, fused=False)
+
+    for text in texts:
+        assert fused.span_tokenize(text) == per_sentence.span_tokenize(text), "Fused cascade output differs"
+
+    chars = sum(len(text) for text in texts)
+    fused_time = best_time(fused, texts, args.repeat)
+    per_sentence_time = best_time(per_sentence, texts, args.repeat)
+
+    print("documents\t%d\tchars\t%d" % (len(texts), chars))
+    print("per_sentence\t%f s\t%f chars/s" % (per_sentence_time, chars / per_sentence_time))
+    print("fused\t%f s\t%f chars/s" % (fused_time, chars / fused_time))
+    print("speedup\t%f" % (per_sentence_time / fused_time))
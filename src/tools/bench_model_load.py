@@ -0,0 +1,73 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# Add the parent directory to the system path
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SRC_DIR)
+
+MODEL_DIR = os.path.join(SRC_DIR, "srbtok")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Compares load time and resident memory of pickled and compact Punkt model.')
+    parser.add_argument('-p', '--pickle', default=os.path.join(MODEL_DIR, "serbian_punkt_nltk.pickle"), help='Punkt model as pickle file.')
+    parser.add_argument('-m', '--model', default=os.path.join(MODEL_DIR, "serbian_punkt.model"), help='Punkt model in compact format. Created from pickle if it does not exist.')
+    parser.add_argument('-r', '--repeat', type=int, default=10, help='Number of loads, best time is reported.')
+    return parser.parse_args()
+
+
+# Runs in a fresh interpreter, so memory of one format doesn't affect the other.
+# NLTK is imported before measuring, both formats need it to create PunktParameters.
+MEASURE_SCRIPT = '''
+import sys, time, json, pickle, resource
+sys.path.append(%(src_dir)r)
+from srbtok.punkt_model import load_punkt_params
+
+def load():
+    if %(format)r == "pickle":
+        with open(%(path)r, "rb") as f:
+            return pickle.load(f)
+    return load_punkt_params(%(path)r)
+
+def rss_kb():
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() // 1024
+
+rss_before = rss_kb()
+start = time.perf_counter()
+params = load()
+first = time.perf_counter() - start
+rss_after = rss_kb()
+
+best = first
+for _ in range(%(repeat)d - 1):
+    start = time.perf_counter()
+    load()
+    best = min(best, time.perf_counter() - start)
+
+print(json.dumps({"first_load_s": first, "best_load_s": best, "rss_kb": rss_after - rss_before}))
+'''
+
+
+def measure(format, path, repeat):
+    script = MEASURE_SCRIPT % {"src_dir": SRC_DIR, "format": format, "path": path, "repeat": repeat}
+    out = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if not os.path.exists(args.model):
+        import pickle
+        from srbtok.punkt_model import save_punkt_params
+        with open(args.pickle, "rb") as f:
+            save_punkt_params(pickle.load(f), args.model)
+
+    print("%s\t%s\t%s\t%s\t%s" % ("FORMAT", "FILE_KB", "FIRST_LOAD_MS", "BEST_LOAD_MS", "RSS_KB"))
+    for format, path in [("pickle", args.pickle), ("compact", args.model)]:
+        result = measure(format, path, args.repeat)
+        print("%s\t%d\t%f\t%f\t%d" % (format, os.path.getsize(path) // 1024, 1000 * result["first_load_s"], 1000 * result["best_load_s"], result["rss_kb"]))
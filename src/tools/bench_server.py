@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import subprocess
+import http.client
+
+# Add the parent directory to the system path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from srbtok.server import Client, DEFAULT_PORT
+from tools.benchmark import DEFAULT_RAW_DIR, read_texts, percentile
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Load generator for "python -m srbtok serve". Sends one paragraph per request from concurrent clients and writes QPS and latency percentiles as JSON to stdout.')
+    parser.add_argument('-p', '--port', type=int, default=DEFAULT_PORT, help='HTTP port of the server.')
+    parser.add_argument('-u', '--unix-socket', help='Unix socket of the server, HTTP is used if not specified.')
+    parser.add_argument('-s', '--start', action='store_true', help='Start the server for the benchmark and stop it at the end.')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Worker processes of the started server.')
+    parser.add_argument('-c', '--concurrency', type=int, default=8, help='Number of concurrent clients, each with one connection.')
+    parser.add_argument('-n', '--requests', type=int, default=2000, help='Total number of requests.')
+    parser.add_argument('-f', '--format', default='tokens', help='Requested format: tokens or spans.')
+    parser.add_argument('-d', '--raw-dir', default=DEFAULT_RAW_DIR, help='Directory with raw text files, their non empty lines are request texts.')
+    return parser.parse_args()
+
+
+def read_paragraphs(raw_dir):
+    return [line for text in read_texts(raw_dir) for line in text.splitlines() if line.strip()]
+
+
+def start_server(port, unix_socket, jobs, timeout=60):
+    '''Starts server in subprocess and waits until it accepts requests.'''
+    cmd = [sys.executable, "-m", "srbtok", "serve", "--port", str(port), "--jobs", str(jobs)]
+    if unix_socket:
+        cmd.extend(["--unix-socket", unix_socket])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = SRC_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    process = subprocess.Popen(cmd, env=env)
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with Client(unix_socket, port) as client:
+                client.tokenize("Тест.")
+            return process
+        except OSError:
+            if process.poll() is not None or time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("Server did not start: %s" % " ".join(cmd))
+            time.sleep(0.1)
+
+
+def run_client(unix_socket, port, fmt, texts, latencies):
+    with Client(unix_socket, port) as client:
+        for text in texts:
+            start_time = time.perf_counter()
+            client.request({"text": text, "format": fmt})
+            latencies.append(time.perf_counter() - start_time)
+
+
+def run_load(unix_socket, port, fmt, paragraphs, concurrency, requests):
+    '''Sends requests from concurrent clients, paragraphs are used round robin. Returns results dictionary.'''
+    texts = [paragraphs[i % len(paragraphs)] for i in range(requests)]
+    latencies = [[] for _ in range(concurrency)]
+    threads = [threading.Thread(target=run_client, args=(unix_socket, port, fmt, texts[i::concurrency], latencies[i])) for i in range(concurrency)]
+
+    start_time = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total = time.perf_counter() - start_time
+
+    all_latencies = [latency for client_latencies in latencies for latency in client_latencies]
+    assert len(all_latencies) == requests, "Some clients failed"
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "chars": sum(len(text) for text in texts),
+        "seconds": total,
+        "qps": requests / total,
+        "latency_p50_ms": 1000 * percentile(all_latencies, 50),
+        "latency_p90_ms": 1000 * percentile(all_latencies, 90),
+        "latency_p99_ms": 1000 * percentile(all_latencies, 99),
+        "latency_max_ms": 1000 * max(all_latencies),
+    }
+
+
+def get_server_stats(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        conn.request('GET', '/stats')
+        return json.loads(conn.getresponse().read().decode('utf-8'))
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    paragraphs = read_paragraphs(args.raw_dir)
+
+    server = start_server(args.port, args.unix_socket, args.jobs) if args.start else None
+    try:
+        results = run_load(args.unix_socket, args.port, args.format, paragraphs, args.concurrency, args.requests)
+        if not args.unix_socket:
+            results["server"] = get_server_stats(args.port)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(json.dumps(results, indent=2))
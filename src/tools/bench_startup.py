@@ -0,0 +1,90 @@
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measures import time, tokenizer creation time and first call latency of srbtok. Output is JSON written to stdout.')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='Number of fresh interpreters per measurement, best time is reported.')
+    parser.add_argument('-l', '--limit', action='append', default=[], metavar='NAME=MS', help='Fail if measurement NAME is slower than MS milliseconds. Can be repeated.')
+    return parser.parse_args()
+
+
+# Runs in a fresh interpreter, every step is timed separately.
+MEASURE_SCRIPT = '''
+import sys, time, json
+sys.path.insert(0, %(src_dir)r)
+t0 = time.perf_counter()
+import srbtok
+t1 = time.perf_counter()
+from srbtok import SrbTokenizer
+t2 = time.perf_counter()
+tokenizer = SrbTokenizer()
+t3 = time.perf_counter()
+SrbTokenizer()
+t4 = time.perf_counter()
+tokenizer.tokenize("Др. Марко Топаловић је дежурни лекар.")
+t5 = time.perf_counter()
+print(json.dumps({
+    "import_srbtok_ms": 1000 * (t1 - t0),
+    "import_tokenizer_ms": 1000 * (t2 - t1),
+    "first_tokenizer_ms": 1000 * (t3 - t2),
+    "next_tokenizer_ms": 1000 * (t4 - t3),
+    "first_call_ms": 1000 * (t5 - t4),
+}))
+'''
+
+
+def measure_in_process_steps():
+    script = MEASURE_SCRIPT % {"src_dir": SRC_DIR}
+    out = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def measure_cli_one_line():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = SRC_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-m", "srbtok"], input="Др. Марко Топаловић је дежурни лекар.\n", env=env, check=True, capture_output=True, text=True)
+    return 1000 * (time.perf_counter() - start)
+
+
+def measure_startup(repeat):
+    '''
+    Measures startup costs in fresh interpreters and returns best time for every step in milliseconds.
+    '''
+    results = {}
+    for _ in range(repeat):
+        steps = measure_in_process_steps()
+        steps["cli_one_line_ms"] = measure_cli_one_line()
+        for name, value in steps.items():
+            results[name] = min(results.get(name, value), value)
+    return results
+
+
+def check_limits(results, limits):
+    failed = []
+    for limit in limits:
+        name, max_ms = limit.split('=')
+        assert name in results, "Unknown measurement: %s" % name
+        if results[name] > float(max_ms):
+            failed.append("%s: %f ms > %s ms" % (name, results[name], max_ms))
+    return failed
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    results = measure_startup(args.repeat)
+    print(json.dumps(results, indent=2))
+
+    failed = check_limits(results, args.limit)
+    for message in failed:
+        sys.stderr.write("Startup regression %s\n" % message)
+    if failed:
+        sys.exit(1)
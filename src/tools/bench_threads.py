@@ -0,0 +1,66 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+# Add the parent directory to the system path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from srbtok.srb_tokenizer import SrbTokenizer
+from tools.benchmark import DEFAULT_RAW_DIR, read_texts, scale_corpus
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measures throughput of one SrbTokenizer shared by thread pool for different numbers of threads and checks that results are the same as sequential. Results are written as JSON to stdout.')
+    parser.add_argument('-d', '--raw-dir', default=DEFAULT_RAW_DIR, help='Directory with raw text files.')
+    parser.add_argument('-t', '--threads', type=int, action='append', help='Number of threads. Can be repeated, default is 1, 2, 4 and 8.')
+    parser.add_argument('-s', '--scale', type=int, default=4, help='Every document is SCALE consecutive articles.')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of passes for every thread count, best pass is reported.')
+    return parser.parse_args()
+
+
+def gil_enabled():
+    '''False on free-threaded Python build with GIL disabled.'''
+    is_gil_enabled = getattr(sys, '_is_gil_enabled', None)
+    return is_gil_enabled() if is_gil_enabled is not None else True
+
+
+def measure_threads(tokenizer, texts, threads, repeat, expected):
+    best = None
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        results = tokenizer.span_tokenize_many(texts, workers=threads, threads=True)
+        seconds = time.perf_counter() - start_time
+        assert results == expected, "Results with %d threads differ from sequential tokenization" % threads
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    texts = scale_corpus(read_texts(args.raw_dir), args.scale)
+    chars = sum(len(text) for text in texts)
+
+    tokenizer = SrbTokenizer()
+    expected = [tokenizer.span_tokenize(text) for text in texts]
+
+    results = {
+        "python": platform.python_version(),
+        "gil_enabled": gil_enabled(),
+        "cpu_count": os.cpu_count(),
+        "documents": len(texts),
+        "chars": chars,
+        "threads": {},
+    }
+    base_seconds = None
+    for threads in args.threads or [1, 2, 4, 8]:
+        seconds = measure_threads(tokenizer, texts, threads, args.repeat, expected)
+        base_seconds = base_seconds or seconds
+        results["threads"][str(threads)] = {
+            "seconds": seconds,
+            "chars_per_sec": chars / seconds,
+            "speedup": base_seconds / seconds,
+        }
+
+    print(json.dumps(results, indent=2))
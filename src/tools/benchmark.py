@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import tracemalloc
+
+# Add the parent directory to the system path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from srbtok.srb_tokenizer import SrbTokenizer
+from srbtok.cascade_tokenizer import CascadeTokenizer
+from tools.nltk_tokenize import create_sent_tokenizer, create_word_tokenizer
+from tools.bench_startup import measure_startup
+
+
+DEFAULT_RAW_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "test", "politika", "raw")
+
+# NLTK baselines, same combinations as in src/experiments/tokenizers
+NLTK_BASELINES = [
+    ("PunktTokenizer(russian)", "WhitespaceTokenizer"),
+    ("PunktTokenizer(russian)", "TreebankWordTokenizer"),
+    ("PunktTokenizer(russian)", "SrbRegexpTokenizer"),
+    ("None", "WhitespaceTokenizer"),
+    ("None", "TreebankWordTokenizer"),
+]
+
+# metrics compared with baseline, True if higher value is better
+COMPARED_METRICS = {
+    "chars_per_sec": True,
+    "tokens_per_sec": True,
+    "latency_p50_ms": False,
+    "latency_p99_ms": False,
+    "peak_memory_kb": False,
+}
+
+# startup metrics compared with baseline, short steps are left out because they are too noisy
+COMPARED_STARTUP_METRICS = {
+    "import_tokenizer_ms": False,
+    "first_tokenizer_ms": False,
+    "cli_one_line_ms": False,
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Measures throughput, latency and memory of tokenizers on politika test set and on scaled up synthetic corpora. Results are written as JSON.')
+    parser.add_argument('-d', '--raw-dir', default=DEFAULT_RAW_DIR, help='Directory with raw text files.')
+    parser.add_argument('-s', '--scale', type=int, action='append', help='Create synthetic corpus where every document is SCALE consecutive articles. Can be repeated, default is 1 and 10.')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='Number of passes over each corpus, best pass is reported.')
+    parser.add_argument('-t', '--tokenizer', action='append', help='Run only tokenizers with this name. Can be repeated.')
+    parser.add_argument('-o', '--output', help='Output JSON file. If not specified stdout will be used.')
+    parser.add_argument('-b', '--baseline', help='JSON file with stored results to compare with.')
+    parser.add_argument('-mr', '--max-regression', type=float, default=0.1, help='Allowed relative regression compared to baseline.')
+    parser.add_argument('--no-startup', action='store_true', help='Do not measure startup cost.')
+    return parser.parse_args()
+
+
+# ##########################################################################
+# Corpora
+# ##########################################################################
+
+def read_texts(raw_dir):
+    texts = []
+    for name in sorted(os.listdir(raw_dir)):
+        with open(os.path.join(raw_dir, name), 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+    return texts
+
+
+def scale_corpus(texts, scale):
+    '''Creates corpus with the same number of documents, where every document consists of scale consecutive articles.'''
+    if scale == 1:
+        return texts
+    return ["\n".join(texts[(i + j) % len(texts)] for j in range(scale)) for i in range(len(texts))]
+
+
+# ##########################################################################
+# Tokenizers
+# ##########################################################################
+
+def create_tokenizers():
+    '''
+    Returns list of (name, span_tokenize function) to benchmark. Baselines whose models are not installed are skipped.
+    '''
+    srb_tokenizer = SrbTokenizer()
+    fast_tokenizer = SrbTokenizer(fast=True)
+    tokenizers = [
+        ("SrbTokenizer", srb_tokenizer.span_tokenize),
+        ("SrbTokenizer.span_tokenize_sentences", srb_tokenizer.span_tokenize_sentences),
+        ("SrbTokenizer.span_tokenize_words", srb_tokenizer.span_tokenize_words),
+        ("SrbTokenizer(fast)", fast_tokenizer.span_tokenize),
+        ("SrbTokenizer(fast).span_tokenize_sentences", fast_tokenizer.span_tokenize_sentences),
+    ]
+    for sent_spec, word_spec in NLTK_BASELINES:
+        name = "%s+%s" % (sent_spec, word_spec)
+        try:
+            tokenizer = CascadeTokenizer(create_sent_tokenizer(sent_spec), create_word_tokenizer(word_spec))
+            tokenizer.span_tokenize("Тест. Тест.")
+        except (LookupError, NotImplementedError) as e:
+            sys.stderr.write("Skipping %s: %s\n" % (name, type(e).__name__))
+            continue
+        tokenizers.append((name, tokenizer.span_tokenize))
+    return tokenizers
+
+
+# ##########################################################################
+# Measurement
+# ##########################################################################
+
+def percentile(values, p):
+    '''Nearest rank percentile, p is in range [0, 100].'''
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def measure_peak_memory(span_tokenize, texts):
+    '''Peak memory in KB allocated while tokenizing a single document, separate pass because tracing slows down tokenization.'''
+    peak = 0
+    tracemalloc.start()
+    for text in texts:
+        tracemalloc.reset_peak()
+        list(span_tokenize(text))
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+    return peak // 1024
+
+
+def measure(span_tokenize, texts, repeat):
+    best_total = None
+    best_latencies = None
+    tokens = 0
+    for _ in range(repeat):
+        latencies = []
+        tokens = 0
+        for text in texts:
+            start = time.perf_counter()
+            tokens += len(list(span_tokenize(text)))
+            latencies.append(time.perf_counter() - start)
+        total = sum(latencies)
+        if best_total is None or total < best_total:
+            best_total = total
+            best_latencies = latencies
+
+    chars = sum(len(text) for text in texts)
+    return {
+        "docs": len(texts),
+        "chars": chars,
+        "tokens": tokens,
+        "seconds": best_total,
+        "chars_per_sec": chars / best_total,
+        "tokens_per_sec": tokens / best_total,
+        "latency_p50_ms": 1000 * percentile(best_latencies, 50),
+        "latency_p99_ms": 1000 * percentile(best_latencies, 99),
+        "peak_memory_kb": measure_peak_memory(span_tokenize, texts),
+    }
+
+
+def compare_to_baseline(results, baseline, max_regression, metrics=COMPARED_METRICS):
+    '''
+    Compares results with baseline results. Only results and metrics present in both are compared.
+
+    :param results: Dictionary that maps result name to dictionary of metrics
+    :param baseline: Baseline results in the same format
+    :param max_regression: Allowed relative regression, e.g. 0.1 for 10%
+    :param metrics: Dictionary that maps compared metric names to True if higher value is better
+    returns: List of regression messages, empty if there are no regressions.
+    '''
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        for metric, higher_is_better in metrics.items():
+            if metric not in result or metric not in baseline[name]:
+                continue
+            value = result[metric]
+            base = baseline[name][metric]
+            if higher_is_better:
+                regressed = value < base * (1.0 - max_regression)
+            else:
+                regressed = value > base * (1.0 + max_regression)
+            if regressed:
+                regressions.append("%s %s: %f, baseline %f" % (name, metric, value, base))
+    return regressions
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    texts = read_texts(args.raw_dir)
+    scales = args.scale or [1, 10]
+
+    results = {}
+    for name, span_tokenize in create_tokenizers():
+        if args.tokenizer and name not in args.tokenizer:
+            continue
+        for scale in scales:
+            sys.stderr.write("Running %s x%d\n" % (name, scale))
+            results["%s/politika_x%d" % (name, scale)] = measure(span_tokenize, scale_corpus(texts, scale), args.repeat)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if not args.no_startup:
+        report["startup"] = measure_startup(args.repeat)
+
+    out_json = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(out_json + "\n")
+    else:
+        print(out_json)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline["results"], args.max_regression)
+        regressions += compare_to_baseline({"startup": report.get("startup", {})}, {"startup": baseline.get("startup", {})}, args.max_regression, COMPARED_STARTUP_METRICS)
+        for message in regressions:
+            sys.stderr.write("Regression %s\n" % message)
+        if regressions:
+            sys.exit(1)
@@ -2,13 +2,15 @@ import os
 import sys
 import argparse
 
+import nltk
 from nltk.tokenize import TreebankWordTokenizer, WhitespaceTokenizer, PunktTokenizer, ToktokTokenizer
 
 # Add the parent directory to the system path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from srbtok.srb_tokenizer import SrbRegexpWordTokenizer, create_serbian_punkt_tokenizer
+from srbtok.srb_tokenizer import SrbRegexpWordTokenizer, create_serbian_punkt_tokenizer, create_serbian_fast_sentence_tokenizer
 from srbtok.cascade_tokenizer import CascadeTokenizer
-from srbtok.utils import tokenize_stream_sent_per_line, tokenize_stream
+from srbtok.cache import ResultCache, srbtok_fingerprint
+from srbtok.utils import iter_tokenize_stream_sent_per_line, iter_tokenize_stream, write_lines, tokenize_corpus, read_file_list
 
 #
 #  - екс - Yу ово је очигледна грешка у транслитерацији са латинице на ћирилицу
@@ -25,6 +27,11 @@ def parse_args():
     parser = argparse.ArgumentParser(description='Runs NLTK tokenizer on input text. If no input is specified stdin will be used as input. Output written to stdout.')
     parser.add_argument('-i', '--in-text', help='Input text file.', required=False)
     parser.add_argument('-t', '--tokenized-text', help="Output tokenized text file.", required=False)
+    parser.add_argument('-id', '--input-dir', help='Tokenize all files in this directory tree (or the ones in --file-list), the tokenizer is created only once.', required=False)
+    parser.add_argument('-od', '--output-dir', help='Output directory for --input-dir, relative file paths are preserved.', required=False)
+    parser.add_argument('-fl', '--file-list', help='File with one path relative to --input-dir per line.', required=False)
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used for --input-dir.')
+    parser.add_argument('-c', '--cache', help='Sqlite file with cached tokenization results for --input-dir. Files tokenized before with the same tokenizers and code are copied from cache.', required=False)
     parser.add_argument('-st', '--sent-tokenizer', default="none", help='NLTK sentence tokenization algorithm')
     parser.add_argument('-wt', '--word-tokenizer', required=True, help='NLTK word tokenization algorithm')
     parser.add_argument('-spl', '--sent-per-line', action='store_true', help='Write one sentence per line in output file')
@@ -48,6 +55,9 @@ def create_sent_tokenizer(spec_str):
     
     elif spec_str=="PunktTokenizer(serbian)":
         return create_serbian_punkt_tokenizer()
+
+    elif spec_str=="FastSentenceTokenizer(serbian)":
+        return create_serbian_fast_sentence_tokenizer()
     
     elif spec_str == "None":
         return DummyTokenizer()
@@ -81,6 +91,22 @@ if __name__ == "__main__":
 
     tokenizer = CascadeTokenizer(sent_tokenizer, word_tokenizer)
 
+    if args.input_dir:
+        assert args.output_dir, "--input-dir requires --output-dir"
+        file_names = read_file_list(args.file_list) if args.file_list else None
+        if args.cache:
+            cache_namespace = "nltk_tokenize/%s/%s" % (args.sent_tokenizer, args.word_tokenizer)
+            fingerprint = srbtok_fingerprint(nltk.__version__, args.sent_tokenizer, args.word_tokenizer)
+            with ResultCache(args.cache) as cache:
+                for _ in tokenize_corpus(tokenizer, args.input_dir, args.output_dir, file_names, args.sent_per_line, args.jobs, cache, cache_namespace, fingerprint):
+                    pass
+                cache.evict_stale(cache_namespace, fingerprint)
+                sys.stderr.write(cache.report() + "\n")
+        else:
+            for _ in tokenize_corpus(tokenizer, args.input_dir, args.output_dir, file_names, args.sent_per_line, args.jobs):
+                pass
+        sys.exit(0)
+
     istream = sys.stdin
     if args.in_text:
         istream = open(args.in_text, 'r', encoding='utf-8')
@@ -90,7 +116,7 @@ if __name__ == "__main__":
         ostream = open(args.tokenized_text, 'w', encoding='utf-8')
     
     if args.sent_per_line:
-        tokenized_text = tokenize_stream_sent_per_line(istream, tokenizer)
+        tokenized_lines = iter_tokenize_stream_sent_per_line(istream, tokenizer)
     else:
-        tokenized_text = tokenize_stream(istream, tokenizer)
-    ostream.write(tokenized_text)
+        tokenized_lines = iter_tokenize_stream(istream, tokenizer)
+    write_lines(tokenized_lines, ostream)
@@ -2,10 +2,20 @@ import argparse
 import os
 import sys
 import glob
+import multiprocessing
+from collections import defaultdict
 import Levenshtein
 
+# Add the parent directory to the system path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from srbtok.cache import ResultCache, content_hash, file_hash
+
 WORD_SEP = ' '
 
+# namespace of score results in --cache file, version has to be changed when scoring changes
+CACHE_NAMESPACE = "score"
+SCORE_VERSION = "1"
+
 def parse_args():
     parser = argparse.ArgumentParser(description='Computes tokenized text recall.')
     parser.add_argument('-e', '--expected', help='Expected tokenized text file.', required=False)
@@ -13,17 +23,35 @@ def parse_args():
     parser.add_argument('-ed', '--expected-dir', help='Directory with expected files', required=False)
     parser.add_argument('-ad', '--actual-dir', help='Directory with actual tokenization output files', required=False)
     parser.add_argument('-pfr', '--per-file-results', help='Per file results output file', required=False)
+    parser.add_argument('-c', '--cache', help='Sqlite file with cached (total, tp) results of file pairs, pairs with unchanged content are not scored again.', required=False)
+    parser.add_argument('-cma', '--cache-max-age', type=float, default=30, help='Remove cached results that were not used for this many days.')
+    parser.add_argument('-j', '--jobs', type=int, default=1, help='Number of worker processes used to score files in --expected-dir. 0 means number of CPUs.')
 
     return parser.parse_args()
 
 
+# largest id that can be stored as one character of python string
+MAX_PACKED_ID = sys.maxunicode
+
+
 def read_word_tokens(path):
-    words = []
     with open(path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            words.extend(line.split())
-    return words
+        return f.read().split()
+
+
+def encode_tokens(expected_words, actual_words):
+    '''
+    Maps tokens of both sequences to integer ids through one vocabulary, so equal tokens get equal ids. Ids are packed
+    as characters of a string, which Levenshtein aligns much faster than lists of python strings. If there are too many
+    distinct tokens lists of ids are returned.
+    '''
+    vocabulary = defaultdict()
+    vocabulary.default_factory = vocabulary.__len__
+    expected_ids = list(map(vocabulary.__getitem__, expected_words))
+    actual_ids = list(map(vocabulary.__getitem__, actual_words))
+    if len(vocabulary) > MAX_PACKED_ID + 1:
+        return expected_ids, actual_ids
+    return ''.join(map(chr, expected_ids)), ''.join(map(chr, actual_ids))
 
 
 def count_equal(opcodes):
@@ -39,7 +67,8 @@ def process_file_pair(expected_path, actual_path):
     expected_words = read_word_tokens(expected_path)
     actual_words = read_word_tokens(actual_path)
 
-    opcodes = Levenshtein.opcodes(actual_words, expected_words)
+    expected_ids, actual_ids = encode_tokens(expected_words, actual_words)
+    opcodes = Levenshtein.opcodes(actual_ids, expected_ids)
 
     tp = count_equal(opcodes)
     total = len(expected_words)
@@ -55,7 +84,11 @@ def get_filelist(dir):
     return file_list
 
 
-def process_directory_pair(actual_dir, expected_dir):
+def _process_file_pair(paths):
+    return process_file_pair(*paths)
+
+
+def process_directory_pair(actual_dir, expected_dir, workers=1, cache=None):
     actual_files = set(get_filelist(actual_dir))
     expected_files = set(get_filelist(expected_dir))
 
@@ -69,13 +102,31 @@ def process_directory_pair(actual_dir, expected_dir):
     for path in sorted(actual_only):
         sys.stderr.write("Actual only file: %s" % os.path.join(actual_dir, path))
     
-    # process files
+    # results of unchanged pairs are taken from cache
     file2result = {}
-    for path in common_files:
-        expected_path = os.path.join(expected_dir, path)
-        actual_path = os.path.join(actual_dir, path)
-        file2result[path] = process_file_pair(expected_path, actual_path)
-    
+    file2key = {}
+    for path in sorted(common_files):
+        if cache is not None:
+            file2key[path] = content_hash(SCORE_VERSION, file_hash(os.path.join(expected_dir, path)), file_hash(os.path.join(actual_dir, path)))
+            result = cache.get(CACHE_NAMESPACE, file2key[path])
+            if result is not None:
+                file2result[path] = tuple(result)
+
+    # process files
+    missing_files = [path for path in sorted(common_files) if path not in file2result]
+    path_pairs = [(os.path.join(expected_dir, path), os.path.join(actual_dir, path)) for path in missing_files]
+    if workers == 1:
+        file2result.update(zip(missing_files, map(_process_file_pair, path_pairs)))
+    else:
+        workers = workers or os.cpu_count()
+        chunksize = max(1, len(path_pairs) // (4 * workers))
+        with multiprocessing.Pool(workers) as pool:
+            file2result.update(zip(missing_files, pool.imap(_process_file_pair, path_pairs, chunksize)))
+
+    if cache is not None:
+        for path in missing_files:
+            cache.put(CACHE_NAMESPACE, file2key[path], file2result[path], SCORE_VERSION)
+        cache.commit()
     return file2result
 
 
@@ -120,7 +171,13 @@ if __name__ == "__main__":
         assert not args.expected, "Option --expected shouldn't be used with --expected-dir"
         assert not args.actual, "Option --actual shouldn't be used with --expected-dir"
 
-        file2result = process_directory_pair(args.actual_dir, args.expected_dir)
+        cache = ResultCache(args.cache) if args.cache else None
+        file2result = process_directory_pair(args.actual_dir, args.expected_dir, args.jobs or None, cache)
+        if cache is not None:
+            cache.evict_stale(CACHE_NAMESPACE, SCORE_VERSION)
+            cache.evict_older_than(args.cache_max_age * 24 * 3600)
+            sys.stderr.write(cache.report() + "\n")
+            cache.close()
         total, tp = sum_results(file2result.values())
         report_overall_result(total, tp)
         if args.per_file_results:
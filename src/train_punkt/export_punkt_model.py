@@ -0,0 +1,33 @@
+import argparse
+import os
+import pickle
+
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from srbtok.punkt_model import save_punkt_params, load_punkt_params
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Converts pickled NLTK Punkt parameters to compact model format.')
+    parser.add_argument('-p', '--pickle', help='Input Punkt model as pickle file.', required=True)
+    parser.add_argument('-m', '--model', help="Output Punkt model in compact format.", required=True)
+    return parser.parse_args()
+
+
+def same_params(params1, params2):
+    return (params1.abbrev_types == params2.abbrev_types and
+            params1.collocations == params2.collocations and
+            params1.sent_starters == params2.sent_starters and
+            {k: v for k, v in params1.ortho_context.items() if v} == {k: v for k, v in params2.ortho_context.items() if v})
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    with open(args.pickle, "rb") as f:
+        params = pickle.load(f)
+
+    save_punkt_params(params, args.model)
+
+    # verify that the model loads back to the same parameters
+    assert same_params(params, load_punkt_params(args.model)), "Exported model differs from pickle."
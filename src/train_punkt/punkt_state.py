@@ -0,0 +1,90 @@
+import gzip
+import json
+
+from nltk.probability import FreqDist
+from nltk.tokenize.punkt import PunktTrainer
+
+
+#
+# Training state is everything PunktTrainer needs to continue training: raw frequency counts and learned
+# abbreviations and orthographic context. It is stored as gzipped JSON, independent of NLTK pickle format:
+#
+#   {
+#     "version": 1,
+#     "type_fdist": [[type, count], ...],
+#     "num_period_toks": int,
+#     "sentbreak_count": int,
+#     "sent_starter_fdist": [[type, count], ...],
+#     "collocation_fdist": [[[type1, type2], count], ...],
+#     "abbrev_types": [type, ...],
+#     "ortho_context": {type: flags, ...}
+#   }
+#
+# Frequency distributions are stored as lists of pairs because after PunktTrainer.freq_threshold they contain
+# None key with number of removed types. Pairs are written one by one, so frequency distributions kept on disk
+# (spill_counts.DiskFreqDist) are not loaded to memory when state is saved. Loaded state is always in memory.
+#
+
+STATE_VERSION = 1
+
+
+def _fdist_items(fdist):
+    '''Returns items of FreqDist or DiskFreqDist sorted by key, None key first.'''
+    if hasattr(fdist, 'sorted_items'):
+        # spill_counts.DiskFreqDist
+        return fdist.items()
+    return sorted(fdist.items(), key=lambda item: (item[0] is not None, item[0] or ()))
+
+
+def _write_json_list(f, items):
+    f.write("[")
+    for i, item in enumerate(items):
+        if i:
+            f.write(", ")
+        f.write(json.dumps(item, ensure_ascii=False))
+    f.write("]")
+
+
+def save_trainer_state(trainer, path):
+    '''Saves counts of PunktTrainer to gzipped JSON file, so training can be continued with new text later.'''
+    state = [
+        ("version", STATE_VERSION),
+        ("type_fdist", _fdist_items(trainer._type_fdist)),
+        ("num_period_toks", trainer._num_period_toks),
+        ("sentbreak_count", trainer._sentbreak_count),
+        ("sent_starter_fdist", _fdist_items(trainer._sent_starter_fdist)),
+        ("collocation_fdist", _fdist_items(trainer._collocation_fdist)),
+        ("abbrev_types", sorted(trainer._params.abbrev_types)),
+        ("ortho_context", {typ: flags for typ, flags in sorted(trainer._params.ortho_context.items()) if flags}),
+    ]
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write("{")
+        for i, (name, value) in enumerate(state):
+            if i:
+                f.write(", ")
+            f.write(json.dumps(name) + ": ")
+            if name.endswith("_fdist"):
+                _write_json_list(f, value)
+            else:
+                f.write(json.dumps(value, ensure_ascii=False))
+        f.write("}")
+
+
+def load_trainer_state(path):
+    '''Creates PunktTrainer with counts loaded from file written by save_trainer_state.'''
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        state = json.load(f)
+    if state.get("version") != STATE_VERSION:
+        raise ValueError("Unsupported Punkt training state version %r in %s, expected %d" % (state.get("version"), path, STATE_VERSION))
+
+    trainer = PunktTrainer()
+    trainer._type_fdist = FreqDist(dict((typ, count) for typ, count in state["type_fdist"]))
+    trainer._num_period_toks = state["num_period_toks"]
+    trainer._sentbreak_count = state["sentbreak_count"]
+    trainer._sent_starter_fdist = FreqDist(dict((typ, count) for typ, count in state["sent_starter_fdist"]))
+    trainer._collocation_fdist = FreqDist(dict((tuple(types) if types is not None else None, count) for types, count in state["collocation_fdist"]))
+    trainer._params.abbrev_types.update(state["abbrev_types"])
+    for typ, flags in state["ortho_context"].items():
+        trainer._params.add_ortho_context(typ, flags)
+    trainer._finalized = False
+    return trainer
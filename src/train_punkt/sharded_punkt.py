@@ -0,0 +1,361 @@
+import os
+import sys
+import mmap
+import operator
+import multiprocessing
+from collections import Counter, defaultdict
+
+from nltk.probability import FreqDist
+from nltk.tokenize.punkt import PunktTrainer, _ORTHO_MAP, _ORTHO_BEG_UC, _ORTHO_MID_UC
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from srbtok.srb_tokenizer import normalize_text
+from srbtok.utils import iter_file_chunks, read_file_chunk, split_chunk_lines
+from train_punkt.spill_counts import SpillingCounter, DiskFreqDist, merge_sorted_counts, encode_key
+
+
+#
+# Sharded Punkt training gives the same parameters as PunktTrainer().train(text) on the whole corpus, but the counting
+# is done on shards of the corpus in parallel. Training has two passes over the shards:
+#
+#  1. Count token types and period final tokens. Counts are summed and abbreviation types are classified once from
+#     the totals, as PunktTrainer does before it annotates tokens.
+#  2. With the final abbreviation types annotate tokens and collect orthographic context, sentence break count,
+#     sentence starter and collocation counts and rare abbreviation candidates. Orthographic flags are merged with
+#     OR, counts are summed. Rare abbreviations are decided from the merged counts and orthographic context.
+#
+# Shards are byte ranges of the corpus file that end on new line. Punkt tokens never span lines, but orthographic
+# context and token pairs depend on the previous token, so every shard also tokenizes the nearest previous line with
+# tokens.
+#
+
+DEFAULT_SHARD_SIZE = 16 * 1024 * 1024
+
+
+# ##########################################################################
+# Shards
+# ##########################################################################
+
+def iter_lines_before(mm, pos):
+    '''Yields lines of memory mapped file that precede byte offset pos, starting with the nearest one.'''
+    end = pos
+    while end > 0:
+        begin = mm.rfind(b'\n', 0, end - 1) + 1
+        text = mm[begin:end].decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+        yield from reversed(split_chunk_lines(text))
+        end = begin
+
+
+def read_shard_context(trainer, path, start):
+    '''
+    Returns the last token before byte offset start (None at the start of file) and True if there is an empty line
+    between this token and start, so the first token of shard starts a paragraph.
+    '''
+    if start == 0:
+        return None, False
+
+    parastart = False
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter_lines_before(mm, start):
+                line = normalize_text(line)
+                tokens = list(trainer._tokenize_words(line))
+                if tokens:
+                    return tokens[-1], parastart
+                if not line.strip():
+                    parastart = True
+    return None, parastart
+
+
+def read_shard_tokens(trainer, path, start, end, parastart=False):
+    text = normalize_text(read_file_chunk(path, start, end))
+    # empty line in front marks the first token as paragraph start, same as in the whole corpus
+    return list(trainer._tokenize_words("\n" * parastart + text))
+
+
+# ##########################################################################
+# Pass 1: type counts
+# ##########################################################################
+
+def count_shard_types(path, start, end):
+    '''
+    Counts case normalized token types and period final tokens in shard.
+    returns: Pair (Counter of types, number of period final tokens)
+    '''
+    trainer = PunktTrainer()
+    type_fdist = Counter()
+    num_period_toks = 0
+    for aug_tok in read_shard_tokens(trainer, path, start, end):
+        type_fdist[aug_tok.type] += 1
+        if aug_tok.period_final:
+            num_period_toks += 1
+    return type_fdist, num_period_toks
+
+
+def classify_abbrev_types(trainer, types, verbose=False):
+    '''
+    Classifies abbreviation types from trainer type counts, the same way as PunktTrainer does it for the types of
+    a new training text: new abbreviations are added, known abbreviations that are no longer likely are removed.
+    '''
+    for abbr, score, is_add in trainer._reclassify_abbrev_types(types):
+        if score >= trainer.ABBREV:
+            if is_add:
+                trainer._params.abbrev_types.add(abbr)
+                if verbose:
+                    print(f"  Abbreviation: [{score:6.4f}] {abbr}")
+        elif not is_add:
+            trainer._params.abbrev_types.remove(abbr)
+            if verbose:
+                print(f"  Removed abbreviation: [{score:6.4f}] {abbr}")
+
+
+# ##########################################################################
+# Pass 2: orthographic context, sentence starters and collocations
+# ##########################################################################
+
+# trainer with final abbreviation types, one per worker process
+_worker_trainer = None
+
+
+def _init_worker(abbrev_types):
+    global _worker_trainer
+    _worker_trainer = PunktTrainer()
+    _worker_trainer._params.abbrev_types.update(abbrev_types)
+
+
+def _context_after(aug_tok):
+    '''Orthographic context of the token that follows aug_tok, same rules as PunktTrainer._get_orthography_data.'''
+    if aug_tok.sentbreak:
+        if not (aug_tok.is_number or aug_tok.is_initial):
+            return "initial"
+        return "unknown"
+    elif aug_tok.ellipsis or aug_tok.abbr:
+        return "unknown"
+    return "internal"
+
+
+def get_orthography_data(tokens, prev_tok=None):
+    '''
+    Returns dictionary of orthographic context flags of token types, the same flags that
+    PunktTrainer._get_orthography_data adds for these tokens when they follow prev_tok.
+    '''
+    ortho_context = defaultdict(int)
+    context = "internal" if prev_tok is None else _context_after(prev_tok)
+    for aug_tok in tokens:
+        if aug_tok.parastart and context != "unknown":
+            context = "initial"
+        if aug_tok.linestart and context == "internal":
+            context = "unknown"
+
+        flag = _ORTHO_MAP.get((context, aug_tok.first_case), 0)
+        if flag:
+            ortho_context[aug_tok.type_no_sentperiod] |= flag
+
+        context = _context_after(aug_tok)
+    return ortho_context
+
+
+def rare_abbrev_candidate(trainer, cur_tok, next_tok, shard_type_fdist):
+    '''
+    Checks the part of PunktTrainer._is_rare_abbrev_type that can be decided inside of one shard.
+    returns: None if cur_tok is not rare abbreviation, otherwise pair (type, next type) where next type is None if
+    the type is rare abbreviation when it is rare in the whole corpus, or type of the next token if it also depends on
+    orthographic context of the next type.
+    '''
+    if cur_tok.abbr or not cur_tok.sentbreak:
+        return None
+    typ = cur_tok.type_no_sentperiod
+    # counts in shard are lower bound of the total counts
+    count = shard_type_fdist[typ] + shard_type_fdist[typ[:-1]]
+    if typ in trainer._params.abbrev_types or count >= trainer.ABBREV_BACKOFF:
+        return None
+    if next_tok.tok[:1] in trainer._lang_vars.internal_punctuation:
+        return typ, None
+    if next_tok.first_lower:
+        return typ, next_tok.type_no_sentperiod
+    return None
+
+
+def collect_shard_statistics(path, start, end):
+    '''
+    Annotates tokens of shard with final abbreviation types and collects statistics of the second pass.
+    returns: ShardStatistics
+    '''
+    trainer = _worker_trainer
+    prev_tok, parastart = read_shard_context(trainer, path, start)
+    if prev_tok is not None:
+        trainer._first_pass_annotation(prev_tok)
+    tokens = list(trainer._annotate_first_pass(read_shard_tokens(trainer, path, start, end, parastart)))
+
+    stats = ShardStatistics()
+    stats.ortho_context.update(get_orthography_data(tokens, prev_tok))
+    stats.sentbreak_count = trainer._get_sentbreak_count(tokens)
+
+    if prev_tok is not None:
+        tokens.insert(0, prev_tok)
+    shard_type_fdist = Counter(aug_tok.type for aug_tok in tokens)
+    for aug_tok1, aug_tok2 in zip(tokens, tokens[1:]):
+        if not aug_tok1.period_final:
+            continue
+        candidate = rare_abbrev_candidate(trainer, aug_tok1, aug_tok2, shard_type_fdist)
+        if candidate is not None:
+            stats.rare_abbrev_candidates.add(candidate)
+        if trainer._is_potential_sent_starter(aug_tok2, aug_tok1):
+            stats.sent_starter_fdist[aug_tok2.type] += 1
+        if trainer._is_potential_collocation(aug_tok1, aug_tok2):
+            stats.collocation_fdist[(aug_tok1.type_no_period, aug_tok2.type_no_sentperiod)] += 1
+    return stats
+
+
+class ShardStatistics:
+    '''
+    Statistics of the second pass of one or more shards.
+
+    :param memory_limit: If not None, orthographic context, sentence starter and collocation counts are kept in
+        SpillingCounter, each with a third of this limit in bytes.
+    :param tmp_dir: Directory for spilled counts.
+    '''
+    def __init__(self, memory_limit=None, tmp_dir=None):
+        self.spilling = memory_limit is not None
+        if self.spilling:
+            self.ortho_context = SpillingCounter(memory_limit // 3, operator.or_, tmp_dir)
+            self.sent_starter_fdist = SpillingCounter(memory_limit // 3, tmp_dir=tmp_dir)
+            self.collocation_fdist = SpillingCounter(memory_limit // 3, tmp_dir=tmp_dir)
+        else:
+            self.ortho_context = defaultdict(int)
+            self.sent_starter_fdist = Counter()
+            self.collocation_fdist = Counter()
+        self.sentbreak_count = 0
+        self.rare_abbrev_candidates = set()
+
+
+    def update(self, other):
+        '''Merges statistics of other shard.'''
+        if self.spilling:
+            self.ortho_context.update(other.ortho_context)
+        else:
+            for typ, flags in other.ortho_context.items():
+                self.ortho_context[typ] |= flags
+        self.sentbreak_count += other.sentbreak_count
+        self.sent_starter_fdist.update(other.sent_starter_fdist)
+        self.collocation_fdist.update(other.collocation_fdist)
+        self.rare_abbrev_candidates.update(other.rare_abbrev_candidates)
+
+
+def _sorted_encoded_items(counts):
+    if hasattr(counts, 'sorted_items'):
+        return counts.sorted_items()
+    return sorted((encode_key(key), count) for key, count in counts.items())
+
+
+def merge_freq_dist(fdist, counts, tmp_dir=None):
+    '''
+    Returns fdist with counts added. Counts in memory are added to FreqDist in place, spilled counts are merged with
+    fdist to DiskFreqDist.
+    '''
+    if isinstance(counts, SpillingCounter) or isinstance(fdist, DiskFreqDist):
+        return DiskFreqDist(merge_sorted_counts([_sorted_encoded_items(fdist), _sorted_encoded_items(counts)]), tmp_dir)
+    fdist.update(counts)
+    return fdist
+
+
+def add_rare_abbrev_types(trainer, rare_abbrev_candidates, verbose=False):
+    '''Adds rare abbreviations, decided with the total type counts and orthographic context.'''
+    for typ, next_typ in sorted(rare_abbrev_candidates, key=lambda candidate: (candidate[0], candidate[1] or "")):
+        count = trainer._type_fdist[typ] + trainer._type_fdist[typ[:-1]]
+        if typ in trainer._params.abbrev_types or count >= trainer.ABBREV_BACKOFF:
+            continue
+        if next_typ is not None:
+            next_ortho_context = trainer._params.ortho_context.get(next_typ, 0)
+            if not (next_ortho_context & _ORTHO_BEG_UC) or next_ortho_context & _ORTHO_MID_UC:
+                continue
+        trainer._params.abbrev_types.add(typ)
+        if verbose:
+            print("  Rare Abbrev: %s." % typ)
+
+
+# ##########################################################################
+# Training
+# ##########################################################################
+
+def _run_shard_task(task):
+    func, shard = task
+    return func(*shard)
+
+
+def _map_shards(func, shards, workers, initializer=None, initargs=()):
+    '''Yields func(path, start, end) for every shard, in any order, results are merged as soon as they are ready.'''
+    if workers == 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for shard in shards:
+            yield func(*shard)
+        return
+
+    with multiprocessing.Pool(workers, initializer=initializer, initargs=initargs) as pool:
+        yield from pool.imap_unordered(_run_shard_task, [(func, shard) for shard in shards])
+
+
+def train_sharded(path, workers=None, shard_size=DEFAULT_SHARD_SIZE, verbose=False, trainer=None, memory_limit=None, tmp_dir=None):
+    '''
+    Trains Punkt parameters on UTF-8 corpus file split to shards that are processed in worker processes.
+    Text is normalized with normalize_text. Parameters are the same as from PunktTrainer().train(text) on the whole
+    normalized text.
+
+    If trainer with counts of previous training is given, new text is added to it and parameters are the same as from
+    trainer.train(text), i.e. counts of previous text are kept and only new text is annotated.
+
+    With memory_limit frequency tables are counted in SpillingCounter and kept in DiskFreqDist afterwards, so memory
+    does not grow with vocabulary, only the final parameters are in memory. Counts are still exact.
+
+    :param path: Training corpus
+    :param workers: Number of worker processes. If None os.cpu_count() is used. If 1 shards are processed in this process.
+    :param shard_size: Approximate shard size in bytes.
+    :param verbose: Print found abbreviations, sentence starters and collocations.
+    :param trainer: PunktTrainer to continue, e.g. loaded with punkt_state.load_trainer_state. It is updated in place.
+    :param memory_limit: Approximate memory in bytes for frequency tables of the main process. If None they are kept in memory.
+    :param tmp_dir: Directory for spilled counts. If None default temporary directory is used.
+    returns: PunktParameters
+    '''
+    shards = [(path, start, end) for start, end in iter_file_chunks(path, shard_size)]
+    if trainer is None:
+        trainer = PunktTrainer()
+
+    # pass 1: type counts and abbreviation types
+    if memory_limit is None:
+        new_type_fdist = Counter()
+    else:
+        new_type_fdist = SpillingCounter(memory_limit, tmp_dir=tmp_dir)
+    for type_fdist, num_period_toks in _map_shards(count_shard_types, shards, workers):
+        new_type_fdist.update(type_fdist)
+        trainer._num_period_toks += num_period_toks
+
+    trainer._type_fdist = merge_freq_dist(trainer._type_fdist, new_type_fdist, tmp_dir)
+    # only types of the new text are classified, as PunktTrainer does
+    classify_abbrev_types(trainer, (typ for typ, _ in new_type_fdist.items()), verbose)
+    if memory_limit is not None:
+        new_type_fdist.close()
+    del new_type_fdist
+
+    # pass 2: everything that depends on abbreviation types
+    stats = ShardStatistics(memory_limit, tmp_dir)
+    for shard_stats in _map_shards(collect_shard_statistics, shards, workers, _init_worker, (trainer._params.abbrev_types,)):
+        stats.update(shard_stats)
+
+    return finalize_sharded_training(trainer, stats, verbose, tmp_dir)
+
+
+def finalize_sharded_training(trainer, stats, verbose=False, tmp_dir=None):
+    '''Adds merged statistics of the second pass to trainer, adds rare abbreviations and finds collocations and sentence starters.'''
+    for typ, flags in stats.ortho_context.items():
+        trainer._params.add_ortho_context(typ, flags)
+    trainer._sentbreak_count += stats.sentbreak_count
+    trainer._sent_starter_fdist = merge_freq_dist(trainer._sent_starter_fdist, stats.sent_starter_fdist, tmp_dir)
+    trainer._collocation_fdist = merge_freq_dist(trainer._collocation_fdist, stats.collocation_fdist, tmp_dir)
+    if stats.spilling:
+        for counts in (stats.ortho_context, stats.sent_starter_fdist, stats.collocation_fdist):
+            counts.close()
+    add_rare_abbrev_types(trainer, stats.rare_abbrev_candidates, verbose)
+
+    trainer.finalize_training(verbose)
+    return trainer.get_params()
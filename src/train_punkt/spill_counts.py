@@ -0,0 +1,213 @@
+import os
+import sys
+import heapq
+import sqlite3
+import operator
+import tempfile
+import weakref
+from itertools import groupby
+
+
+#
+# Counting with bounded memory. SpillingCounter keeps counts in a dictionary until its estimated size reaches
+# the memory limit, then writes them as a sorted run to temporary file and starts again. Runs are merged with
+# heapq.merge, so merged counts are exact and come out sorted by key. DiskFreqDist stores merged counts in sqlite
+# file and can be used by PunktTrainer in place of FreqDist.
+#
+# Keys are strings or tuples of strings. Punkt types never contain whitespace, so tuples are stored joined with tab
+# and every run line is "key<TAB>count". None key, which FreqDist has after PunktTrainer.freq_threshold, is stored as
+# empty string.
+#
+
+# approximate size of dictionary slot and int value
+ENTRY_OVERHEAD = 100
+
+
+def encode_key(key):
+    if key is None:
+        return ""
+    if isinstance(key, tuple):
+        return "\t".join(key)
+    return key
+
+
+def decode_key(encoded):
+    if not encoded:
+        return None
+    if "\t" in encoded:
+        return tuple(encoded.split("\t"))
+    return encoded
+
+
+def _remove_file(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def _read_run(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            key, _, value = line.rstrip('\n').rpartition('\t')
+            yield key, int(value)
+
+
+def merge_sorted_counts(runs, combine=operator.add):
+    '''Merges iterables of (encoded key, count) sorted by key, counts of equal keys are combined.'''
+    for key, group in groupby(heapq.merge(*runs, key=operator.itemgetter(0)), key=operator.itemgetter(0)):
+        values = [value for _, value in group]
+        value = values[0]
+        for other in values[1:]:
+            value = combine(value, other)
+        yield key, value
+
+
+class SpillingCounter:
+    '''
+    Counter with memory limit, counts above the limit are spilled to sorted runs in temporary files.
+
+    :param memory_limit: Approximate size of counts kept in memory in bytes.
+    :param combine: Function that combines two counts of the same key, addition by default, operator.or_ for flags.
+    :param tmp_dir: Directory for temporary files. If None default temporary directory is used.
+    '''
+    def __init__(self, memory_limit, combine=operator.add, tmp_dir=None):
+        self.memory_limit = memory_limit
+        self.combine = combine
+        self.tmp_dir = tmp_dir
+        self.spill_count = 0
+        self._counts = {}
+        self._size = 0
+        self._runs = []
+        self._finalizer = weakref.finalize(self, SpillingCounter._remove_runs, self._runs)
+
+
+    def add(self, key, value=1):
+        key = encode_key(key)
+        if key in self._counts:
+            self._counts[key] = self.combine(self._counts[key], value)
+            return
+        self._counts[key] = value
+        self._size += sys.getsizeof(key) + ENTRY_OVERHEAD
+        if self._size >= self.memory_limit:
+            self.spill()
+
+
+    def update(self, counts):
+        for key, value in counts.items():
+            self.add(key, value)
+
+
+    def spill(self):
+        '''Writes counts kept in memory to a new sorted run.'''
+        if not self._counts:
+            return
+        fd, path = tempfile.mkstemp(prefix="counts_", suffix=".run", dir=self.tmp_dir)
+        self._runs.append(path)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            for key in sorted(self._counts):
+                f.write("%s\t%d\n" % (key, self._counts[key]))
+        self.spill_count += 1
+        self._counts = {}
+        self._size = 0
+
+
+    def sorted_items(self):
+        '''Yields (encoded key, count) of all counts sorted by key.'''
+        in_memory = sorted(self._counts.items())
+        return merge_sorted_counts([_read_run(path) for path in self._runs] + [in_memory], self.combine)
+
+
+    def items(self):
+        for key, value in self.sorted_items():
+            yield decode_key(key), value
+
+
+    def close(self):
+        self._finalizer()
+
+
+    @staticmethod
+    def _remove_runs(runs):
+        for path in runs:
+            _remove_file(path)
+
+
+class DiskFreqDist:
+    '''
+    Read only frequency distribution stored in sqlite file. It implements the part of nltk FreqDist interface that
+    PunktTrainer uses when it finds abbreviations, collocations and sentence starters: indexing (0 for missing
+    keys), iteration over keys, items() and N().
+
+    :param sorted_items: Iterable of (encoded key, count) sorted by key, e.g. SpillingCounter.sorted_items()
+    :param tmp_dir: Directory for temporary sqlite file. If None default temporary directory is used.
+    '''
+    def __init__(self, sorted_items, tmp_dir=None):
+        fd, self.path = tempfile.mkstemp(prefix="fdist_", suffix=".sqlite", dir=tmp_dir)
+        os.close(fd)
+        self._conn = sqlite3.connect(self.path)
+        self._finalizer = weakref.finalize(self, DiskFreqDist._close, self._conn, self.path)
+        self._conn.execute('CREATE TABLE counts (key TEXT PRIMARY KEY, count INTEGER NOT NULL) WITHOUT ROWID')
+
+        self._N = 0
+        self._B = 0
+        def counted_items():
+            for key, count in sorted_items:
+                self._N += count
+                self._B += 1
+                yield key, count
+        with self._conn:
+            self._conn.executemany('INSERT INTO counts VALUES (?, ?)', counted_items())
+
+        # count of the key which was yielded last by iteration, PunktTrainer reads it right after
+        self._last_key = None
+        self._last_count = 0
+
+
+    def N(self):
+        return self._N
+
+
+    def B(self):
+        return self._B
+
+
+    def __len__(self):
+        return self._B
+
+
+    def __getitem__(self, key):
+        encoded = encode_key(key)
+        if encoded == self._last_key:
+            return self._last_count
+        row = self._conn.execute('SELECT count FROM counts WHERE key = ?', (encoded,)).fetchone()
+        return row[0] if row is not None else 0
+
+
+    def __contains__(self, key):
+        return self[key] > 0
+
+
+    def sorted_items(self):
+        '''Yields (encoded key, count) sorted by key.'''
+        return self._conn.execute('SELECT key, count FROM counts ORDER BY key')
+
+
+    def items(self):
+        for key, count in self.sorted_items():
+            yield decode_key(key), count
+
+
+    def __iter__(self):
+        for key, count in self.sorted_items():
+            self._last_key = key
+            self._last_count = count
+            yield decode_key(key)
+
+
+    def close(self):
+        self._finalizer()
+
+
+    @staticmethod
+    def _close(conn, path):
+        conn.close()
+        _remove_file(path)
@@ -7,12 +7,20 @@ from nltk.tokenize.punkt import PunktTrainer
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from srbtok.srb_tokenizer import normalize_text
+from sharded_punkt import train_sharded
+from punkt_state import save_trainer_state, load_trainer_state
 
 
 def parse_args():
     parser = argparse.ArgumentParser(description='Training corpora for the NLTK Punkt tokenizer.')
     parser.add_argument('-t', '--train', help='Training corpora.', required=True)
     parser.add_argument('-m', '--model', help="Output Punkt model as pickle file.", required=True)
+    parser.add_argument('-j', '--jobs', type=int, required=False, help="Train on shards of corpora in this many worker processes, 0 means number of CPUs. Result is the same as training on the whole corpora at once, without pruning of rare types. If not specified corpora is trained in one process in batches.")
+    parser.add_argument('-ss', '--shard-size', type=int, default=16, help="Shard size in MB for --jobs.")
+    parser.add_argument('-ml', '--memory-limit', type=int, required=False, help="Approximate memory in MB for frequency tables with --jobs. Counts above it are spilled to temporary files and merged exactly, so memory does not grow with vocabulary.")
+    parser.add_argument('-td', '--tmp-dir', required=False, help="Directory for counts spilled with --memory-limit. Default is system temporary directory.")
+    parser.add_argument('-r', '--resume-from', required=False, help="Training state saved by previous training. Training text is added to its counts, so only new text has to be given with --train.")
+    parser.add_argument('-s', '--state', required=False, help="Output training state, raw counts needed to continue training with --resume-from. Default is MODEL.state.json.gz.")
     parser.add_argument('-ad', '--abbreviations-dict', required=False, help="File with list of abbreviations to be manually added to the tokenizer.")
     return parser.parse_args()
 
@@ -55,7 +63,11 @@ def get_file_size(f):
 if __name__ == "__main__":
     args = parse_args()
 
-    trainer = PunktTrainer()
+    if args.resume_from:
+        print("Resuming from training state: %s" % args.resume_from)
+        trainer = load_trainer_state(args.resume_from)
+    else:
+        trainer = PunktTrainer()
     batch_size = 100000
 
 
@@ -63,35 +75,47 @@ if __name__ == "__main__":
         print("Adding abbreviations from dictionary: %s" % args.abbreviations_dict)
         read_abbreviations_from_file(args.abbreviations_dict)
 
-    with tqdm(total=1000) as p_bar:
-        print = tqdm.write
-
+    if args.jobs is not None:
         print("Using corpora: %s" % args.train)
-        with open(args.train, "r", encoding="utf-8") as file:
-            train_size = get_file_size(file)
+        memory_limit = args.memory_limit * 1024 * 1024 if args.memory_limit is not None else None
+        params = train_sharded(args.train, args.jobs or None, args.shard_size * 1024 * 1024, verbose=True, trainer=trainer,
+                               memory_limit=memory_limit, tmp_dir=args.tmp_dir)
+
+    else:
+        with tqdm(total=1000) as p_bar:
+            print = tqdm.write
 
-            while file.tell() < train_size:
-                print("Reading %d lines" % batch_size)
-                text_batch = next_batch(file, batch_size)
+            print("Using corpora: %s" % args.train)
+            with open(args.train, "r", encoding="utf-8") as file:
+                train_size = get_file_size(file)
 
-                # normalize similar characters to variant that tokenizer will handle
-                text_batch = normalize_text(text_batch)
+                while file.tell() < train_size:
+                    print("Reading %d lines" % batch_size)
+                    text_batch = next_batch(file, batch_size)
 
-                # run training
-                trainer.train(text_batch, finalize=False)
+                    # normalize similar characters to variant that tokenizer will handle
+                    text_batch = normalize_text(text_batch)
 
-                # prune to reduce mem usage is small
-                trainer.freq_threshold()
+                    # run training
+                    trainer.train(text_batch, finalize=False)
 
-                # progress bar
-                p_bar.n = 1000 * file.tell() // train_size
-                p_bar.refresh()
+                    # prune to reduce mem usage is small
+                    trainer.freq_threshold()
+
+                    # progress bar
+                    p_bar.n = 1000 * file.tell() // train_size
+                    p_bar.refresh()
     
 
-    print("Finalize training")
-    trainer.finalize_training(verbose=True)
-    params = trainer.get_params()
+        print("Finalize training")
+        trainer.finalize_training(verbose=True)
+        params = trainer.get_params()
+
 
+    # state is saved before abbreviations from dictionary are added, they are not learned
+    state_path = args.state or args.model + ".state.json.gz"
+    print("Saving training state: %s" % state_path)
+    save_trainer_state(trainer, state_path)
 
     if args.abbreviations_dict:
         print("Adding abbreviations from dictionary: %s" % args.abbreviations_dict)
@@ -4,5 +4,12 @@ train_corpora=../../data/train/train.txt
 abbreviations_dict=../../data/train/abbreviations_dict.txt
 
 dst=../srbtok/serbian_punkt_nltk.pickle
+dst_model=../srbtok/serbian_punkt.model
 
-python3 train_nltk_punkt.py --train ${train_corpora} --abbreviations-dict ${abbreviations_dict}  --model ${dst}
+python3 train_nltk_punkt.py --train ${train_corpora} --abbreviations-dict ${abbreviations_dict} --jobs 0 --model ${dst}
+python3 export_punkt_model.py --pickle ${dst} --model ${dst_model}
+
+# To add new articles to existing model without retraining from scratch:
+#   python3 train_nltk_punkt.py --train new_articles.txt --resume-from ${dst}.state.json.gz --abbreviations-dict ${abbreviations_dict} --jobs 0 --model ${dst}
+#   python3 export_punkt_model.py --pickle ${dst} --model ${dst_model}
+# Runtime loads ${dst_model} only if it is not older than ${dst}, so always export the model after training.
@@ -0,0 +1,104 @@
+import time
+import asyncio
+import unittest
+
+from srbtok.srb_tokenizer import get_tokenizer
+from srbtok.aio import AsyncSrbTokenizer
+
+
+TEXTS = [
+    "Др. Марко Топаловић је дежурни лекар. Данас ради до 20 часова.",
+    "\"Наш тим је победио!\", узвикнуо је.",
+    "",
+    "Крушке 1.000.000,50 дин. Јабуке..."
+]
+
+
+class SlowTokenizer:
+    '''Tokenizer that counts concurrent calls.'''
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    def tokenize(self, text):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        time.sleep(0.01)
+        self.running -= 1
+        return text.split()
+
+
+class AsyncSrbTokenizerTest(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = get_tokenizer()
+
+    def test_tokenize(self):
+        async def run():
+            async with AsyncSrbTokenizer() as tokenizer:
+                self.assertEqual(self.tokenizer.tokenize(TEXTS[0]), await tokenizer.tokenize(TEXTS[0]))
+                self.assertEqual(self.tokenizer.span_tokenize(TEXTS[3]), await tokenizer.span_tokenize(TEXTS[3]))
+                results = await asyncio.gather(*[tokenizer.tokenize(text) for text in TEXTS])
+                self.assertEqual([self.tokenizer.tokenize(text) for text in TEXTS], results)
+        asyncio.run(run())
+
+    def test_iter_tokenize_keeps_order(self):
+        texts = TEXTS * 10
+
+        async def produce():
+            for text in texts:
+                await asyncio.sleep(0)
+                yield text
+
+        async def run():
+            async with AsyncSrbTokenizer(workers=3, max_in_flight=4) as tokenizer:
+                from_iterable = [words async for words in tokenizer.iter_tokenize(texts)]
+                from_async_iterable = [spans async for spans in tokenizer.iter_span_tokenize(produce())]
+            return from_iterable, from_async_iterable
+
+        from_iterable, from_async_iterable = asyncio.run(run())
+        self.assertEqual([self.tokenizer.tokenize(text) for text in texts], from_iterable)
+        self.assertEqual([self.tokenizer.span_tokenize(text) for text in texts], from_async_iterable)
+
+    def test_processes(self):
+        async def run():
+            async with AsyncSrbTokenizer(workers=2, processes=True) as tokenizer:
+                return [words async for words in tokenizer.iter_tokenize(TEXTS)], await tokenizer.tokenize(TEXTS[1])
+
+        streamed, single = asyncio.run(run())
+        self.assertEqual([self.tokenizer.tokenize(text) for text in TEXTS], streamed)
+        self.assertEqual(self.tokenizer.tokenize(TEXTS[1]), single)
+
+    def test_max_in_flight(self):
+        slow = SlowTokenizer()
+
+        async def run():
+            async with AsyncSrbTokenizer(slow, workers=8, max_in_flight=2) as tokenizer:
+                # concurrent callers and a stream share the limit
+                gathered = asyncio.gather(*[tokenizer.tokenize("а б") for _ in range(10)])
+                streamed = [words async for words in tokenizer.iter_tokenize(["в г"] * 10)]
+                return await gathered, streamed
+
+        gathered, streamed = asyncio.run(run())
+        self.assertEqual([["а", "б"]] * 10, gathered)
+        self.assertEqual([["в", "г"]] * 10, streamed)
+        self.assertLessEqual(slow.max_running, 2)
+
+    def test_event_loop_not_blocked(self):
+        text = " ".join(TEXTS) * 200
+
+        async def run():
+            async with AsyncSrbTokenizer() as tokenizer:
+                ticks = 0
+                task = asyncio.ensure_future(tokenizer.tokenize(text))
+                while not task.done():
+                    ticks += 1
+                    await asyncio.sleep(0.001)
+                return ticks, task.result()
+
+        ticks, words = asyncio.run(run())
+        self.assertEqual(self.tokenizer.tokenize(text), words)
+        self.assertGreater(ticks, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
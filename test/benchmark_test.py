@@ -0,0 +1,29 @@
+import unittest
+
+from tools.benchmark import percentile, scale_corpus, compare_to_baseline
+
+
+class TestBenchmark(unittest.TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(50, percentile(values, 50))
+        self.assertEqual(99, percentile(values, 99))
+        self.assertEqual(100, percentile(values, 100))
+        self.assertEqual(7, percentile([7], 99))
+
+    def test_scale_corpus(self):
+        self.assertEqual(["a", "b"], scale_corpus(["a", "b"], 1))
+        self.assertEqual(["a\nb\na", "b\na\nb"], scale_corpus(["a", "b"], 3))
+
+    def test_compare_to_baseline(self):
+        baseline = {"tok": {"chars_per_sec": 1000.0, "latency_p99_ms": 10.0}}
+
+        results = {"tok": {"chars_per_sec": 950.0, "latency_p99_ms": 10.5}, "new": {"chars_per_sec": 1.0}}
+        self.assertEqual([], compare_to_baseline(results, baseline, 0.1))
+
+        results = {"tok": {"chars_per_sec": 800.0, "latency_p99_ms": 12.0}}
+        self.assertEqual(2, len(compare_to_baseline(results, baseline, 0.1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import unittest
+import tempfile
+
+from srbtok.cache import ResultCache, content_hash, srbtok_fingerprint
+
+
+class ResultCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "cache.sqlite")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_content_hash(self):
+        self.assertEqual(content_hash("ab", b"c"), content_hash(b"ab", "c"))
+        self.assertNotEqual(content_hash("ab", "c"), content_hash("a", "bc"))
+
+    def test_fingerprint(self):
+        self.assertEqual(srbtok_fingerprint("a"), srbtok_fingerprint("a"))
+        self.assertNotEqual(srbtok_fingerprint("a"), srbtok_fingerprint("b"))
+
+    def test_get_put(self):
+        with ResultCache(self.path) as cache:
+            self.assertIsNone(cache.get("score", "k1"))
+            cache.put("score", "k1", [5, 3], "v1")
+            cache.put("tokenize", "k1", "Др. Марко", "v1")
+            self.assertEqual([5, 3], cache.get("score", "k1"))
+            self.assertEqual(0.5, cache.hit_rate("score"))
+            self.assertEqual(0.0, cache.hit_rate("tokenize"))
+
+        with ResultCache(self.path) as cache:
+            self.assertEqual([5, 3], cache.get("score", "k1"))
+            self.assertEqual("Др. Марко", cache.get("tokenize", "k1"))
+            self.assertEqual("cache\tscore\thits\t1\tmisses\t0\thit_rate\t1.000000\ncache\ttokenize\thits\t1\tmisses\t0\thit_rate\t1.000000", cache.report())
+
+    def test_evict(self):
+        with ResultCache(self.path) as cache:
+            cache.put("tokenize", "k1", "a", "v1")
+            cache.put("tokenize", "k2", "b", "v2")
+            cache.put("score", "k1", [1, 1], "v1")
+            self.assertEqual(1, cache.evict_stale("tokenize", "v2"))
+            self.assertIsNone(cache.get("tokenize", "k1"))
+            self.assertEqual("b", cache.get("tokenize", "k2"))
+            self.assertEqual([1, 1], cache.get("score", "k1"))
+
+            self.assertEqual(0, cache.evict_older_than(3600))
+            self.assertEqual(2, cache.evict_older_than(-1))
+            self.assertIsNone(cache.get("score", "k1"))
+
+
+if __name__ == '__main__':
+    unittest.main()
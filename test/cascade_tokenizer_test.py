@@ -0,0 +1,157 @@
+import unittest
+from srbtok.srb_tokenizer import NormPunktTokenizer, SrbRegexpWordTokenizer
+from srbtok.cascade_tokenizer import CascadeTokenizer
+from srbtok.stats import TokenizerStats, LengthHistogram
+from srbtok.memo import TokenizerMemo, LRUCache
+from srbtok.utils import tokenize_lines
+
+
+TEXTS = [
+    "Др. Марко Топаловић је дежурни лекар. Данас ради до 20 часова.",
+    "\"Наш тим је победио!\", узвикнуо је.",
+    "",
+    "Крушке 1.000.000,50 дин. Јабуке..."
+]
+
+
+class CascadeTokenizerTest(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(CascadeTokenizerTest, self).__init__(*args, **kwargs)
+        self.tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer())
+
+    def test_fused_same_as_per_sentence(self):
+        per_sentence = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer(), fused=False)
+        texts = TEXTS + ["Цена је 100\nдин. А 1.5 кг? Нема „ништа“!!", "Јабуке 100 "]
+        for text in texts:
+            self.assertEqual(per_sentence.span_tokenize(text), self.tokenizer.span_tokenize(text))
+
+    def test_stats(self):
+        documents = []
+        tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer())
+        tokenizer.stats = TokenizerStats(callback=documents.append)
+        for text in TEXTS:
+            self.assertEqual(self.tokenizer.span_tokenize(text), tokenizer.span_tokenize(text))
+
+        stats = tokenizer.stats.as_dict()
+        self.assertEqual(len(TEXTS), stats["documents"])
+        self.assertEqual(sum(len(self.tokenizer.span_tokenize(text)) for text in TEXTS), stats["tokens"])
+        self.assertEqual(len(TEXTS), stats["stages"]["words"]["calls"])
+        self.assertEqual(len(TEXTS), len(documents))
+        self.assertEqual(0, documents[2]["tokens"])
+
+    def test_memo(self):
+        texts = TEXTS + ["Фото: Танјуг. Данас ради до 20 часова.", "Фото: Танјуг"] + TEXTS
+        for fused in [True, False]:
+            expected = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer(), fused=fused)
+            tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer(), fused=fused)
+            tokenizer.memo = TokenizerMemo(max_entries=100)
+            for text in texts:
+                self.assertEqual(expected.span_tokenize(text), tokenizer.span_tokenize(text))
+                self.assertEqual(expected.span_tokenize_words(text), tokenizer.span_tokenize_words(text))
+                self.assertEqual(expected.span_tokenize(text), tokenizer.span_tokenize_compact(text).tolist())
+
+            memo = tokenizer.memo.as_dict()
+            self.assertEqual(len(TEXTS) + 2, memo["texts"]["misses"])
+            self.assertEqual(2 * len(texts) - len(TEXTS) - 2, memo["texts"]["hits"])
+            # sentence after the byline was seen in the first text, span_tokenize_words of repeated texts hit too
+            self.assertEqual(1 + len(TEXTS) + 1, memo["sentences"]["hits"])
+
+    def test_stats_sent_per_line(self):
+        # -spl tokenizes sentences and their words separately, totals have to be the same as for whole lines
+        totals = []
+        for sent_per_line in [False, True]:
+            tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer())
+            tokenizer.stats = TokenizerStats()
+            tokenize_lines(tokenizer, TEXTS, sent_per_line)
+            stats = tokenizer.stats.as_dict()
+            totals.append({key: stats[key] for key in ["documents", "chars", "sentences", "tokens"]})
+        self.assertEqual(len(TEXTS), totals[1]["documents"])
+        self.assertEqual(sum(len(text) for text in TEXTS), totals[1]["chars"])
+        self.assertEqual(totals[0], totals[1])
+
+    def test_sentence_words_stats(self):
+        for fused in [True, False]:
+            tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer(), fused=fused)
+            tokenizer.stats = TokenizerStats()
+            for text in TEXTS:
+                sent_words = tokenizer.span_tokenize_sentence_words(text)
+                self.assertEqual(self.tokenizer.span_tokenize_sentences(text), [(start, end) for start, end, _ in sent_words])
+                self.assertEqual(self.tokenizer.span_tokenize(text), [span for _, _, word_spans in sent_words for span in word_spans])
+
+            stats = tokenizer.stats.as_dict()
+            self.assertEqual(len(TEXTS), stats["documents"])
+            self.assertEqual(sum(len(self.tokenizer.span_tokenize_sentences(text)) for text in TEXTS), stats["sentences"])
+            self.assertEqual(sum(len(self.tokenizer.span_tokenize(text)) for text in TEXTS), stats["tokens"])
+            self.assertEqual(len(TEXTS), stats["stages"]["sentences"]["calls"])
+            self.assertEqual(len(TEXTS), stats["stages"]["words"]["calls"])
+            self.assertEqual(fused, "normalize" in stats["stages"])
+
+    def test_sentence_words_memo(self):
+        texts = TEXTS + ["Фото: Танјуг. Данас ради до 20 часова."] + TEXTS
+        for fused in [True, False]:
+            expected = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer(), fused=fused)
+            tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer(), fused=fused)
+            tokenizer.memo = TokenizerMemo(max_entries=100)
+            for text in texts:
+                self.assertEqual(expected.span_tokenize_sentence_words(text), tokenizer.span_tokenize_sentence_words(text))
+
+            memo = tokenizer.memo.as_dict()
+            sentences = sum(len(expected.span_tokenize_sentences(text)) for text in TEXTS)
+            # all sentences of repeated texts and the sentence after the byline are hits
+            self.assertEqual(sentences + 1, memo["sentences"]["hits"])
+            self.assertEqual(sentences + 1, memo["sentences"]["misses"])
+
+    def test_lru_cache(self):
+        cache = LRUCache(max_entries=2)
+        cache.put("a", ((0, 1),))
+        cache.put("b", ((0, 1),))
+        self.assertEqual(((0, 1),), cache.get("a"))
+        cache.put("c", ())
+        self.assertNotIn("b", cache)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual({"entries": 2, "hits": 1, "misses": 1, "evictions": 1}, {k: v for k, v in cache.as_dict().items() if k in ["entries", "hits", "misses", "evictions"]})
+
+        cache = LRUCache(max_bytes=1000, sizeof=lambda key, value: len(key))
+        cache.put("a" * 600, ())
+        cache.put("b" * 600, ())
+        self.assertEqual(1, len(cache))
+        self.assertEqual(600, cache.bytes)
+        cache.put("c" * 1001, ())
+        self.assertNotIn("c" * 1001, cache)
+
+    def test_memo_limits(self):
+        tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer())
+        tokenizer.memo = TokenizerMemo(max_entries=9, max_bytes=12000)
+        for i in range(200):
+            # digits are normalized to 0, so sentences differ in words
+            tokenizer.span_tokenize("Др. Марко Топаловић је дежурни лекар%s. Данас ради до 20 часова." % ("а" * i))
+            memo = tokenizer.memo
+            self.assertLessEqual(memo.texts.bytes + memo.sentences.bytes, 12000)
+            self.assertLessEqual(len(memo.texts) + len(memo.sentences), 9)
+        self.assertGreater(memo.texts.evictions, 0)
+        self.assertGreater(memo.sentences.evictions, 0)
+
+    def test_length_histogram(self):
+        histogram = LengthHistogram()
+        histogram.add_spans([(0, 1), (2, 4), (5, 8), (10, 14)])
+        self.assertEqual({"1-1": 1, "2-3": 2, "4-7": 1}, histogram.as_dict()["buckets"])
+        self.assertEqual(4, histogram.as_dict()["max"])
+
+    def test_span_tokenize_compact(self):
+        for text in TEXTS:
+            self.assertEqual(self.tokenizer.span_tokenize(text), self.tokenizer.span_tokenize_compact(text).tolist())
+        compact = self.tokenizer.span_tokenize_many(TEXTS, workers=2, compact=True)
+        self.assertEqual([self.tokenizer.span_tokenize(text) for text in TEXTS], [spans.tolist() for spans in compact])
+
+    def test_span_tokenize_many_in_process(self):
+        expected = [self.tokenizer.span_tokenize(text) for text in TEXTS]
+        self.assertEqual(expected, self.tokenizer.span_tokenize_many(TEXTS, workers=1))
+
+    def test_span_tokenize_many_keeps_order(self):
+        texts = TEXTS * 10
+        expected = [self.tokenizer.span_tokenize(text) for text in texts]
+        self.assertEqual(expected, self.tokenizer.span_tokenize_many(texts, workers=2, chunksize=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
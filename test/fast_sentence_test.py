@@ -0,0 +1,81 @@
+import os
+import unittest
+
+from srbtok.srb_tokenizer import SrbTokenizer, get_tokenizer, create_serbian_fast_sentence_tokenizer, create_serbian_punkt_tokenizer, normalize_text
+from srbtok.fast_sentence import abbreviation_key
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+RAW_DIR = os.path.join(DATA_DIR, "test", "politika", "raw")
+ABBREVIATIONS_DICT = os.path.join(DATA_DIR, "train", "abbreviations_dict.txt")
+
+
+def read_texts():
+    texts = []
+    for name in sorted(os.listdir(RAW_DIR)):
+        with open(os.path.join(RAW_DIR, name), 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+    return texts
+
+
+class FastSentenceTokenizerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer = create_serbian_fast_sentence_tokenizer()
+
+    def test_sentences(self):
+        cases = [
+            ("Др. Марко Топаловић је дежурни лекар. Он ради ноћу.", ["Др. Марко Топаловић је дежурни лекар.", "Он ради ноћу."]),
+            ("Купили смо јабуке, крушке итд. и вратили се кући.", ["Купили смо јабуке, крушке итд. и вратили се кући."]),
+            ("Рођен је 12. јуна 1990. Живи у Београду.", ["Рођен је 12. јуна 1990.", "Живи у Београду."]),
+            ("А. Б. Марковић је дошао у бр. 5. Сутра одлази.", ["А. Б. Марковић је дошао у бр. 5.", "Сутра одлази."]),
+            ("Рекао је: „Долазим!” Онда је отишао...  Вратио се? Да.", ["Рекао је: „Долазим!”", "Онда је отишао...", "Вратио се?", "Да."]),
+            ("Чекали смо... и дочекали.", ["Чекали смо... и дочекали."]),
+            ("  Почетак са размацима. Крај.  \n", ["  Почетак са размацима.", "Крај."]),
+            ("", []),
+        ]
+        for text, expected in cases:
+            self.assertEqual(expected, self.tokenizer.tokenize(text), text)
+
+    def test_normalized_text(self):
+        for text in read_texts():
+            self.assertEqual(self.tokenizer.span_tokenize(text), self.tokenizer.span_tokenize_normalized(normalize_text(text)))
+
+    def test_abbreviation_key(self):
+        self.assertEqual("др", abbreviation_key("др"))
+        self.assertEqual("тд", abbreviation_key("и тд."))
+        self.assertEqual("п.н.е", abbreviation_key("п.н.е."))
+        self.assertEqual("гимн", abbreviation_key("Гимн."))
+        self.assertEqual("", abbreviation_key("ЕУ"))
+        self.assertEqual("", abbreviation_key(". "))
+
+    def test_abbreviations_dict(self):
+        with open(ABBREVIATIONS_DICT, 'r', encoding='utf-8') as f:
+            entries = [line.split('\t')[0] for line in f.read().splitlines()[1:] if line.strip()]
+        missing = [entry for entry in entries if abbreviation_key(entry) and abbreviation_key(entry) not in self.tokenizer.abbreviations]
+        self.assertEqual([], missing)
+
+    def test_agreement_with_punkt(self):
+        punkt = create_serbian_punkt_tokenizer()
+        same = punkt_total = fast_total = 0
+        for text in read_texts():
+            punkt_ends = {end for _, end in punkt.span_tokenize(text)}
+            fast_ends = {end for _, end in self.tokenizer.span_tokenize(text)}
+            same += len(punkt_ends & fast_ends)
+            punkt_total += len(punkt_ends)
+            fast_total += len(fast_ends)
+        self.assertGreater(same / punkt_total, 0.98)
+        self.assertGreater(same / fast_total, 0.98)
+
+    def test_srb_tokenizer(self):
+        tokenizer = SrbTokenizer(fast=True)
+        self.assertEqual(['Др.', 'Марко', 'Топаловић', 'је', 'дежурни', 'лекар', '.'], tokenizer.tokenize("Др. Марко Топаловић је дежурни лекар."))
+        texts = read_texts()[:10]
+        expected = [tokenizer.span_tokenize(text) for text in texts]
+        self.assertEqual(expected, tokenizer.span_tokenize_many(texts, workers=2))
+        self.assertIs(get_tokenizer(fast=True), get_tokenizer(fast=True))
+        self.assertIsNot(get_tokenizer(fast=True), get_tokenizer())
+
+
+if __name__ == '__main__':
+    unittest.main()
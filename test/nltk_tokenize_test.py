@@ -1,7 +1,7 @@
 import unittest
 import io
 
-from srbtok.utils import word_spans_to_tokenized_text, tokenize_stream, WORD_SEP
+from srbtok.utils import word_spans_to_tokenized_text, tokenize_stream, iter_tokenize_stream, write_lines, WORD_SEP
 from tools.nltk_tokenize import create_word_tokenizer
 
 class TestNLTKTokenize(unittest.TestCase):
@@ -39,6 +39,22 @@ a bc def
 """
         self.assertEqual(expected, segmented_text)
 
+    def test_iter_tokenize_stream(self):
+        tokenizer = create_word_tokenizer("WhitespaceTokenizer")
+        stream = io.StringIO("a bc\n\n  d\n")
+        self.assertEqual(["a bc", "", "d"], list(iter_tokenize_stream(stream, tokenizer)))
+
+
+    def test_write_lines(self):
+        ostream = io.StringIO()
+        write_lines(iter(["a bc", "", "d"]), ostream)
+        self.assertEqual("a bc\n\nd", ostream.getvalue())
+
+        ostream = io.StringIO()
+        write_lines(iter(["a bc", "", "d"]), ostream, line_buffered=True)
+        self.assertEqual("a bc\n\nd\n", ostream.getvalue())
+
+
 
 if __name__ == '__main__':
     unittest.main()
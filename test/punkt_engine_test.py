@@ -0,0 +1,52 @@
+import os
+import random
+import unittest
+
+from srbtok.srb_tokenizer import NormPunktTokenizer, load_serbian_punkt_params
+
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "test", "politika", "raw")
+
+# pieces of text around which nltk Punkt makes its decisions: abbreviations, initials, ordinals, ellipsis,
+# punctuation after the period, different whitespace and empty lines
+PIECES = ["Др.", "др.", "А.", "б.", "1.", "12..", "...", "..", ".", "?", "!", "?!", "\"", "'", ")", "(", "]", "--",
+          "-", ",", ";", ":", " ", " ", "\n", "\n\n", "\t", "\x0b", "Марко", "лекар", "Данас", "у", "јер", "Beograd",
+          "St.", "U.S.A.", "2024.", "0.", "ул.", "тј.", "итд.", "бр.", "…", "x-др.", "«", "»"]
+
+
+class PunktEngineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        params = load_serbian_punkt_params()
+        cls.fast = NormPunktTokenizer(params, engine='fast')
+        cls.nltk = NormPunktTokenizer(params, engine='nltk')
+
+    def assertSameSpans(self, text):
+        self.assertEqual(list(self.nltk.span_tokenize(text)), list(self.fast.span_tokenize(text)), repr(text))
+
+    def test_politika(self):
+        for name in sorted(os.listdir(RAW_DIR)):
+            with open(os.path.join(RAW_DIR, name), 'r', encoding='utf-8') as f:
+                text = f.read()
+            self.assertSameSpans(text)
+            for line in text.splitlines():
+                self.assertSameSpans(line)
+
+    def test_edge_cases(self):
+        for text in ["", " ", "\n\n", ".", "Др.", "(Прва реченица.) Друга.", "\"Крај!\" Почетак. ",
+                     "А. Б. Марковић је дошао. Ј. Бах", "Било је 12. јуна. Затим 13. Јул", " .x", "\n.\n"]:
+            self.assertSameSpans(text)
+
+    def test_random_texts(self):
+        rng = random.Random(1)
+        for _ in range(3000):
+            text = "".join(rng.choice(PIECES) + rng.choice(["", " "]) for _ in range(rng.randint(0, 30)))
+            self.assertSameSpans(text)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(AssertionError):
+            NormPunktTokenizer(load_serbian_punkt_params(), engine='other')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import pickle
+import unittest
+import tempfile
+from nltk.tokenize.punkt import PunktParameters
+
+from srbtok.punkt_model import save_punkt_params, load_punkt_params
+from srbtok.srb_tokenizer import load_newest_punkt_params
+
+
+class PunktModelTest(unittest.TestCase):
+    def test_save_load(self):
+        params = PunktParameters()
+        params.abbrev_types.update(["др", "проф", "тј"])
+        params.collocations.add(("0.", "јануара"))
+        params.sent_starters.update(["али", "међутим"])
+        params.add_ortho_context("марко", 2)
+        params.add_ortho_context("марко", 4)
+        params.add_ortho_context("је", 32)
+
+        with tempfile.NamedTemporaryFile(delete=False) as model_file:
+            pass
+        save_punkt_params(params, model_file.name)
+        loaded = load_punkt_params(model_file.name)
+        os.remove(model_file.name)
+
+        self.assertEqual(params.abbrev_types, loaded.abbrev_types)
+        self.assertEqual(params.collocations, loaded.collocations)
+        self.assertEqual(params.sent_starters, loaded.sent_starters)
+        self.assertEqual(dict(params.ortho_context), dict(loaded.ortho_context))
+        self.assertEqual(0, loaded.ortho_context["непозната"])
+
+    def test_empty_params(self):
+        with tempfile.NamedTemporaryFile(delete=False) as model_file:
+            pass
+        save_punkt_params(PunktParameters(), model_file.name)
+        loaded = load_punkt_params(model_file.name)
+        os.remove(model_file.name)
+
+        self.assertEqual(set(), loaded.abbrev_types)
+        self.assertEqual(set(), loaded.collocations)
+        self.assertEqual({}, dict(loaded.ortho_context))
+
+    def test_wrong_file(self):
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as model_file:
+            model_file.write(b"not a model file, just some bytes")
+        with self.assertRaises(ValueError):
+            load_punkt_params(model_file.name)
+        os.remove(model_file.name)
+
+    def test_stale_model(self):
+        model_params = PunktParameters()
+        model_params.abbrev_types.add("др")
+        pickle_params = PunktParameters()
+        pickle_params.abbrev_types.update(["др", "проф"])
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, "punkt.model")
+            pickle_path = os.path.join(tmp_dir, "punkt.pickle")
+            save_punkt_params(model_params, model_path)
+            with open(pickle_path, 'wb') as f:
+                pickle.dump(pickle_params, f)
+
+            # model exported after training
+            os.utime(pickle_path, (1000, 1000))
+            os.utime(model_path, (2000, 2000))
+            self.assertEqual({"др"}, load_newest_punkt_params(model_path, pickle_path).abbrev_types)
+
+            # training resumed, pickle is newer than model
+            os.utime(pickle_path, (3000, 3000))
+            self.assertEqual({"др", "проф"}, load_newest_punkt_params(model_path, pickle_path).abbrev_types)
+
+            os.remove(pickle_path)
+            self.assertEqual({"др"}, load_newest_punkt_params(model_path, pickle_path).abbrev_types)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import os
+import gzip
+import json
+import unittest
+import tempfile
+
+from nltk.tokenize.punkt import PunktTrainer
+
+from srbtok.srb_tokenizer import normalize_text
+from train_punkt.punkt_state import save_trainer_state, load_trainer_state
+from train_punkt.sharded_punkt import train_sharded
+
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "test", "politika", "raw")
+
+
+def read_texts(first, last):
+    texts = []
+    for name in sorted(os.listdir(RAW_DIR))[first:last]:
+        with open(os.path.join(RAW_DIR, name), 'r', encoding='utf-8') as f:
+            texts.append(f.read())
+    return "".join(texts)
+
+
+class PunktStateTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.state_path = os.path.join(self.tmp_dir.name, "model.state.json.gz")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_text(self, name, text):
+        path = os.path.join(self.tmp_dir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def assertSameTrainer(self, expected, actual):
+        self.assertEqual(expected._type_fdist, actual._type_fdist)
+        self.assertEqual(expected._type_fdist.N(), actual._type_fdist.N())
+        self.assertEqual(expected._num_period_toks, actual._num_period_toks)
+        self.assertEqual(expected._sentbreak_count, actual._sentbreak_count)
+        self.assertEqual(expected._sent_starter_fdist, actual._sent_starter_fdist)
+        self.assertEqual(expected._collocation_fdist, actual._collocation_fdist)
+        self.assertEqual(expected._params.abbrev_types, actual._params.abbrev_types)
+        self.assertEqual({k: v for k, v in expected._params.ortho_context.items() if v}, dict(actual._params.ortho_context))
+
+    def test_save_load(self):
+        trainer = PunktTrainer()
+        trainer.train(normalize_text(read_texts(0, 10)), finalize=False)
+        save_trainer_state(trainer, self.state_path)
+        self.assertSameTrainer(trainer, load_trainer_state(self.state_path))
+
+        # pruned counts contain None key
+        trainer.freq_threshold()
+        save_trainer_state(trainer, self.state_path)
+        self.assertSameTrainer(trainer, load_trainer_state(self.state_path))
+
+    def test_resume(self):
+        old_text = read_texts(0, 15)
+        new_text = read_texts(15, 25)
+
+        expected = PunktTrainer()
+        expected.train(normalize_text(old_text), finalize=False)
+        expected.train(normalize_text(new_text))
+
+        trainer = PunktTrainer()
+        train_sharded(self.write_text("old.txt", old_text), workers=1, shard_size=5000, trainer=trainer)
+        save_trainer_state(trainer, self.state_path)
+
+        trainer = load_trainer_state(self.state_path)
+        params = train_sharded(self.write_text("new.txt", new_text), workers=1, shard_size=5000, trainer=trainer)
+
+        self.assertSameTrainer(expected, trainer)
+        self.assertEqual(expected.get_params().collocations, params.collocations)
+        self.assertEqual(expected.get_params().sent_starters, params.sent_starters)
+
+    def test_resume_memory_limit(self):
+        old_text = read_texts(0, 15)
+        new_text = read_texts(15, 25)
+
+        expected = PunktTrainer()
+        expected.train(normalize_text(old_text), finalize=False)
+        expected.train(normalize_text(new_text))
+
+        # state of counts on disk is saved and resumed with counts spilled again
+        trainer = PunktTrainer()
+        train_sharded(self.write_text("old.txt", old_text), workers=1, shard_size=5000, trainer=trainer, memory_limit=20000, tmp_dir=self.tmp_dir.name)
+        save_trainer_state(trainer, self.state_path)
+
+        trainer = load_trainer_state(self.state_path)
+        params = train_sharded(self.write_text("new.txt", new_text), workers=1, shard_size=5000, trainer=trainer, memory_limit=20000, tmp_dir=self.tmp_dir.name)
+        save_trainer_state(trainer, self.state_path)
+
+        self.assertSameTrainer(expected, load_trainer_state(self.state_path))
+        self.assertEqual(expected.get_params().collocations, params.collocations)
+        self.assertEqual(expected.get_params().sent_starters, params.sent_starters)
+
+    def test_version(self):
+        trainer = PunktTrainer()
+        save_trainer_state(trainer, self.state_path)
+        with gzip.open(self.state_path, 'rt', encoding='utf-8') as f:
+            state = json.load(f)
+        state["version"] = 0
+        with gzip.open(self.state_path, 'wt', encoding='utf-8') as f:
+            json.dump(state, f)
+        with self.assertRaises(ValueError):
+            load_trainer_state(self.state_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
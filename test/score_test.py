@@ -21,6 +21,34 @@ class TestScore(unittest.TestCase):
         self.assertEqual(3, tp)
 
 
+    def test_encode_tokens(self):
+        expected_words = "Др. Јован 12.0 дин .".split()
+        actual_words = "Др . Јован 12 . 0 дин .".split()
+        expected_ids, actual_ids = encode_tokens(expected_words, actual_words)
+        self.assertEqual(len(expected_words), len(expected_ids))
+        self.assertEqual(len(actual_words), len(actual_ids))
+        for i, expected_word in enumerate(expected_words):
+            for j, actual_word in enumerate(actual_words):
+                self.assertEqual(expected_word == actual_word, expected_ids[i] == actual_ids[j])
+
+    def test_directory_pair(self):
+        expected = ["Др. Јован 12.0 дин .", "а б в", "\n"]
+        actual = ["Др . Јован 12 . 0 дин .", "а б\nв", "г"]
+        with tempfile.TemporaryDirectory() as expected_dir, tempfile.TemporaryDirectory() as actual_dir:
+            for i in range(len(expected)):
+                with open(os.path.join(expected_dir, "%d.txt" % i), 'w', encoding='utf-8') as f:
+                    f.write(expected[i])
+                with open(os.path.join(actual_dir, "%d.txt" % i), 'w', encoding='utf-8') as f:
+                    f.write(actual[i])
+
+            file2result = process_directory_pair(actual_dir, expected_dir)
+            self.assertEqual({"0.txt": (5, 3), "1.txt": (3, 3), "2.txt": (0, 0)}, file2result)
+            self.assertEqual(file2result, process_directory_pair(actual_dir, expected_dir, workers=2))
+
+            with tempfile.TemporaryDirectory() as cache_dir, ResultCache(os.path.join(cache_dir, "cache.sqlite")) as cache:
+                self.assertEqual(file2result, process_directory_pair(actual_dir, expected_dir, cache=cache))
+                self.assertEqual(file2result, process_directory_pair(actual_dir, expected_dir, workers=2, cache=cache))
+                self.assertEqual(3, cache.hits[CACHE_NAMESPACE])
 
 
 if __name__ == '__main__':
@@ -0,0 +1,141 @@
+import os
+import json
+import tempfile
+import threading
+import unittest
+import http.client
+
+from srbtok.srb_tokenizer import get_tokenizer
+from srbtok.server import create_server, Client, MicroBatcher
+
+
+TEXTS = [
+    "Др. Марко Топаловић је дежурни лекар. Данас ради до 20 часова.",
+    "\"Наш тим је победио!\", узвикнуо је.",
+    "",
+    "Крушке 1.000.000,50 дин. Јабуке..."
+]
+
+
+class FailingTokenizer:
+    def span_tokenize(self, text):
+        raise RuntimeError("model not loaded")
+
+
+class ServerTest(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = get_tokenizer()
+
+    def start(self, server):
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        def stop():
+            server.shutdown()
+            server.server_close()
+            server.batcher.close()
+            thread.join()
+        self.addCleanup(stop)
+        return server
+
+    def post(self, port, path, body, content_type):
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        conn.request('POST', path, body, {'Content-Type': content_type})
+        response = conn.getresponse()
+        result = (response.status, response.read().decode('utf-8'))
+        conn.close()
+        return result
+
+    def test_http(self):
+        port = self.start(create_server(self.tokenizer, port=0)).server_address[1]
+        with Client(port=port) as client:
+            for text in TEXTS:
+                self.assertEqual(self.tokenizer.tokenize(text), client.tokenize(text))
+                self.assertEqual(self.tokenizer.span_tokenize(text), client.span_tokenize(text))
+            self.assertEqual({"tokens": [self.tokenizer.tokenize(text) for text in TEXTS]}, client.request({"texts": TEXTS}))
+            with self.assertRaises(ValueError):
+                client.request({"text": "а", "format": "xml"})
+
+        # line delimited input
+        status, body = self.post(port, '/tokenize?format=spans', "\n".join(TEXTS), 'text/plain')
+        self.assertEqual(200, status)
+        self.assertEqual([[list(span) for span in self.tokenizer.span_tokenize(text)] for text in TEXTS], [json.loads(line) for line in body.splitlines()])
+
+        status, body = self.post(port, '/tokenize', "{", 'application/json')
+        self.assertEqual(400, status)
+
+    def test_http_errors(self):
+        port = self.start(create_server(self.tokenizer, port=0)).server_address[1]
+        for content_type in ['application/json', 'text/plain']:
+            status, body = self.post(port, '/tokenize', "{\"text\": \"Марко\"}".encode('utf-8')[:-3], content_type)
+            self.assertEqual(400, status)
+            self.assertIn("utf-8", json.loads(body)["error"])
+        status, body = self.post(port, '/tokenize', "[1, 2]", 'application/json')
+        self.assertEqual(400, status)
+
+        # separators that str.splitlines() would split on are part of the text
+        texts = ["Марко\x0cАна\u2028Јован", "Др. Марко\x85лекар", "", "Крај"]
+        status, body = self.post(port, '/tokenize', "\r\n".join(texts) + "\r\n", 'text/plain')
+        self.assertEqual(200, status)
+        self.assertEqual([self.tokenizer.tokenize(text) for text in texts], [json.loads(line) for line in body.split("\n")[:-1]])
+
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        conn.putrequest('POST', '/tokenize')
+        conn.putheader('Content-Type', 'application/json')
+        conn.putheader('Content-Length', 'abc')
+        conn.endheaders()
+        response = conn.getresponse()
+        self.assertEqual(400, response.status)
+        self.assertIn("Content-Length", json.loads(response.read().decode('utf-8'))["error"])
+        conn.close()
+
+        port = self.start(create_server(FailingTokenizer(), port=0)).server_address[1]
+        for content_type in ['application/json', 'text/plain']:
+            status, body = self.post(port, '/tokenize', json.dumps({"text": "Марко"}), content_type)
+            self.assertEqual(500, status)
+            self.assertEqual({"error": "RuntimeError: model not loaded"}, json.loads(body))
+
+    def test_unix_socket_errors(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "srbtok.sock")
+            self.start(create_server(FailingTokenizer(), unix_socket=path))
+            with Client(unix_socket=path) as client:
+                # connection stays open after error
+                for _ in range(2):
+                    with self.assertRaises(ValueError) as context:
+                        client.tokenize("Марко")
+                    self.assertIn("RuntimeError: model not loaded", str(context.exception))
+
+    def test_unix_socket_workers(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "srbtok.sock")
+            self.start(create_server(self.tokenizer, unix_socket=path, workers=2))
+
+            results = {}
+
+            def run_client(i):
+                with Client(unix_socket=path) as client:
+                    results[i] = [client.tokenize(text) for text in TEXTS * 5]
+
+            threads = [threading.Thread(target=run_client, args=(i,)) for i in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            expected = [self.tokenizer.tokenize(text) for text in TEXTS * 5]
+            self.assertEqual({i: expected for i in range(4)}, results)
+
+    def test_micro_batches(self):
+        batcher = MicroBatcher(self.tokenizer, workers=1, max_batch=10, max_delay=0.2)
+        futures = [batcher.submit('tokens', [text]) for text in TEXTS * 3]
+        self.assertEqual([[self.tokenizer.tokenize(text)] for text in TEXTS * 3], [future.result() for future in futures])
+        batcher.close()
+        stats = batcher.as_dict()
+        self.assertEqual(12, stats["texts"])
+        self.assertLess(stats["batches"], 12)
+
+
+if __name__ == '__main__':
+    unittest.main()
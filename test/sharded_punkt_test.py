@@ -0,0 +1,85 @@
+import os
+import unittest
+import tempfile
+
+from nltk.tokenize.punkt import PunktTrainer
+
+from srbtok.srb_tokenizer import normalize_text
+from train_punkt.sharded_punkt import train_sharded, get_orthography_data
+
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "test", "politika", "raw")
+
+
+def nonzero_ortho_context(params):
+    return {typ: flags for typ, flags in params.ortho_context.items() if flags}
+
+
+class ShardedPunktTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        texts = []
+        for name in sorted(os.listdir(RAW_DIR))[:20]:
+            with open(os.path.join(RAW_DIR, name), 'r', encoding='utf-8') as f:
+                texts.append(f.read())
+        # paragraph breaks, lines without text and rare abbreviations around shard boundaries
+        texts.append("\n\n   \nА. б. в\n\nX. Y.\nфон. ,\nд.\n")
+        cls.text = "".join(texts)
+
+        with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False) as f:
+            f.write(cls.text)
+        cls.path = f.name
+
+        trainer = PunktTrainer()
+        trainer.train(normalize_text(cls.text))
+        cls.expected = trainer.get_params()
+
+    @classmethod
+    def tearDownClass(cls):
+        os.remove(cls.path)
+
+    def assertSameParams(self, expected, actual):
+        self.assertEqual(expected.abbrev_types, actual.abbrev_types)
+        self.assertEqual(expected.collocations, actual.collocations)
+        self.assertEqual(expected.sent_starters, actual.sent_starters)
+        self.assertEqual(nonzero_ortho_context(expected), nonzero_ortho_context(actual))
+
+    def test_one_shard(self):
+        self.assertSameParams(self.expected, train_sharded(self.path, workers=1, shard_size=len(self.text) * 4))
+
+    def test_many_shards(self):
+        self.assertSameParams(self.expected, train_sharded(self.path, workers=1, shard_size=2000))
+
+    def test_shard_per_line(self):
+        self.assertSameParams(self.expected, train_sharded(self.path, workers=1, shard_size=1))
+
+    def test_workers(self):
+        self.assertSameParams(self.expected, train_sharded(self.path, workers=2, shard_size=5000))
+
+    def test_memory_limit(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            trainer = PunktTrainer()
+            self.assertSameParams(self.expected, train_sharded(self.path, workers=1, shard_size=2000, trainer=trainer, memory_limit=10000, tmp_dir=tmp_dir))
+
+            expected = PunktTrainer()
+            expected.train(normalize_text(self.text))
+            self.assertEqual(expected._type_fdist.N(), trainer._type_fdist.N())
+            self.assertEqual(dict(expected._collocation_fdist), dict(trainer._collocation_fdist.items()))
+            trainer._type_fdist.close()
+            trainer._sent_starter_fdist.close()
+            trainer._collocation_fdist.close()
+            self.assertEqual([], os.listdir(tmp_dir))
+
+    def test_orthography_data(self):
+        trainer = PunktTrainer()
+        tokens = list(trainer._annotate_first_pass(trainer._tokenize_words("Први. Други\nтрећи")))
+        expected = PunktTrainer()
+        expected._get_orthography_data(tokens)
+        self.assertEqual(dict(expected._params.ortho_context), dict(get_orthography_data(tokens)))
+
+        # context after the previous token
+        self.assertEqual(dict(get_orthography_data(tokens[:2])) | dict(get_orthography_data(tokens[2:], tokens[1])), dict(get_orthography_data(tokens)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import io
+import os
+import sys
+import random
+import tempfile
+import unittest
+import subprocess
+
+from srbtok.srb_tokenizer import SrbTokenizer
+from srbtok.spans_index import SpansIndex, SpansIndexWriter, encode_varints, decode_varints, encode_document, decode_document
+from srbtok.spans_index import iter_encode_corpus, iter_encode_stream, write_spans_index
+from srbtok.stats import TokenizerStats
+
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "test", "politika", "raw")
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+def random_document(rng):
+    sentences = []
+    offset = rng.randint(0, 3)
+    for _ in range(rng.randint(0, 5)):
+        sent_start = offset
+        word_spans = []
+        for _ in range(rng.randint(0, 6)):
+            start = offset + rng.randint(0, 2)
+            offset = start + rng.randint(1, 300)
+            word_spans.append((start, offset))
+        offset += rng.randint(0, 2)
+        sentences.append((sent_start, offset, word_spans))
+        offset += rng.randint(0, 200)
+    return sentences
+
+
+class SpansIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer = SrbTokenizer()
+        cls.names = sorted(os.listdir(RAW_DIR))[:20]
+        cls.texts = []
+        for name in cls.names:
+            with open(os.path.join(RAW_DIR, name), 'r', encoding='utf-8') as f:
+                cls.texts.append(f.read())
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "index.spans")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_varints(self):
+        values = [0, 1, 127, 128, 255, 300, 16383, 16384, 2 ** 31, 2 ** 63 - 1]
+        out = bytearray()
+        encode_varints(values, out)
+        self.assertEqual(values, decode_varints(out, 0, len(out)))
+        self.assertEqual(1, len(encode_document([])))
+        with self.assertRaises(ValueError):
+            encode_varints([-1], bytearray())
+
+    def test_document_roundtrip(self):
+        rng = random.Random(5)
+        for _ in range(200):
+            sentences = random_document(rng)
+            encoded = encode_document(sentences)
+            decoded = decode_document(encoded, 0, len(encoded))
+            self.assertEqual([(start, end, list(words)) for start, end, words in sentences],
+                             [(start, end, words.tolist()) for start, end, words in decoded])
+
+    def test_invalid_document(self):
+        with self.assertRaises(ValueError):
+            encode_document([(10, 20, []), (5, 30, [])])
+        with self.assertRaises(ValueError):
+            encode_document([(0, 5, [(0, 7)])])
+
+    def test_sentence_words(self):
+        tokenizer = SrbTokenizer()
+        for text in self.texts:
+            sentences = tokenizer.span_tokenize_sentence_words(text)
+            self.assertEqual(tokenizer.span_tokenize_sentences(text), [(start, end) for start, end, _ in sentences])
+            self.assertEqual(tokenizer.span_tokenize(text), [span for _, _, words in sentences for span in words])
+        # same result on the instrumented path
+        tokenizer.stats = TokenizerStats()
+        self.assertEqual(self.tokenizer.span_tokenize_sentence_words(self.texts[0]), tokenizer.span_tokenize_sentence_words(self.texts[0]))
+
+    def test_corpus(self):
+        with open(self.path, 'wb') as f:
+            self.assertEqual(len(self.names), write_spans_index(iter_encode_corpus(self.tokenizer, RAW_DIR, self.names, workers=2), f))
+
+        with SpansIndex(self.path) as index:
+            self.assertEqual(len(self.names), len(index))
+            self.assertEqual(self.names, index.names)
+            # random access in any order
+            for i in reversed(range(len(index))):
+                text = self.texts[i]
+                self.assertEqual(self.tokenizer.span_tokenize(text), index.word_spans(i))
+                self.assertEqual(self.tokenizer.span_tokenize_sentences(text), index.sentence_spans(i))
+                self.assertEqual(i, index.index_of(self.names[i]))
+            self.assertEqual(index.word_spans(len(index) - 1), index.word_spans(-1))
+            with self.assertRaises(IndexError):
+                index[len(index)]
+            with self.assertRaises(KeyError):
+                index.index_of("missing.txt")
+            tokens = [self.texts[3][start:end] for _, _, words in index[3] for start, end in words]
+            self.assertEqual(self.tokenizer.tokenize(self.texts[3]), tokens)
+
+        self.assertLess(os.path.getsize(self.path), sum(len(text.encode('utf-8')) for text in self.texts) / 2)
+
+    def test_stream(self):
+        lines = self.texts[0].splitlines() + ["", "Др. Марко Топаловић је дежурни лекар.\r"]
+        documents = list(iter_encode_stream(io.StringIO("\n".join(lines)), self.tokenizer))
+        parallel = list(iter_encode_stream(io.StringIO("\n".join(lines)), self.tokenizer, block_lines=3, workers=2))
+        self.assertEqual(documents, parallel)
+
+        with open(self.path, 'wb') as f:
+            write_spans_index(documents, f)
+        with SpansIndex(self.path) as index:
+            self.assertEqual(len(lines), len(index))
+            self.assertIsNone(index.names)
+            for i, line in enumerate(lines):
+                self.assertEqual(self.tokenizer.span_tokenize(line.rstrip('\r')), index.word_spans(i))
+
+    def test_writer(self):
+        buffer = io.BytesIO()
+        with SpansIndexWriter(buffer) as writer:
+            writer.add_sentences([(0, 4, [(0, 4)])], "a")
+            with self.assertRaises(ValueError):
+                writer.add_sentences([])
+            with self.assertRaises(ValueError):
+                writer.add_sentences([], "b\nc")
+        with open(self.path, 'wb') as f:
+            f.write(buffer.getvalue())
+        with SpansIndex(self.path) as index:
+            self.assertEqual(["a"], index.names)
+            self.assertEqual([(0, 4, [(0, 4)])], [(start, end, words.tolist()) for start, end, words in index[0]])
+
+        with open(self.path, 'wb') as f:
+            f.write(buffer.getvalue()[:-1])
+        with self.assertRaises(ValueError):
+            SpansIndex(self.path)
+
+    def test_cli(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = SRC_DIR + os.pathsep + env.get("PYTHONPATH", "")
+        text = "Др. Марко Топаловић је дежурни лекар.\nДруга линија."
+        subprocess.run([sys.executable, "-m", "srbtok", "--format", "spans-bin", "--out-text", self.path], input=text, env=env, check=True, text=True)
+        with SpansIndex(self.path) as index:
+            self.assertEqual(2, len(index))
+            self.assertEqual(self.tokenizer.span_tokenize("Друга линија."), index.word_spans(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import pickle
+import unittest
+
+from srbtok.spans import SpanArray
+from srbtok.utils import word_spans_to_tokenized_text
+
+
+class SpanArrayTest(unittest.TestCase):
+    def test_sequence(self):
+        spans = SpanArray([(0, 3), (4, 9), (9, 10)])
+        self.assertEqual(3, len(spans))
+        self.assertEqual((4, 9), spans[1])
+        self.assertEqual((9, 10), spans[-1])
+        self.assertEqual([(0, 3), (4, 9), (9, 10)], list(spans))
+        self.assertEqual([(4, 9), (9, 10)], spans[1:].tolist())
+        self.assertEqual([(0, 3), (9, 10)], spans[::2].tolist())
+        self.assertEqual(spans, [(0, 3), (4, 9), (9, 10)])
+        with self.assertRaises(IndexError):
+            spans[3]
+
+    def test_append_extend_shift(self):
+        spans = SpanArray()
+        spans.append((1, 2))
+        spans.extend([(3, 4)])
+        spans.extend(SpanArray([(5, 6)]))
+        spans.shift(10)
+        self.assertEqual([(11, 12), (13, 14), (15, 16)], spans.tolist())
+        self.assertEqual([11, 13, 15], list(spans.starts()))
+        self.assertEqual([12, 14, 16], list(spans.ends()))
+
+    def test_buffer(self):
+        spans = SpanArray([(0, 3), (4, 9)])
+        buffer = spans.buffer
+        self.assertEqual(8, buffer.itemsize)
+        self.assertEqual([0, 3, 4, 9], buffer.tolist())
+        # shift is in place, buffer taken before it sees shifted offsets
+        spans.shift(5)
+        self.assertEqual([5, 8, 9, 14], buffer.tolist())
+
+    def test_pickle(self):
+        spans = SpanArray([(0, 3), (4, 9)])
+        self.assertEqual(spans, pickle.loads(pickle.dumps(spans)))
+        self.assertEqual(SpanArray(), pickle.loads(pickle.dumps(SpanArray())))
+
+    def test_tokenized_text(self):
+        text = "  a bc  def   "
+        self.assertEqual("a bc def", word_spans_to_tokenized_text(text, SpanArray([(2, 3), (4, 6), (8, 11)])))
+
+
+if __name__ == '__main__':
+    unittest.main()
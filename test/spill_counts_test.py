@@ -0,0 +1,63 @@
+import os
+import operator
+import unittest
+import tempfile
+from collections import Counter
+
+from train_punkt.spill_counts import SpillingCounter, DiskFreqDist, merge_sorted_counts, encode_key, decode_key
+
+
+class SpillCountsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_keys(self):
+        for key in [None, "реч", "реч.", ("први", "други")]:
+            self.assertEqual(key, decode_key(encode_key(key)))
+
+    def test_merge_sorted_counts(self):
+        runs = [[("a", 1), ("c", 2)], [("a", 3), ("b", 1)], []]
+        self.assertEqual([("a", 4), ("b", 1), ("c", 2)], list(merge_sorted_counts(runs)))
+        self.assertEqual([("a", 3), ("b", 1), ("c", 2)], list(merge_sorted_counts(runs, operator.or_)))
+
+    def test_spilling_counter(self):
+        words = ("први други трећи први. други " * 50 + " ".join("р%d" % i for i in range(500))).split()
+        expected = Counter(words)
+        expected[("први", "други")] = 7
+
+        counter = SpillingCounter(2000, tmp_dir=self.tmp_dir.name)
+        for word in words:
+            counter.add(word)
+        counter.update({("први", "други"): 7})
+        self.assertGreater(counter.spill_count, 1)
+        self.assertEqual(expected, dict(counter.items()))
+
+        counter.close()
+        self.assertEqual([], os.listdir(self.tmp_dir.name))
+
+    def test_spilling_flags(self):
+        counter = SpillingCounter(0, operator.or_, tmp_dir=self.tmp_dir.name)
+        for key, flags in [("a", 1), ("b", 2), ("a", 4), ("a", 1)]:
+            counter.add(key, flags)
+        self.assertEqual({"a": 5, "b": 2}, dict(counter.items()))
+
+    def test_disk_freq_dist(self):
+        counts = {None: 3, "а": 2, "б.": 1, ("а", "б."): 4}
+        fdist = DiskFreqDist(sorted((encode_key(key), count) for key, count in counts.items()), self.tmp_dir.name)
+        self.assertEqual(10, fdist.N())
+        self.assertEqual(4, fdist.B())
+        self.assertEqual(counts, dict(fdist.items()))
+        self.assertEqual(set(counts), set(fdist))
+        self.assertEqual(4, fdist[("а", "б.")])
+        self.assertEqual(0, fdist["в"])
+        self.assertNotIn("в", fdist)
+
+        fdist.close()
+        self.assertEqual([], os.listdir(self.tmp_dir.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,13 @@
+import os
+import sys
+import random
 import unittest
-from srbtok.srb_tokenizer import SrbRegexpWordTokenizer
+import threading
+import subprocess
+from srbtok.srb_tokenizer import SrbRegexpWordTokenizer, normalize_text
+
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
 
 
 class SrbRegexpTokenizerTest(unittest.TestCase):
@@ -160,5 +168,70 @@ class SrbRegexpTokenizerTest(unittest.TestCase):
 
 
 
+class SrbRegexpTokenizerAlternationTest(SrbRegexpTokenizerTest):
+    '''Runs all word tokenizer tests with the reference alternation engine.'''
+    def __init__(self, *args, **kwargs):
+        super(SrbRegexpTokenizerAlternationTest, self).__init__(*args, **kwargs)
+        self.tokenizer = SrbRegexpWordTokenizer(engine='alternation')
+
+
+class WordRegexEnginesTest(unittest.TestCase):
+    def assert_same_spans(self, text):
+        expected = list(SrbRegexpWordTokenizer(engine='alternation').span_tokenize(text))
+        actual = list(SrbRegexpWordTokenizer(engine='dispatch').span_tokenize(text))
+        self.assertEqual(expected, actual, text)
+
+    def test_politika(self):
+        raw_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "test", "politika", "raw")
+        for name in sorted(os.listdir(raw_dir)):
+            with open(os.path.join(raw_dir, name), 'r', encoding='utf-8') as f:
+                self.assert_same_spans(f.read())
+
+    def test_random_text(self):
+        # short random strings built from characters and fragments that each regex alternative starts with
+        fragments = list("абвгђжљњћџшABCxyz0123456789_ .,-:;!?\"'()[]{}<>…@/\n\t%$#\\h٣") + \
+            ['http://', 'https://', '...', "''", ':)', ':-(', '(?:[!', '\\?', ';])', '„', '“', '\xa0']
+        rnd = random.Random(7)
+        for _ in range(20000):
+            text = "".join(rnd.choice(fragments) for _ in range(rnd.randint(0, 16)))
+            self.assert_same_spans(normalize_text(text))
+
+
+class StartupTest(unittest.TestCase):
+    def test_import_does_not_load_nltk(self):
+        # nltk import dominates startup time, plain import srbtok must not pay for it
+        script = "import sys, srbtok; print('nltk' in sys.modules)"
+        out = subprocess.run([sys.executable, "-c", script], check=True, capture_output=True, text=True).stdout
+        self.assertEqual("False", out.strip())
+
+    def test_word_regex_shared(self):
+        self.assertIs(SrbRegexpWordTokenizer()._regexp, SrbRegexpWordTokenizer()._regexp)
+
+
+class CliTest(unittest.TestCase):
+    TEXT = "Др. Марко Топаловић је дежурни лекар. Ради ноћу.\nДруга линија.\n"
+
+    def run_cli(self, args, **kwargs):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = SRC_DIR + os.pathsep + env.get("PYTHONPATH", "")
+        return subprocess.run([sys.executable, "-m", "srbtok"] + args, env=env, check=True, capture_output=True, text=True, **kwargs).stdout
+
+    def test_in_text_pipe(self):
+        # same as -i <(cat in.txt): pipe has size 0 and can't be memory mapped
+        for args in [[], ["--sent-per-line"], ["--jobs", "2"]]:
+            expected = self.run_cli(args, input=self.TEXT)
+            read_fd, write_fd = os.pipe()
+            writer = threading.Thread(target=lambda: (os.write(write_fd, self.TEXT.encode('utf-8')), os.close(write_fd)))
+            writer.start()
+            try:
+                out = self.run_cli(args + ["-i", "/dev/fd/%d" % read_fd], pass_fds=(read_fd,))
+            finally:
+                os.close(read_fd)
+                writer.join()
+            self.assertEqual(expected, out)
+            self.assertIn("Топаловић", out)
+
+
+
 if __name__ == '__main__':
     unittest.main()
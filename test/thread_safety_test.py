@@ -0,0 +1,120 @@
+import os
+import sys
+import random
+import threading
+import unittest
+
+from srbtok import srb_tokenizer
+from srbtok.srb_tokenizer import SrbTokenizer
+from srbtok.memo import TokenizerMemo
+from srbtok.stats import TokenizerStats
+
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "test", "politika", "raw")
+THREADS = 8
+
+
+def read_texts(count):
+    texts = []
+    for name in sorted(os.listdir(RAW_DIR))[:count]:
+        with open(os.path.join(RAW_DIR, name), 'r', encoding='utf-8') as f:
+            text = f.read()
+        texts.append(text)
+        texts.extend(text.splitlines())
+    return texts
+
+
+def run_threads(target, count=THREADS):
+    errors = []
+
+    def run(i):
+        try:
+            target(i)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+class ThreadSafetyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.texts = read_texts(10)
+        cls.expected = [SrbTokenizer().span_tokenize(text) for text in cls.texts]
+
+    def setUp(self):
+        # switch threads as often as possible, so that races show up even with GIL
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+
+    def tearDown(self):
+        sys.setswitchinterval(self.switch_interval)
+
+    def stress(self, tokenizer, rounds=2):
+        '''Every thread tokenizes all texts in its own random order with shared tokenizer.'''
+        results = [None] * THREADS
+
+        def tokenize_all(i):
+            order = list(range(len(self.texts))) * rounds
+            random.Random(i).shuffle(order)
+            spans = {}
+            for j in order:
+                word_spans = tokenizer.span_tokenize(self.texts[j])
+                if spans.setdefault(j, word_spans) != word_spans:
+                    raise AssertionError("Different spans of the same text in one thread")
+            results[i] = [spans[j] for j in range(len(self.texts))]
+
+        run_threads(tokenize_all)
+        for thread_results in results:
+            self.assertEqual(self.expected, thread_results)
+
+    def test_shared_tokenizer(self):
+        self.stress(SrbTokenizer())
+
+    def test_shared_memo(self):
+        tokenizer = SrbTokenizer()
+        # small memo, so that entries are evicted while other threads read them
+        tokenizer.memo = TokenizerMemo(max_entries=50)
+        self.stress(tokenizer)
+        memo = tokenizer.memo.as_dict()
+        self.assertEqual(2 * THREADS * len(self.texts), memo["texts"]["hits"] + memo["texts"]["misses"])
+        self.assertGreater(memo["texts"]["evictions"], 0)
+        self.assertLessEqual(memo["texts"]["entries"], 50)
+
+    def test_shared_stats(self):
+        tokenizer = SrbTokenizer()
+        tokenizer.stats = TokenizerStats()
+        self.stress(tokenizer, rounds=1)
+        stats = tokenizer.stats.as_dict()
+        self.assertEqual(THREADS * len(self.texts), stats["documents"])
+        self.assertEqual(THREADS * sum(len(spans) for spans in self.expected), stats["tokens"])
+
+    def test_threaded_batch(self):
+        tokenizer = SrbTokenizer()
+        self.assertEqual(self.expected, tokenizer.span_tokenize_many(self.texts, workers=4, threads=True))
+        compact = tokenizer.span_tokenize_many(self.texts, workers=3, chunksize=7, compact=True, threads=True)
+        self.assertEqual(self.expected, [spans.tolist() for spans in compact])
+
+    def test_get_tokenizer_once(self):
+        shared = dict(srb_tokenizer._shared_tokenizers)
+        srb_tokenizer._shared_tokenizers.clear()
+        try:
+            tokenizers = [None] * THREADS
+
+            def get(i):
+                tokenizers[i] = srb_tokenizer.get_tokenizer()
+
+            run_threads(get)
+            self.assertEqual(1, len(set(map(id, tokenizers))))
+        finally:
+            srb_tokenizer._shared_tokenizers.update(shared)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import io
+import os
+import unittest
+import tempfile
+
+from srbtok.srb_tokenizer import NormPunktTokenizer, SrbRegexpWordTokenizer
+from srbtok.cascade_tokenizer import CascadeTokenizer
+from srbtok.utils import tokenize_stream, tokenize_stream_sent_per_line, iter_file_chunks, iter_tokenize_file, iter_span_tokenize_file, iter_line_blocks, iter_tokenize_stream_parallel
+from srbtok.utils import read_file_list, list_corpus_files, tokenize_corpus
+from srbtok.cache import ResultCache
+
+
+TEXT = "Др. Марко Топаловић је дежурни лекар. Данас ради.\r\n\r\nЦена је 100 дин.\rКрај\n\n  „Наш тим је победио!“, узвикнуо је.\nбез краја"
+
+
+class FileChunksTest(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer())
+        with tempfile.NamedTemporaryFile(mode='wb', delete=False) as f:
+            f.write(TEXT.encode('utf-8'))
+        self.path = f.name
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_chunks_end_on_new_line(self):
+        data = TEXT.encode('utf-8')
+        chunks = list(iter_file_chunks(self.path, 10))
+        self.assertEqual(0, chunks[0][0])
+        self.assertEqual(len(data), chunks[-1][1])
+        for (start, end), (next_start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(end, next_start)
+            self.assertEqual(b'\n', data[end - 1:end])
+
+    def test_same_as_stream(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            expected = tokenize_stream(f, self.tokenizer)
+        with open(self.path, 'r', encoding='utf-8') as f:
+            expected_spl = tokenize_stream_sent_per_line(f, self.tokenizer)
+
+        for chunk_size in [0, 1, 10, 1000]:
+            self.assertEqual(expected, "\n".join(iter_tokenize_file(self.path, self.tokenizer, chunk_size=chunk_size)))
+            self.assertEqual(expected_spl, "\n".join(iter_tokenize_file(self.path, self.tokenizer, sent_per_line=True, chunk_size=chunk_size)))
+        self.assertEqual(expected, "\n".join(iter_tokenize_file(self.path, self.tokenizer, chunk_size=10, workers=2)))
+
+    def test_absolute_spans(self):
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        expected = []
+        line_start = 0
+        for line in text.split('\n'):
+            expected.extend((line_start + start, line_start + end) for start, end in self.tokenizer.span_tokenize(line))
+            line_start += len(line) + 1
+
+        for workers in [1, 2]:
+            actual = []
+            for word_spans in iter_span_tokenize_file(self.path, self.tokenizer, chunk_size=10, workers=workers):
+                actual.extend(word_spans)
+            self.assertEqual(expected, actual)
+
+    def test_stream_parallel(self):
+        text = TEXT.replace('\r\n', '\n').replace('\r', '\n')
+        expected = tokenize_stream(io.StringIO(text), self.tokenizer)
+        expected_spl = tokenize_stream_sent_per_line(io.StringIO(text), self.tokenizer)
+
+        self.assertEqual(expected, "\n".join(iter_tokenize_stream_parallel(io.StringIO(text), self.tokenizer, block_lines=2, workers=2)))
+        self.assertEqual(expected_spl, "\n".join(iter_tokenize_stream_parallel(io.StringIO(text), self.tokenizer, sent_per_line=True, block_lines=2, workers=2)))
+
+    def test_line_blocks(self):
+        self.assertEqual([['a\n', 'b\n'], ['c']], list(iter_line_blocks(io.StringIO('a\nb\nc'), 2)))
+        self.assertEqual([], list(iter_line_blocks(io.StringIO(''), 2)))
+
+    def test_empty_file(self):
+        with open(self.path, 'w') as f:
+            pass
+        self.assertEqual([], list(iter_tokenize_file(self.path, self.tokenizer)))
+
+
+class CorpusTest(unittest.TestCase):
+    def setUp(self):
+        self.tokenizer = CascadeTokenizer(NormPunktTokenizer(), SrbRegexpWordTokenizer())
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp_dir.name, "raw")
+        self.output_dir = os.path.join(self.tmp_dir.name, "tokenized")
+        self.texts = {
+            "a.txt": "Др. Марко Топаловић је дежурни лекар.\n\nДанас ради.",
+            os.path.join("sub", "b.txt"): "Цена је 100 дин. Крај\n",
+            os.path.join("sub", "deeper", "c.txt"): "",
+        }
+        for name, text in self.texts.items():
+            os.makedirs(os.path.dirname(os.path.join(self.input_dir, name)), exist_ok=True)
+            with open(os.path.join(self.input_dir, name), 'w', encoding='utf-8') as f:
+                f.write(text)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_output(self, name):
+        with open(os.path.join(self.output_dir, name), 'r', encoding='utf-8') as f:
+            return f.read()
+
+    def test_list_corpus_files(self):
+        self.assertEqual(sorted(self.texts), list_corpus_files(self.input_dir))
+
+    def test_read_file_list(self):
+        path = os.path.join(self.tmp_dir.name, "file_list.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("a.txt\n\nsub/b.txt\n")
+        self.assertEqual(["a.txt", "sub/b.txt"], read_file_list(path))
+
+    def test_tokenize_corpus(self):
+        for workers in [1, 2]:
+            for sent_per_line in [False, True]:
+                written = list(tokenize_corpus(self.tokenizer, self.input_dir, self.output_dir, sent_per_line=sent_per_line, workers=workers))
+                self.assertEqual([os.path.join(self.output_dir, name) for name in sorted(self.texts)], written)
+                for name, text in self.texts.items():
+                    if sent_per_line:
+                        expected = tokenize_stream_sent_per_line(io.StringIO(text), self.tokenizer)
+                    else:
+                        expected = tokenize_stream(io.StringIO(text), self.tokenizer)
+                    self.assertEqual(expected, self.read_output(name))
+
+    def test_tokenize_corpus_cache(self):
+        expected = list(tokenize_corpus(self.tokenizer, self.input_dir, self.output_dir))
+        expected_texts = {name: self.read_output(name) for name in self.texts}
+
+        with ResultCache(os.path.join(self.tmp_dir.name, "cache.sqlite")) as cache:
+            for workers in [1, 2, 1]:
+                self.assertEqual(sorted(expected), sorted(tokenize_corpus(self.tokenizer, self.input_dir, self.output_dir, workers=workers, cache=cache, cache_fingerprint="v1")))
+                for name in self.texts:
+                    self.assertEqual(expected_texts[name], self.read_output(name))
+            self.assertEqual(6, cache.hits["tokenize"])
+            self.assertEqual(3, cache.misses["tokenize"])
+
+            # changed input and changed tokenizer are tokenized again
+            with open(os.path.join(self.input_dir, "a.txt"), 'w', encoding='utf-8') as f:
+                f.write("Нови текст.")
+            list(tokenize_corpus(self.tokenizer, self.input_dir, self.output_dir, cache=cache, cache_fingerprint="v1"))
+            self.assertEqual("Нови текст .", self.read_output("a.txt"))
+            self.assertEqual(4, cache.misses["tokenize"])
+            list(tokenize_corpus(self.tokenizer, self.input_dir, self.output_dir, cache=cache, cache_fingerprint="v2"))
+            self.assertEqual(7, cache.misses["tokenize"])
+
+    def test_tokenize_corpus_file_names(self):
+        list(tokenize_corpus(self.tokenizer, self.input_dir, self.output_dir, ["a.txt"]))
+        self.assertEqual(["a.txt"], list_corpus_files(self.output_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
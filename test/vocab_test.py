@@ -0,0 +1,129 @@
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import subprocess
+
+from srbtok.srb_tokenizer import SrbTokenizer
+from srbtok.stats import TokenizerStats
+from srbtok.vocab import Vocabulary, UNKNOWN_ID, UNKNOWN_TOKEN, ID_TYPECODE
+
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "test", "politika", "raw")
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+
+
+class VocabularyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tokenizer = SrbTokenizer()
+        cls.texts = []
+        for name in sorted(os.listdir(RAW_DIR))[:20]:
+            with open(os.path.join(RAW_DIR, name), 'r', encoding='utf-8') as f:
+                cls.texts.append(f.read())
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "vocab.tsv")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_encode(self):
+        vocabulary = Vocabulary()
+        text = "Марко и Ана. Марко"
+        ids = vocabulary.encode(text, [(0, 5), (6, 7), (8, 11), (11, 12), (13, 18)])
+        self.assertEqual(ID_TYPECODE, ids.typecode)
+        self.assertEqual([1, 2, 3, 4, 1], ids.tolist())
+        self.assertEqual(["Марко", "и", "Ана", ".", "Марко"], vocabulary.decode(ids))
+        self.assertEqual(5, len(vocabulary))
+        self.assertEqual(UNKNOWN_TOKEN, vocabulary.token(UNKNOWN_ID))
+        self.assertEqual(2, vocabulary.counts[1])
+        self.assertEqual(("Марко", 2), vocabulary.most_common(1)[0])
+        self.assertEqual([1, 5], vocabulary.encode_tokens(["Марко", "Јован"]).tolist())
+
+    def test_frozen(self):
+        vocabulary = Vocabulary(["Марко", "."], frozen=True)
+        self.assertEqual([1, UNKNOWN_ID, 2], vocabulary.encode_tokens(["Марко", "Ана", "."]).tolist())
+        self.assertEqual(3, len(vocabulary))
+        self.assertNotIn("Ана", vocabulary)
+        self.assertEqual(1, vocabulary.counts[UNKNOWN_ID])
+
+    def test_save_load(self):
+        vocabulary = Vocabulary()
+        for text in self.texts:
+            self.tokenizer.tokenize_ids(text, vocabulary)
+        vocabulary.save(self.path)
+
+        loaded = Vocabulary.load(self.path, frozen=True)
+        self.assertTrue(loaded.frozen)
+        self.assertEqual(len(vocabulary), len(loaded))
+        self.assertEqual(vocabulary.most_common(), loaded.most_common())
+        ids = self.tokenizer.tokenize_ids(self.texts[0], vocabulary)
+        self.assertEqual(ids, self.tokenizer.tokenize_ids(self.texts[0], loaded))
+
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("реч\t1\n")
+        with self.assertRaises(ValueError):
+            Vocabulary.load(self.path)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write("%s\t0\nреч\t1\nреч\t2\n" % UNKNOWN_TOKEN)
+        with self.assertRaises(ValueError):
+            Vocabulary.load(self.path)
+
+    def test_tokenize_ids(self):
+        vocabulary = Vocabulary()
+        for text in self.texts:
+            ids = self.tokenizer.tokenize_ids(text, vocabulary)
+            self.assertEqual(self.tokenizer.tokenize(text), vocabulary.decode(ids))
+            sentence_ids = self.tokenizer.tokenize_ids(text, vocabulary, per_sentence=True)
+            self.assertEqual(len(self.tokenizer.span_tokenize_sentences(text)), len(sentence_ids))
+            self.assertEqual(ids.tolist(), [token_id for sentence in sentence_ids for token_id in sentence])
+
+        tokens = [token for text in self.texts for token in self.tokenizer.tokenize(text)]
+        self.assertEqual(2 * len(tokens), sum(vocabulary.counts.values()))
+        self.assertEqual(len(set(tokens)) + 1, len(vocabulary))
+
+    def test_tokenize_ids_stats(self):
+        tokenizer = SrbTokenizer()
+        tokenizer.stats = TokenizerStats()
+        vocabulary = Vocabulary()
+        for text in self.texts:
+            sentence_ids = tokenizer.tokenize_ids(text, vocabulary, per_sentence=True)
+            self.assertEqual(self.tokenizer.tokenize(text), [token for ids in sentence_ids for token in vocabulary.decode(ids)])
+
+        stats = tokenizer.stats.as_dict()
+        self.assertEqual(len(self.texts), stats["documents"])
+        self.assertEqual(sum(len(self.tokenizer.span_tokenize_sentences(text)) for text in self.texts), stats["sentences"])
+        self.assertEqual(sum(vocabulary.counts.values()), stats["tokens"])
+        self.assertEqual({"normalize", "sentences", "words"}, set(stats["stages"]))
+
+    def test_threads(self):
+        vocabulary = Vocabulary()
+        results = [None] * 4
+
+        def encode(i):
+            results[i] = [self.tokenizer.tokenize_ids(text, vocabulary) for text in self.texts]
+
+        threads = [threading.Thread(target=encode, args=(i,)) for i in range(len(results))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertTrue(all(result == results[0] for result in results))
+        self.assertEqual([self.tokenizer.tokenize(text) for text in self.texts], [vocabulary.decode(ids) for ids in results[0]])
+
+    def test_cli(self):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = SRC_DIR + os.pathsep + env.get("PYTHONPATH", "")
+        cmd = [sys.executable, "-m", "srbtok", "--format", "ids"]
+        out = subprocess.run(cmd + ["--vocab-out", self.path, "--sent-per-line"], input="Др. Марко је лекар. Марко ради.", env=env, check=True, capture_output=True, text=True).stdout
+        self.assertEqual("1 2 3 4 5\n2 6 5", out)
+        out = subprocess.run(cmd + ["--vocab-in", self.path, "--freeze-vocab"], input="Марко и Ана.", env=env, check=True, capture_output=True, text=True).stdout
+        self.assertEqual("2 0 0 5", out)
+        self.assertEqual(2, Vocabulary.load(self.path).counts[2])
+
+
+if __name__ == '__main__':
+    unittest.main()